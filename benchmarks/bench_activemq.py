@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+
+"""
+Throughput and round-trip latency of the `activeMQ` voice, using a
+headless NottReal, the stand-in STOMP broker and a simulated VUI (see
+`stomp_standin.py`), so no ActiveMQ server is needed. Requires
+stomp.py (`pip3 install stomp.py`).
+
+All messages are queued at once, in batches if `--restarts` is given:
+the broker is restarted as each batch after the first is queued, so
+messages are buffered by NottReal while the broker is down. The time
+from the broker starting again to NottReal reconnecting is measured,
+as are any messages that are lost. Messages lost by NottReal are
+counted separately from those spoken by the VUI whose replies were
+lost because the VUI was disconnected (a VUI needn't keep its replies
+until it reconnects, but the simulated VUI will with
+`--buffer_replies`).
+
+Run from the repository root:
+    python benchmarks/bench_activemq.py [-n MESSAGES] [--restarts N]
+        [--downtime SECONDS] [--speaking_delay SECONDS]
+        [--talk_time SECONDS] [--buffer_replies]
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from nottreal import parse_args  # noqa: E402
+from nottreal.app import App  # noqa: E402
+from nottreal.utils.dir import DirUtils  # noqa: E402
+from nottreal.utils.log import Logger  # noqa: E402
+from nottreal.utils.stats import LatencyStats  # noqa: E402
+from stomp_standin import (StandinThread, StompBroker,  # noqa: E402
+                           VUIDevice, load_config)
+
+from argparse import ArgumentParser  # noqa: E402
+
+import importlib.util  # noqa: E402
+import shutil  # noqa: E402
+import tempfile  # noqa: E402
+import threading  # noqa: E402
+import time  # noqa: E402
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument(
+        '-n',
+        '--messages',
+        type=int,
+        default=1000,
+        help='Number of messages to speak')
+    parser.add_argument(
+        '-r',
+        '--restarts',
+        type=int,
+        default=0,
+        help='Number of times to restart the broker')
+    parser.add_argument(
+        '--downtime',
+        type=float,
+        default=.5,
+        help='Seconds the broker is stopped for when restarted')
+    parser.add_argument(
+        '--speaking_delay',
+        type=float,
+        default=0.,
+        help='Seconds before the VUI replies that it\'s speaking')
+    parser.add_argument(
+        '--talk_time',
+        type=float,
+        default=0.,
+        help='Seconds the VUI speaks each message for')
+    parser.add_argument(
+        '--buffer_replies',
+        action='store_true',
+        help='Have the VUI send the replies that couldn\'t be sent while '
+             'disconnected once it reconnects (default: lose them)')
+    parser.add_argument(
+        '--heartbeat',
+        type=int,
+        default=1000,
+        help='Milliseconds between heart-beats')
+    parser.add_argument(
+        '-t',
+        '--timeout',
+        type=float,
+        default=120.,
+        help='Seconds to wait for the messages to be spoken')
+    parser.add_argument(
+        '--settle',
+        type=float,
+        default=5.,
+        help='Seconds without a message being spoken before the rest '
+             'are counted as lost')
+    bench_args = parser.parse_args()
+
+    if importlib.util.find_spec('stomp') is None:
+        print('stomp.py is not installed (pip3 install stomp.py)')
+        sys.exit(1)
+
+    Logger.init(Logger.WARNING)
+
+    standin = StandinThread(StompBroker())
+    standin.start()
+
+    # NottReal's settings, pointing at the stand-in broker
+    config_dir = tempfile.TemporaryDirectory()
+    dist_dir = os.path.join(DirUtils.pwd(), 'dist.nrc')
+    for filename in os.listdir(dist_dir):
+        shutil.copy(os.path.join(dist_dir, filename), config_dir.name)
+
+    cfg = load_config(config_dir.name)
+    cfg.set('ActiveMQ', 'host', '127.0.0.1')
+    cfg.set('ActiveMQ', 'port', str(standin.broker.port))
+    cfg.set('ActiveMQ', 'heartbeat', str(bench_args.heartbeat))
+    cfg.set('ActiveMQ', 'buffer_size', str(bench_args.messages))
+    with open(os.path.join(config_dir.name, 'settings.cfg'), 'w') as file:
+        cfg.write(file)
+
+    device = VUIDevice(
+        '127.0.0.1',
+        standin.broker.port,
+        cfg,
+        speaking_delay=bench_args.speaking_delay,
+        talk_time=bench_args.talk_time,
+        buffer_replies=bench_args.buffer_replies)
+    standin.add_device(device)
+
+    # data recording directories must be relative to NottReal
+    output_dir = tempfile.TemporaryDirectory(dir=DirUtils.pwd())
+    args = parse_args([
+        '--headless',
+        '--nostate',
+        '--voice', 'activeMQ',
+        '--config_dir', config_dir.name,
+        '--output_dir', os.path.relpath(output_dir.name, DirUtils.pwd()),
+        '--log', 'WARNING'])
+    app = App(args, run_loop=False)
+
+    window = app.view.wizard_window
+    voice = app.responder('voice')
+    voice.MAX_IN_FLIGHT = bench_args.messages
+    if not voice._connected.wait(bench_args.timeout):
+        print('Could not connect to the stand-in broker')
+        sys.exit(1)
+
+    # time from sending each message to the VUI saying it's speaking,
+    # and to it finishing
+    speaking = LatencyStats()
+    round_trip = LatencyStats()
+    finished = threading.Event()
+    stats = app.responder('stats')
+    remote_latency = stats.remote_latency
+
+    def on_remote_latency(trace):
+        remote_latency(trace)
+        speaking.record(trace.durations().get(voice.SPEAKING, 0.))
+        round_trip.record(trace.total())
+        if round_trip.count == bench_args.messages:
+            finished.set()
+
+    stats.remote_latency = on_remote_latency
+
+    batches = bench_args.restarts + 1
+    reconnect = LatencyStats()
+
+    def restart():
+        standin.restart(bench_args.downtime)
+        restarted = time.perf_counter()
+        if voice._connected.wait(bench_args.timeout):
+            reconnect.record(time.perf_counter() - restarted)
+
+    i = 0
+    start = time.perf_counter()
+    for batch in range(batches):
+        restarter = None
+        if batch > 0:
+            restarter = threading.Thread(target=restart)
+            restarter.start()
+
+        end = bench_args.messages * (batch + 1) // batches
+        while i < end:
+            window.command.speak_text('Message number %d' % i)
+            i += 1
+
+        if restarter is not None:
+            restarter.join()
+
+    # messages in flight when the broker stops may never arrive, so stop
+    # waiting if nothing more is spoken for a while
+    deadline = time.perf_counter() + bench_args.timeout
+    spoken = -1
+    while spoken < round_trip.count and time.perf_counter() < deadline:
+        spoken = round_trip.count
+        if finished.wait(bench_args.settle):
+            break
+    completed = finished.is_set()
+    elapsed = time.perf_counter() - start
+
+    voice.packdown()
+    app.quit()
+    app.shutdown()
+    standin.stop()
+    output_dir.cleanup()
+    config_dir.cleanup()
+
+    print('%d messages sent, %d spoken in %.3f s (%.0f messages/s)' % (
+        bench_args.messages,
+        round_trip.count,
+        elapsed,
+        round_trip.count / elapsed))
+    if not completed:
+        lost = bench_args.messages - round_trip.count
+        lost_at_vui = min(device.unreported(), lost)
+        print('%d lost: %d by NottReal, %d spoken but their replies lost '
+              'at the VUI while disconnected' % (
+                lost,
+                lost - lost_at_vui,
+                lost_at_vui))
+    print('Broker received %d, VUI received %d (%d different), spoken %d, '
+          'interrupted %d, replies lost %d'
+          % (standin.broker.received,
+             device.received,
+             device.delivered(),
+             device.spoken,
+             device.interrupted,
+             device.replies_lost))
+
+    for label, latency in (('Sent to speaking', speaking),
+                           ('Round trip', round_trip),
+                           ('Reconnecting', reconnect)):
+        summary = latency.to_dict()
+        if summary['count']:
+            print('%s: mean %.2f ms, p50 %.2f ms, p95 %.2f ms, '
+                  'p99 %.2f ms' % (
+                    label,
+                    summary['mean'] * 1e3,
+                    summary['p50'] * 1e3,
+                    summary['p95'] * 1e3,
+                    summary['p99'] * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+
+"""
+Throughput and latency of the speak pipeline, from the Wizard's
+command box to the voice subsystem, using a headless NottReal with the
+`VoiceOutputToLog` voice (without simulated talk time).
+
+By default all messages are queued at once. With `--sequential`, each
+message is sent once the previous one has finished, so the latency is
+that of waking an idle voice thread.
+
+With `--time_warp`, talk time is simulated on a clock running that many
+times faster than real time (0 to not wait at all), and the simulated
+length of the session is reported too.
+
+Run from the repository root:
+    python benchmarks/bench_headless.py [-n MESSAGES] [--sequential]
+        [--time_warp FACTOR]
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from nottreal import parse_args  # noqa: E402
+from nottreal.app import App  # noqa: E402
+from nottreal.utils.clock import Clock  # noqa: E402
+from nottreal.utils.dir import DirUtils  # noqa: E402
+from nottreal.utils.log import Logger  # noqa: E402
+from nottreal.utils.stats import LatencyStats, StatsCollection  # noqa: E402
+
+from argparse import ArgumentParser  # noqa: E402
+
+import tempfile  # noqa: E402
+import threading  # noqa: E402
+import time  # noqa: E402
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument(
+        '-n',
+        '--messages',
+        type=int,
+        default=2000,
+        help='Number of messages to speak')
+    parser.add_argument(
+        '-t',
+        '--timeout',
+        type=float,
+        default=600.,
+        help='Seconds to wait for the messages to be spoken')
+    parser.add_argument(
+        '-s',
+        '--sequential',
+        action='store_true',
+        help='Wait for each message to finish before sending the next')
+    parser.add_argument(
+        '-w',
+        '--time_warp',
+        default=None,
+        help='Simulate talk time with the clock running this much faster')
+    bench_args = parser.parse_args()
+
+    Logger.init(Logger.WARNING)
+
+    # data recording directories must be relative to NottReal
+    output_dir = tempfile.TemporaryDirectory(dir=DirUtils.pwd())
+    argv = [
+        '--headless',
+        '--nostate',
+        '--stats',
+        '--voice', 'outputToLog',
+        '--output_dir', os.path.relpath(output_dir.name, DirUtils.pwd()),
+        '--log', 'WARNING']
+    if bench_args.time_warp is not None:
+        argv += ['--time_warp', bench_args.time_warp]
+    app = App(parse_args(argv), run_loop=False)
+
+    window = app.view.wizard_window
+    window.menu.option(
+        'nottreal.controllers.c_voice.dont_simulate_time').change(
+            bench_args.time_warp is None,
+            dont_save=True)
+
+    signals = StatsCollection()
+    app.instrument(signals)
+
+    # time from the command box to the voice subsystem saying it's
+    # speaking each message
+    sent = {}
+    latency = LatencyStats()
+    spoken = threading.Event()
+    finished_speaking = threading.Event()
+    wizard = app.responder('wizard')
+    now_speaking = wizard.now_speaking
+    change_state = wizard.change_state
+
+    def on_now_speaking(text):
+        latency.record(time.perf_counter() - sent[text])
+        now_speaking(text)
+        if latency.count == bench_args.messages:
+            spoken.set()
+
+    def on_change_state(state):
+        change_state(state)
+        finished_speaking.set()
+
+    wizard.now_speaking = on_now_speaking
+    wizard.change_state = on_change_state
+
+    start = time.perf_counter()
+    virtual_start = Clock.monotonic()
+    for i in range(bench_args.messages):
+        text = 'Message number %d' % i
+        finished_speaking.clear()
+        sent[text] = time.perf_counter()
+        window.command.speak_text(text)
+        if bench_args.sequential \
+                and not finished_speaking.wait(bench_args.timeout):
+            break
+    queued = time.perf_counter() - start
+
+    finished = spoken.wait(bench_args.timeout)
+    elapsed = time.perf_counter() - start
+    virtual_elapsed = Clock.monotonic() - virtual_start
+
+    app.quit()
+    app.shutdown()
+    output_dir.cleanup()
+
+    print('%d messages queued in %.3f s' % (bench_args.messages, queued))
+    print('%d messages spoken in %.3f s (%.0f messages/s)%s' % (
+        latency.count,
+        elapsed,
+        latency.count / elapsed,
+        '' if finished else ' (timed out)'))
+    if bench_args.time_warp is not None:
+        print('Simulated session lasted %.1f s' % virtual_elapsed)
+
+    stats = latency.to_dict()
+    if stats['count']:
+        print('Latency to speaking: mean %.2f ms, p50 %.2f ms, '
+              'p95 %.2f ms, p99 %.2f ms' % (
+                stats['mean'] * 1e3,
+                stats['p50'] * 1e3,
+                stats['p95'] * 1e3,
+                stats['p99'] * 1e3))
+
+    print()
+    print(signals.summary(limit=10))
+
+
+if __name__ == '__main__':
+    main()
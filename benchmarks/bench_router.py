@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+
+"""
+Microbenchmark for `App.router()`, comparing the compiled dispatch table
+with the previous getattr/getfullargspec routing.
+
+Run from the repository root:
+    python benchmarks/bench_router.py [-n ITERATIONS]
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from nottreal.app import App  # noqa: E402
+from nottreal.utils.log import Logger  # noqa: E402
+
+from argparse import ArgumentParser, Namespace  # noqa: E402
+from collections import OrderedDict  # noqa: E402
+
+import inspect  # noqa: E402
+import timeit  # noqa: E402
+
+
+class Responder:
+    """A controller-like object with a couple of typical signals"""
+    def now_speaking(self, text):
+        pass
+
+    def change_state(self, state, responder=None):
+        pass
+
+
+def create_app():
+    """
+    Create an {App} with only its routing state, so no controllers
+    or views are constructed
+
+    Returns:
+        {App}
+    """
+    app = App.__new__(App)
+    app.args = Namespace(dev=False)
+    app.responders = OrderedDict({'app': app})
+    app._routes = {}
+    app._broadcast = None
+    app._signal_stats = None
+
+    instance = Responder()
+    for name in ('wizard', 'output', 'voice', 'recognition', 'data'):
+        app.responders[name] = instance
+    return app
+
+
+def legacy_router(app, recipient, action, **kwargs):
+    """
+    Routing as it was before the dispatch table (minus exception
+    handling), for comparison
+    """
+    instance = app.responders[recipient]
+    method = getattr(instance, action)
+    Logger.debug(
+        __name__,
+        'Pass "%s" signal to the controller "%s"' % (action, recipient))
+    args = inspect.getfullargspec(method)
+    if 'responder' in args[0]:
+        return method(responder=recipient, **kwargs)
+    else:
+        return method(**kwargs)
+
+
+def main():
+    parser = ArgumentParser(prog='bench_router')
+    parser.add_argument('-n', '--number', type=int, default=100000)
+    args = parser.parse_args()
+
+    Logger.init(Logger.INFO)
+    app = create_app()
+
+    signals = [
+        ('wizard', 'now_speaking', {'text': 'Hello'}),
+        ('wizard', 'change_state', {'state': 1})]
+
+    for recipient, action, kwargs in signals:
+        legacy = timeit.timeit(
+            lambda: legacy_router(app, recipient, action, **kwargs),
+            number=args.number)
+        compiled = timeit.timeit(
+            lambda: app.router(recipient, action, **kwargs),
+            number=args.number)
+
+        print('%-30s legacy %8.3f µs  compiled %8.3f µs  (%.1f× faster)' % (
+            '%s.%s' % (recipient, action),
+            legacy / args.number * 1e6,
+            compiled / args.number * 1e6,
+            legacy / compiled))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,821 @@
+#!/usr/bin/env python
+
+"""
+Stand-ins for an ActiveMQ/STOMP server and the voice user interface
+(VUI) at the other end of the `activeMQ` voice, so it can be run and
+benchmarked without either.
+
+`StompBroker` is a small STOMP 1.2 server (asyncio) that supports
+what NottReal needs: queues with any number of subscribers (each
+message is delivered to one of them in turn, or kept until there is
+one), receipts and heart-beats. `VUIDevice` subscribes to the queue
+NottReal sends messages to, and replies with the `message_state_*`
+messages configured in `settings.cfg` (with the `correlation-id` of
+each message), after configurable delays.
+
+To use them with NottReal (set the `host` and `port` in the
+`[ActiveMQ]` section of `settings.cfg` to match), run from the
+repository root:
+    python benchmarks/stomp_standin.py [-c CONFIG_DIR] [--port PORT]
+        [--speaking_delay SECONDS] [--talk_time SECONDS]
+        [--buffer_replies]
+"""
+
+from argparse import ArgumentParser
+from collections import deque
+
+import asyncio
+import configparser
+import itertools
+import os
+import re
+import threading
+
+
+class Frame:
+    """
+    A STOMP frame
+
+    Variables:
+        ENCODING {str} -- Encoding of headers and bodies
+        UNESCAPED_COMMANDS {set(str)} -- Commands whose headers are
+                                         not escaped
+        VERSIONS {[str]} -- Supported versions of STOMP
+    """
+    ENCODING = 'utf-8'
+    UNESCAPED_COMMANDS = {'CONNECT', 'CONNECTED'}
+    VERSIONS = ['1.0', '1.1', '1.2']
+
+    _ESCAPES = {'\\': '\\\\', '\n': '\\n', '\r': '\\r', ':': '\\c'}
+    _UNESCAPES = {v: k for k, v in _ESCAPES.items()}
+    _RE_ESCAPED = re.compile(r'\\[\\nrc]')
+
+    def __init__(self, command, headers=None, body=''):
+        """
+        Create a frame
+
+        Arguments:
+            command {str} -- Command (e.g. SEND)
+
+        Keyword arguments:
+            headers {dict(str,str)} -- Headers
+            body {str} -- Body
+        """
+        self.command = command
+        self.headers = headers or {}
+        self.body = body
+
+    def encode(self):
+        """
+        Encode the frame to send
+
+        Returns:
+            {bytes}
+        """
+        escape = self.command not in self.UNESCAPED_COMMANDS
+        body = self.body.encode(self.ENCODING)
+
+        lines = [self.command]
+        for key, value in self.headers.items():
+            if key == 'content-length':
+                continue
+            if escape:
+                key, value = self._escape(key), self._escape(value)
+            lines.append('%s:%s' % (key, value))
+        if body:
+            lines.append('content-length:%d' % len(body))
+
+        return ('\n'.join(lines) + '\n\n').encode(self.ENCODING) \
+            + body + b'\0'
+
+    @classmethod
+    async def read(cls, reader):
+        """
+        Read the next frame (skipping heart-beats)
+
+        Arguments:
+            reader {asyncio.StreamReader} -- Stream to read
+
+        Returns:
+            {Frame} -- {None} if the stream has closed
+
+        Raises:
+            asyncio.IncompleteReadError -- If the stream closes
+                                           within a frame
+            ValueError -- If the frame is not valid
+        """
+        while True:
+            line = await reader.readline()
+            if not line:
+                return None
+            line = line.rstrip(b'\r\n')
+            if line:
+                break
+
+        command = line.decode(cls.ENCODING)
+        escape = command not in cls.UNESCAPED_COMMANDS
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if not line:
+                return None
+            line = line.rstrip(b'\r\n').decode(cls.ENCODING)
+            if not line:
+                break
+
+            key, _, value = line.partition(':')
+            if escape:
+                key, value = cls._unescape(key), cls._unescape(value)
+            headers.setdefault(key, value)
+
+        if 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+            await reader.readexactly(1)
+        else:
+            body = (await reader.readuntil(b'\0'))[:-1]
+
+        return cls(command, headers, body.decode(cls.ENCODING))
+
+    @classmethod
+    def _escape(cls, value):
+        """
+        Escape a header's key or value
+
+        Arguments:
+            value {str} -- Key or value
+
+        Returns:
+            {str}
+        """
+        return ''.join(cls._ESCAPES.get(c, c) for c in str(value))
+
+    @classmethod
+    def _unescape(cls, value):
+        """
+        Unescape a header's key or value
+
+        Arguments:
+            value {str} -- Key or value
+
+        Returns:
+            {str}
+        """
+        return cls._RE_ESCAPED.sub(
+            lambda match: cls._UNESCAPES[match.group(0)],
+            value)
+
+    def __str__(self):
+        return '<[Frame] %s %s: %s>' % (self.command, self.headers, self.body)
+
+
+class StompBroker:
+    """
+    A STOMP server with queues only. Each message sent to a queue is
+    delivered to one of its subscribers in turn, or kept until there
+    is one. Messages that haven't been delivered are kept when the
+    broker restarts (as if they were persistent).
+    """
+    SERVER = 'NottReal-standin/1.0'
+
+    def __init__(self, host='127.0.0.1', port=0):
+        """
+        Create the broker (call {start} to start it)
+
+        Keyword arguments:
+            host {str} -- Host to listen on
+            port {int} -- Port to listen on (default: {0}, any)
+        """
+        self.host = host
+        self.port = port
+
+        self.received = 0
+        self.delivered = 0
+
+        self._server = None
+        self._sessions = set()
+        self._subscribers = {}
+        self._pending = {}
+        self._message_ids = itertools.count()
+
+    async def start(self):
+        """
+        Start listening for connections
+        """
+        self._server = await asyncio.start_server(
+            self._serve,
+            self.host,
+            self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """
+        Stop listening and close every connection
+        """
+        if self._server is None:
+            return
+
+        self._server.close()
+        for session in list(self._sessions):
+            self._disconnect(session)
+        await self._server.wait_closed()
+        self._server = None
+
+    async def restart(self, downtime=0.):
+        """
+        Stop the broker, then start it again on the same port
+
+        Keyword arguments:
+            downtime {float} -- Seconds to wait before starting again
+        """
+        await self.stop()
+        await asyncio.sleep(downtime)
+        await self.start()
+
+    async def _serve(self, reader, writer):
+        """
+        Handle the frames from a client until it disconnects
+
+        Arguments:
+            reader {asyncio.StreamReader} -- Stream from the client
+            writer {asyncio.StreamWriter} -- Stream to the client
+        """
+        session = _Session(writer)
+        self._sessions.add(session)
+        try:
+            while True:
+                frame = await Frame.read(reader)
+
+                # frames already read are ignored once the broker has
+                # disconnected the client (e.g. when it's stopped)
+                if frame is None \
+                        or session not in self._sessions \
+                        or not self._handle(session, frame):
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._disconnect(session)
+
+    def _handle(self, session, frame):
+        """
+        Handle a frame from a client
+
+        Arguments:
+            session {_Session} -- Client
+            frame {Frame} -- Frame from the client
+
+        Returns:
+            {bool} -- {False} if the client should be disconnected
+        """
+        headers = frame.headers
+        command = frame.command
+
+        if command in ('CONNECT', 'STOMP'):
+            accepted = headers.get('accept-version', '1.0').split(',')
+            version = max(
+                (v for v in Frame.VERSIONS if v in accepted),
+                default='1.0')
+
+            client_sends, client_receives = (
+                int(beat) for beat
+                in headers.get('heart-beat', '0,0').split(','))
+            session.start_heartbeats(client_receives / 1e3)
+
+            session.send(Frame('CONNECTED', {
+                'version': version,
+                'heart-beat': '%d,0' % client_receives,
+                'server': self.SERVER}))
+        elif command == 'SUBSCRIBE':
+            destination = headers['destination']
+            subscription = (session, headers.get('id', destination))
+            session.subscriptions[subscription[1]] = destination
+            self._subscribers.setdefault(destination, deque()).append(
+                subscription)
+
+            pending = self._pending.pop(destination, ())
+            for message in pending:
+                self._route(destination, message)
+        elif command == 'UNSUBSCRIBE':
+            self._unsubscribe(session, headers.get('id'))
+        elif command == 'SEND':
+            self.received += 1
+            self._route(headers['destination'], frame)
+        elif command == 'DISCONNECT':
+            self._receipt(session, frame)
+            return False
+        elif command not in ('ACK', 'NACK', 'BEGIN', 'COMMIT', 'ABORT'):
+            session.send(Frame('ERROR', {
+                'message': 'Unknown command %s' % command}))
+            return False
+
+        self._receipt(session, frame)
+        return True
+
+    def _route(self, destination, frame):
+        """
+        Deliver a message to the next subscriber of a queue (or keep
+        it until there is one)
+
+        Arguments:
+            destination {str} -- Queue
+            frame {Frame} -- SEND frame
+        """
+        subscribers = self._subscribers.get(destination)
+        if not subscribers:
+            self._pending.setdefault(destination, deque()).append(frame)
+            return
+
+        session, subscription = subscribers[0]
+        subscribers.rotate(-1)
+
+        headers = {key: value for key, value in frame.headers.items()
+                   if key not in ('receipt', 'content-length')}
+        headers['subscription'] = subscription
+        headers['message-id'] = str(next(self._message_ids))
+        headers['destination'] = destination
+
+        session.send(Frame('MESSAGE', headers, frame.body))
+        self.delivered += 1
+
+    def _receipt(self, session, frame):
+        """
+        Send a receipt, if the client asked for one
+
+        Arguments:
+            session {_Session} -- Client
+            frame {Frame} -- Frame from the client
+        """
+        receipt = frame.headers.get('receipt')
+        if receipt is not None:
+            session.send(Frame('RECEIPT', {'receipt-id': receipt}))
+
+    def _unsubscribe(self, session, subscription):
+        """
+        Stop delivering messages to a subscription
+
+        Arguments:
+            session {_Session} -- Client
+            subscription {str} -- ID of the subscription
+        """
+        destination = session.subscriptions.pop(subscription, None)
+        subscribers = self._subscribers.get(destination)
+        if subscribers is not None:
+            try:
+                subscribers.remove((session, subscription))
+            except ValueError:
+                pass
+
+    def _disconnect(self, session):
+        """
+        Forget a client and close its connection
+
+        Arguments:
+            session {_Session} -- Client
+        """
+        if session not in self._sessions:
+            return
+
+        self._sessions.discard(session)
+        for subscription in list(session.subscriptions):
+            self._unsubscribe(session, subscription)
+        session.close()
+
+
+class _Session:
+    """
+    A client connected to the broker
+    """
+    def __init__(self, writer):
+        """
+        Create the session
+
+        Arguments:
+            writer {asyncio.StreamWriter} -- Stream to the client
+        """
+        self.writer = writer
+        self.subscriptions = {}
+        self._heartbeats = None
+
+    def send(self, frame):
+        """
+        Send a frame to the client
+
+        Arguments:
+            frame {Frame} -- Frame to send
+        """
+        if not self.writer.is_closing():
+            self.writer.write(frame.encode())
+
+    def start_heartbeats(self, interval):
+        """
+        Send heart-beats to the client
+
+        Arguments:
+            interval {float} -- Seconds between heart-beats (0 to not
+                                send any)
+        """
+        if interval > 0:
+            self._heartbeats = asyncio.ensure_future(
+                self._send_heartbeats(interval))
+
+    async def _send_heartbeats(self, interval):
+        """
+        Send heart-beats until the connection is closed
+
+        Arguments:
+            interval {float} -- Seconds between heart-beats
+        """
+        while not self.writer.is_closing():
+            self.writer.write(b'\n')
+            await asyncio.sleep(interval)
+
+    def close(self):
+        """
+        Close the connection
+        """
+        if self._heartbeats is not None:
+            self._heartbeats.cancel()
+        self.writer.close()
+
+
+class VUIDevice:
+    """
+    Stands in for the VUI at the other end of the `activeMQ` voice.
+    Messages are spoken one at a time: after a delay the device replies
+    that it's speaking, and after the talk time that it has finished
+    (with the `correlation-id` of the message). The interrupt message
+    stops the message being spoken and discards any waiting. If the
+    connection is lost, the device reconnects. Replies it couldn't send
+    while disconnected are lost (and counted), as a real VUI needn't
+    keep them, unless it's asked to buffer them until it reconnects.
+    """
+    RECONNECT_DELAY = .1
+
+    def __init__(self,
+                 host,
+                 port,
+                 cfg,
+                 speaking_delay=0.,
+                 talk_time=0.,
+                 finished_state='nothing',
+                 buffer_replies=False):
+        """
+        Create the device (call {run} to connect it)
+
+        Arguments:
+            host {str} -- Host of the broker
+            port {int} -- Port of the broker
+            cfg {ConfigParser} -- NottReal's settings
+
+        Keyword arguments:
+            speaking_delay {float} -- Seconds before replying that a
+                                      message is being spoken
+            talk_time {float} -- Seconds to speak each message
+            finished_state {str} -- State to reply with when a message
+                                    has been spoken (e.g. listening)
+            buffer_replies {bool} -- Send the replies that couldn't be
+                                     sent while disconnected once
+                                     reconnected, rather than losing
+                                     them
+        """
+        self.host = host
+        self.port = port
+        self.speaking_delay = speaking_delay
+        self.talk_time = talk_time
+        self.buffer_replies = buffer_replies
+
+        self.received = 0
+        self.spoken = 0
+        self.interrupted = 0
+        self.connections = 0
+        self.replies_lost = 0
+
+        self._listen_queue = cfg.get('ActiveMQ', 'destination_queue')
+        self._reply_queue = cfg.get('ActiveMQ', 'nottreal_queue')
+        self._username = cfg.get('ActiveMQ', 'username')
+        self._password = cfg.get('ActiveMQ', 'password')
+        self._interrupt = cfg.get('ActiveMQ', 'message_interrupt')
+
+        message_state = cfg.get('ActiveMQ', 'message_state')
+        self._state_speaking = message_state \
+            % cfg.get('ActiveMQ', 'message_state_speaking')
+        self._state_finished = message_state \
+            % cfg.get('ActiveMQ', 'message_state_%s' % finished_state)
+
+        self._writer = None
+        self._stopped = False
+        self._queue = None
+        self._speaking = None
+        self._unsent = deque()
+        self._received_ids = set()
+        self._finished_ids = set()
+        self._unfinished_ids = set()
+
+    async def run(self):
+        """
+        Connect to the broker and speak the messages sent to the VUI,
+        until {stop} is called
+        """
+        self._queue = asyncio.Queue()
+        speaker = asyncio.ensure_future(self._speak())
+        try:
+            while not self._stopped:
+                try:
+                    await self._connect_and_listen()
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    pass
+                self._writer = None
+                if not self._stopped:
+                    await asyncio.sleep(self.RECONNECT_DELAY)
+        finally:
+            speaker.cancel()
+
+    def delivered(self):
+        """
+        Number of different messages received (by their
+        `correlation-id`), as NottReal may send a message twice
+
+        Returns:
+            {int}
+        """
+        return len(self._received_ids)
+
+    def unreported(self):
+        """
+        Number of different messages that were spoken (or interrupted)
+        but whose finished reply was lost, so NottReal never heard that
+        they had been spoken
+
+        Returns:
+            {int}
+        """
+        return len(self._unfinished_ids - self._finished_ids)
+
+    def stop(self):
+        """
+        Disconnect from the broker
+        """
+        self._stopped = True
+        if self._writer is not None:
+            self._writer.close()
+
+    async def _connect_and_listen(self):
+        """
+        Connect to the broker and listen for messages until the
+        connection is closed
+        """
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        writer.write(Frame('CONNECT', {
+            'accept-version': '1.2',
+            'host': self.host,
+            'login': self._username,
+            'passcode': self._password}).encode())
+
+        frame = await Frame.read(reader)
+        if frame is None or frame.command != 'CONNECTED':
+            writer.close()
+            return
+
+        writer.write(Frame('SUBSCRIBE', {
+            'destination': self._listen_queue,
+            'id': 'vui',
+            'ack': 'auto'}).encode())
+        self._writer = writer
+        self.connections += 1
+
+        while self._unsent:
+            writer.write(self._unsent.popleft().encode())
+
+        while not self._stopped:
+            frame = await Frame.read(reader)
+            if frame is None:
+                break
+            if frame.command == 'MESSAGE':
+                self._on_message(frame)
+
+        writer.close()
+
+    def _on_message(self, frame):
+        """
+        Queue a message to speak, or interrupt speaking
+
+        Arguments:
+            frame {Frame} -- MESSAGE frame
+        """
+        self.received += 1
+        if frame.body != self._interrupt:
+            correlation_id = frame.headers.get('correlation-id')
+            if correlation_id is not None:
+                self._received_ids.add(correlation_id)
+            self._queue.put_nowait(frame)
+            return
+
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        if self._speaking is not None:
+            self._speaking.cancel()
+
+    async def _speak(self):
+        """
+        Speak the queued messages one at a time
+        """
+        while True:
+            frame = await self._queue.get()
+            self._speaking = asyncio.ensure_future(self._say(frame))
+            await asyncio.wait({self._speaking})
+            if self._speaking.cancelled():
+                self.interrupted += 1
+                self._reply(self._state_finished, frame)
+            else:
+                self.spoken += 1
+            self._speaking = None
+
+    async def _say(self, frame):
+        """
+        Speak a message
+
+        Arguments:
+            frame {Frame} -- MESSAGE frame
+        """
+        if self.speaking_delay:
+            await asyncio.sleep(self.speaking_delay)
+        self._reply(self._state_speaking, frame)
+
+        if self.talk_time:
+            await asyncio.sleep(self.talk_time)
+        self._reply(self._state_finished, frame)
+
+    def _reply(self, state, frame):
+        """
+        Send a state message to NottReal (lost if not connected, unless
+        replies are buffered until the device reconnects)
+
+        Arguments:
+            state {str} -- State message
+            frame {Frame} -- MESSAGE frame it's about
+        """
+        headers = {'destination': self._reply_queue}
+        correlation_id = frame.headers.get('correlation-id')
+        if correlation_id is not None:
+            headers['correlation-id'] = correlation_id
+
+        reply = Frame('SEND', headers, state)
+        finished = state == self._state_finished \
+            and correlation_id is not None
+
+        if self._writer is None or self._writer.is_closing():
+            if self.buffer_replies:
+                self._unsent.append(reply)
+            else:
+                self.replies_lost += 1
+                if finished:
+                    self._unfinished_ids.add(correlation_id)
+            return
+
+        self._writer.write(reply.encode())
+        if finished:
+            self._finished_ids.add(correlation_id)
+
+
+class StandinThread:
+    """
+    Runs a broker (and devices) in an event loop on a separate thread,
+    so they can be used alongside NottReal's threads
+    """
+    def __init__(self, broker):
+        """
+        Create the thread (call {start} to start it)
+
+        Arguments:
+            broker {StompBroker} -- Broker to run
+        """
+        self.broker = broker
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever)
+        self._thread.daemon = True
+        self._devices = []
+
+    def start(self):
+        """
+        Start the event loop and the broker
+        """
+        self._thread.start()
+        self.call(self.broker.start())
+
+    def add_device(self, device):
+        """
+        Connect a device to the broker
+
+        Arguments:
+            device {VUIDevice} -- Device to run
+        """
+        self._devices.append(device)
+        asyncio.run_coroutine_threadsafe(device.run(), self.loop)
+
+    def restart(self, downtime=0.):
+        """
+        Restart the broker (and wait until it has restarted)
+
+        Keyword arguments:
+            downtime {float} -- Seconds the broker is stopped for
+        """
+        self.call(self.broker.restart(downtime), timeout=downtime + 10)
+
+    def call(self, coroutine, timeout=10):
+        """
+        Run a coroutine in the event loop and wait for its result
+
+        Arguments:
+            coroutine {coroutine} -- Coroutine to run
+
+        Keyword arguments:
+            timeout {float} -- Seconds to wait
+
+        Returns:
+            {mixed} -- Result of the coroutine
+        """
+        return asyncio.run_coroutine_threadsafe(
+            coroutine,
+            self.loop).result(timeout)
+
+    def stop(self):
+        """
+        Stop the devices, the broker and the event loop
+        """
+        for device in self._devices:
+            self.loop.call_soon_threadsafe(device.stop)
+        self.call(self.broker.stop())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+
+def load_config(config_dir):
+    """
+    Load NottReal's settings
+
+    Arguments:
+        config_dir {str} -- Configuration directory
+
+    Returns:
+        {ConfigParser}
+    """
+    cfg = configparser.ConfigParser()
+    cfg.read(os.path.join(config_dir, 'settings.cfg'))
+    return cfg
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument(
+        '-c',
+        '--config_dir',
+        default='dist.nrc',
+        help='Configuration directory with the ActiveMQ settings')
+    parser.add_argument(
+        '-p',
+        '--port',
+        type=int,
+        default=None,
+        help='Port to listen on (default: from the settings)')
+    parser.add_argument(
+        '--speaking_delay',
+        type=float,
+        default=.1,
+        help='Seconds before the VUI replies that it\'s speaking')
+    parser.add_argument(
+        '--talk_time',
+        type=float,
+        default=1.,
+        help='Seconds the VUI speaks each message for')
+    parser.add_argument(
+        '--buffer_replies',
+        action='store_true',
+        help='Send the VUI\'s replies that couldn\'t be sent while '
+             'disconnected once it reconnects (default: lose them)')
+    args = parser.parse_args()
+
+    cfg = load_config(args.config_dir)
+    port = args.port or cfg.getint('ActiveMQ', 'port')
+
+    standin = StandinThread(StompBroker(port=port))
+    standin.start()
+    standin.add_device(VUIDevice(
+        '127.0.0.1',
+        standin.broker.port,
+        cfg,
+        speaking_delay=args.speaking_delay,
+        talk_time=args.talk_time,
+        buffer_replies=args.buffer_replies))
+
+    print('Listening on port %d (press Ctrl+C to stop)' % standin.broker.port)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+
+    standin.stop()
+
+
+if __name__ == '__main__':
+    main()
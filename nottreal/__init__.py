@@ -2,6 +2,7 @@
 
 from nottreal.utils.log import Logger
 from nottreal.utils.init import ArgparseUtils
+from nottreal.utils.profiler import StartupProfiler
 from nottreal.app import App
 
 from argparse import ArgumentParser
@@ -9,20 +10,23 @@ from argparse import ArgumentParser
 import glob
 import os
 import sys
+import time
 
 modules = glob.glob(os.path.join(os.path.dirname(__file__), '*.py'))
 __all__ = [os.path.basename(f)[:-3]
            for f in modules if not f.endswith('__init__.py')]
 
 
-def main():
-    """
-    Entry point for the application. Checks the command line arguments,
-    validates the configuration, and starts the GUI application.
+def parse_args(argv=None):
     """
-    # n.b. apps frozen with python3.8 get this far when
-    # double clicked (CLI opening is ok)
+    Check the command line arguments and validate the configuration
 
+    Keyword arguments:
+        argv {[str]} -- Arguments (default: {sys.argv})
+
+    Returns:
+        {Namespace}
+    """
     parser = ArgumentParser(prog='NottReal')
     parser.add_argument(
         '-l',
@@ -63,16 +67,66 @@ def main():
         default=False,
         action='store_true',
         help='Disable automatic state saving in config directory')
+    parser.add_argument(
+        '-st',
+        '--stats',
+        default=False,
+        action='store_true',
+        help='Record the latency of signals between components')
+    parser.add_argument(
+        '-hl',
+        '--headless',
+        default=False,
+        action='store_true',
+        help='Run without any windows (e.g. for automated testing)')
+    parser.add_argument(
+        '-tw',
+        '--time_warp',
+        default=1.,
+        type=ArgparseUtils.time_warp,
+        help=('Run the clock this many times faster than real time, '
+              'or 0 to not wait at all (e.g. for simulated sessions)'))
+    parser.add_argument(
+        '-ps',
+        '--profile-startup',
+        default=False,
+        action='store_true',
+        help='Time each phase of start-up and save a report')
+    parser.add_argument(
+        '--profile-pstats',
+        default=None,
+        help='Profile start-up with cProfile and save the stats to a file')
     parser.add_argument(
         '-dev',
         '--dev',
         action='store_true',
         help='Enable developer mode/disable catching of errors')
-    args = parser.parse_args()
+    return parser.parse_args(argv)
+
+
+def main():
+    """
+    Entry point for the application. Checks the command line arguments,
+    validates the configuration, and starts the GUI application.
+    """
+    # n.b. apps frozen with python3.8 get this far when
+    # double clicked (CLI opening is ok)
+    started = time.perf_counter()
+
+    args = parse_args()
+
+    StartupProfiler.init(
+        args.profile_startup,
+        started,
+        directory=args.output_dir or 'data',
+        pstats_path=args.profile_pstats)
+    StartupProfiler.record(
+        'Parsing arguments',
+        time.perf_counter() - started)
 
     Logger.init(getattr(Logger, args.log))
     Logger.info(__name__, "Hello, World")
-    Logger.info(__name__, str(sys.argv))
+    Logger.info(__name__, '%s', sys.argv)
 
     ArgparseUtils.init_darwin()
 
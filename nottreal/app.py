@@ -1,22 +1,201 @@
 
+from .utils.clock import Clock
 from .utils.init import ClassUtils
 from .utils.log import Logger
+from .utils.profiler import StartupProfiler
 from .models.m_cfg import ConfigModel
-from .views.v_gui import Gui
 from .controllers import c_abstract
 
 from collections import OrderedDict
 
 import inspect
 import sys
+import time
+
+
+class ControllerRegistry:
+    """
+    Controller classes, and the instances of those that have been
+    created. Controllers that are {ON_DEMAND} (e.g. voice and
+    recognition subsystems) are only instantiated when first
+    requested, so unused subsystems don't cost start-up time
+    or memory.
+    """
+    def __init__(self, nottreal, args, classes):
+        """
+        Create the registry (without importing or instantiating
+        anything)
+
+        Arguments:
+            nottreal {App} -- Application instance
+            args {[str]} -- Application arguments
+            classes {dict(str,str)} -- Modules of the controller
+                                       classes by class name
+        """
+        self.nottreal = nottreal
+        self.args = args
+        self._modules = classes
+        self._classes = {}
+        self._instances = {}
+
+    def names(self):
+        """
+        Class names of all controllers, whether imported or not
+
+        Returns:
+            {[str]}
+        """
+        return list(self._modules)
+
+    def cls(self, name):
+        """
+        Retrieve a controller class, importing its module if necessary
+
+        Arguments:
+            name {str} -- Class name of the controller
+
+        Returns:
+            {class} -- {None} if the class could not be imported
+        """
+        try:
+            return self._classes[name]
+        except KeyError:
+            pass
+
+        try:
+            cls = ClassUtils.load_class(name)
+        except ImportError as e:
+            Logger.critical(
+                __name__,
+                'Could not import "%s": %s',
+                name,
+                e)
+            cls = None
+
+        self._classes[name] = cls
+        return cls
+
+    def eager(self):
+        """
+        Names of the controllers to instantiate on start-up (from the
+        manifest, so on-demand controllers are not imported)
+
+        Returns:
+            {[str]}
+        """
+        return [name
+                for name in self._modules
+                if not ClassUtils.class_attribute(name, 'ON_DEMAND', False)]
+
+    def display_name(self, name):
+        """
+        Name of a controller to show the Wizard (its {NAME}, from the
+        manifest, so the controller is not imported)
+
+        Arguments:
+            name {str} -- Class name of the controller
+
+        Returns:
+            {str}
+        """
+        return ClassUtils.class_attribute(name, 'NAME', name)
+
+    def probe(self, name):
+        """
+        Can a controller be used on this machine? Its {PROBE_MODULES}
+        and {PROBE_PLATFORMS} are checked, from the manifest, so the
+        controller is not imported.
+
+        Arguments:
+            name {str} -- Class name of the controller
+
+        Returns:
+            {bool}
+        """
+        return ClassUtils.requirements_met(
+            ClassUtils.class_attribute(name, 'PROBE_MODULES', ''),
+            ClassUtils.class_attribute(name, 'PROBE_PLATFORMS', ''))
+
+    def is_loaded(self, name):
+        """
+        Has the controller been instantiated?
+
+        Arguments:
+            name {str} -- Class name of the controller
+
+        Returns:
+            {bool}
+        """
+        return name in self._instances
+
+    def get(self, name, default=None):
+        """
+        Retrieve a controller, instantiating it if necessary
+
+        Arguments:
+            name {str} -- Class name of the controller
+
+        Keyword arguments:
+            default {mixed} -- Returned if there is no such controller
+                               or it could not be instantiated
+
+        Returns:
+            {AbstractController}
+        """
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def __getitem__(self, name):
+        try:
+            return self._instances[name]
+        except KeyError:
+            if name not in self._modules:
+                raise
+
+        cls = self.cls(name)
+        if cls is None:
+            raise KeyError(name)
+
+        with StartupProfiler.phase('Constructing "%s"' % name):
+            if self.args.dev:
+                instance = cls(self.nottreal, self.args)
+            else:
+                try:
+                    instance = cls(self.nottreal, self.args)
+                except TypeError:
+                    Logger.error(
+                        __name__,
+                        '"%s" has invalid constructor arguments',
+                        name)
+                    raise KeyError(name)
+
+        Logger.debug(__name__, 'Loaded controller "%s"', name)
+        self._instances[name] = instance
+        return instance
+
+    def __contains__(self, name):
+        return name in self._modules
+
+    def __iter__(self):
+        return iter(self._modules)
+
+    def __len__(self):
+        return len(self._modules)
 
 
 class App:
-    def __init__(self, args):
+    def __init__(self, args, run_loop=True):
         """Create the controller for the application
 
         Arguments:
             args {[str]} -- Application arguments
+
+        Keyword arguments:
+            run_loop {bool} -- Run the UI loop and shutdown when it
+                               ends; otherwise call {run} or
+                               {shutdown} later (default: True)
         """
         Logger.debug(__name__, 'Welcome to NottReal')
 
@@ -25,47 +204,58 @@ class App:
         self.args = args
         self._controllers = {}
         self.responders = OrderedDict({'app': self})
+        self._routes = {}
+        self._broadcast = None
+        self._signal_stats = None
         self._quit_it = False
 
         # crash more willingly?
         if args.dev:
             Logger.info(__name__, 'Development mode is active')
 
+        # warp time? (e.g. to simulate a long session quickly)
+        Clock.init(args.time_warp)
+        if Clock.warped():
+            Logger.info(
+                __name__,
+                'Time is running at %gx real time',
+                args.time_warp)
+
         # config model (actually loaded by the Wizard controller)
         self.config = ConfigModel(args)
 
-        # initialise the controllers
-        classes = ClassUtils.load_all_subclasses(
+        # initialise the controllers (subsystems are only imported and
+        # instantiated when selected)
+        classes = ClassUtils.find_all_subclasses(
             'nottreal.controllers',
             c_abstract.AbstractController)
 
-        self.controllers = {}
-        for name, cls in classes.items():
-            if self.args.dev:
-                self.controllers[name] = cls(self, args)
-                Logger.debug(__name__, 'Loaded controller "%s"' % name)
-            else:
-                try:
-                    self.controllers[name] = cls(self, args)
-                    Logger.debug(__name__, 'Loaded controller "%s"' % name)
-                except TypeError:
-                    Logger.error(
-                        __name__,
-                        '"%s" has invalid constructor arguments' % (name))
+        self.controllers = ControllerRegistry(self, args, classes)
+        for name in self.controllers.eager():
+            instance = self.controllers.get(name)
+            if instance is None:
+                continue
 
-            respond_tos = self.controllers[name].respond_to()
+            respond_tos = instance.respond_to()
             if type(respond_tos) is list:
                 for repond_to in respond_tos:
-                    self.responder(repond_to, self.controllers[name])
+                    self.responder(repond_to, instance)
             elif type(respond_tos) is str:
-                self.responder(respond_tos, self.controllers[name])
+                self.responder(respond_tos, instance)
 
         # initialise the config
-        self.controllers['WizardController'].init_config()
+        with StartupProfiler.phase('Loading the configuration'):
+            self.controllers['WizardController'].init_config()
 
         # initialise the views
-        self.view = Gui(self, args)
-        self.view.init_ui()
+        with StartupProfiler.phase('Initialising the UI'):
+            if args.headless:
+                from .views.v_headless import Headless as View
+            else:
+                from .views.v_gui import Gui as View
+
+            self.view = View(self, args)
+            self.view.init_ui()
 
         # ready the controllers
         def filter_func(x):
@@ -84,20 +274,34 @@ class App:
             key=sort_func)
 
         for name in iter(responders_to_ready):
-            try:
-                self.router(name, 'ready')
-            except AttributeError:
-                pass
+            with StartupProfiler.phase('Readying "%s"' % name):
+                try:
+                    self.router(name, 'ready')
+                except AttributeError:
+                    pass
+
+        if run_loop:
+            self.run()
 
+    def run(self):
+        """Run the UI loop until the application quits"""
         # boom!
         if not self._quit_it:
-            Logger.info(__name__, self.appname + ' is running')
+            Logger.info(__name__, '%s is running', self.appname)
             self.view.run_loop()
 
-        # closing
+        self.shutdown()
+
+    def shutdown(self):
+        """Tell the controllers that the application is closing"""
         Logger.debug(__name__, 'Quitting the application')
         self.router('_', 'quit')
 
+        # the broadcast is handled by the first responder only, so the
+        # statistics are saved explicitly
+        if 'stats' in self.responders:
+            self.router('stats', 'quit')
+
     def quit(self):
         """Gracefully shutdown the application"""
         self.view.quit()
@@ -119,30 +323,48 @@ class App:
             responder_class = responder.__class__.__name__
             if name not in self.responders:
                 self.responders[name] = responder
+                self._invalidate_routes(name)
                 Logger.debug(
                     __name__,
-                    'Controller "%s" is handling "%s" signals'
-                    % (responder_class, name))
+                    'Controller "%s" is handling "%s" signals',
+                    responder_class,
+                    name)
             elif self.responders[name].relinquish(responder):
                 curr_class = self.responders[name].__class__.__name__
                 self.responders[name] = responder
+                self._invalidate_routes(name)
                 Logger.debug(
                     __name__,
                     'Controller "%s" is handling "%s" signals (taking over '
-                    'from "%s")' % (responder_class, name, curr_class))
+                    'from "%s")',
+                    responder_class,
+                    name,
+                    curr_class)
             else:
                 curr_class = self.responders[name].__class__.__name__
                 Logger.warning(
                     __name__,
                     'Controller "%s" requested to respond to "%s" signals, '
-                    'but rejected by current holder, "%s"'
-                    % (responder_class, name, curr_class))
+                    'but rejected by current holder, "%s"',
+                    responder_class,
+                    name,
+                    curr_class)
 
         try:
             return self.responders[name]
         except KeyError:
             raise KeyError('No responder named "%s"' % name)
 
+    def instrument(self, stats=None):
+        """
+        Record the latency of every routed signal, or stop recording
+
+        Keyword arguments:
+            stats {StatsCollection} -- Collection to record to, or
+                                       {None} to stop (default: None)
+        """
+        self._signal_stats = stats
+
     def router(self, recipient, action, **kwargs):
         """
         Route a message between elements the framework to a responder
@@ -152,54 +374,64 @@ class App:
             action {[str]} -- Message to pass
             **kwargs {[mixed]} -- Additional arguments to pass through
         """
-        responderInstances = {}
-        method = None
+        stats = self._signal_stats
+        if stats is None:
+            return self._dispatch(recipient, action, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            return self._dispatch(recipient, action, **kwargs)
+        finally:
+            stats.record(
+                '%s.%s' % (recipient, action),
+                time.perf_counter() - start)
+
+    def _dispatch(self, recipient, action, **kwargs):
+        """
+        Pass a message to the responder(s) (see {router})
 
+        Arguments:
+            recipient {str} -- Recipient responder
+            action {[str]} -- Message to pass
+            **kwargs {[mixed]} -- Additional arguments to pass through
+        """
         try:
             if recipient == '_':
-                responderInstances = {
-                    responder: self.responders[responder]
-                    for responder in self.responders.keys()
-                    if responder != 'app'
-                }
+                responders = self._broadcast_responders()
             else:
-                responderInstances[recipient] = self.responders[recipient]
+                responders = (recipient,)
+                self.responders[recipient]
         except KeyError as e:
             tb = sys.exc_info()[2]
             Logger.critical(
                 __name__,
-                'No responder for "%s": "%s"' % (recipient, repr(e)))
+                'No responder for "%s": "%s"',
+                recipient,
+                repr(e))
             raise e.with_traceback(tb)
 
-        for responder, responderInstance in responderInstances.items():
+        for responder in responders:
             if self.args.dev:
-                method = getattr(responderInstance, action)
+                method, pass_responder = self._route(responder, action)
 
-                args = inspect.getfullargspec(method)
-                if 'responder' in args[0]:
+                if pass_responder:
                     return method(responder=recipient, **kwargs)
                 else:
                     return method(**kwargs)
             else:
                 try:
-                    method = getattr(responderInstance, action)
+                    method, pass_responder = self._route(responder, action)
                     if method is None:
                         Logger.error(
                             __name__,
                             'No actor for the "%s" signal in the '
-                            'controller "%s"' % (action, responder)
+                            'controller "%s"',
+                            action,
+                            responder
                         )
                     else:
-                        Logger.debug(
-                            __name__,
-                            'Pass "%s" signal to the controller "%s"'
-                            % (action, responder)
-                        )
-
-                        args = inspect.getfullargspec(method)
-
                         try:
-                            if 'responder' in args[0]:
+                            if pass_responder:
                                 return method(responder=recipient, **kwargs)
                             else:
                                 return method(**kwargs)
@@ -207,7 +439,9 @@ class App:
                             Logger.error(
                                 __name__,
                                 'Actor for "%s" signal in the controller "%s"'
-                                ' is not type-compatible' % (action, responder)
+                                ' is not type-compatible',
+                                action,
+                                responder
                             )
                 except SystemExit:
                     pass
@@ -215,5 +449,75 @@ class App:
                     Logger.error(
                         __name__,
                         'Error calling the "%s" action on "%s": '
-                        '"%s"' % (action, responder, repr(e))
+                        '"%s"',
+                        action,
+                        responder,
+                        repr(e)
                     )
+
+    def _route(self, responder, action):
+        """
+        Retrieve the bound method for an action on a responder, and
+        whether it accepts the name of the responder. Routes are
+        compiled on first use and cached until the responder changes.
+
+        Arguments:
+            responder {str} -- Name of the responder
+            action {str} -- Action to be called
+
+        Raises:
+            KeyError -- If there is no such responder
+            AttributeError -- If the responder has no such action
+
+        Returns:
+            {(method, bool)} -- Bound method and {True} if the method
+                                takes a `responder` argument
+        """
+        try:
+            return self._routes[(responder, action)]
+        except KeyError:
+            pass
+
+        method = getattr(self.responders[responder], action)
+        if method is None:
+            return (None, False)
+
+        args = inspect.getfullargspec(method)
+        route = (method, 'responder' in args[0])
+        self._routes[(responder, action)] = route
+
+        Logger.debug(
+            __name__,
+            'Routing "%s" signals to the controller "%s"',
+            action,
+            responder)
+
+        return route
+
+    def _broadcast_responders(self):
+        """
+        Names of the responders that receive broadcast ("_") signals
+
+        Returns:
+            {(str)}
+        """
+        if self._broadcast is None:
+            self._broadcast = tuple(
+                responder
+                for responder in self.responders.keys()
+                if responder != 'app')
+        return self._broadcast
+
+    def _invalidate_routes(self, name):
+        """
+        Forget compiled routes for a responder (e.g. because a
+        different controller is now handling its signals)
+
+        Arguments:
+            name {str} -- Name of the responder
+        """
+        self._routes = {
+            key: route
+            for key, route in self._routes.items()
+            if key[0] != name}
+        self._broadcast = None
@@ -3,6 +3,15 @@ import abc
 
 
 class AbstractController:
+    """
+    Variables:
+        ON_DEMAND {bool} -- Only instantiate the controller when it is
+                            first requested (e.g. a voice subsystem
+                            that is selected by the Wizard), rather
+                            than when the application starts
+    """
+    ON_DEMAND = False
+
     def __init__(self, nottreal, args):
         """
         Abstract controller class. All controllers should inherit
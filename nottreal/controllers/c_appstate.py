@@ -119,7 +119,7 @@ class AppStateController(AbstractController):
             {bool} -- {True} if app state saving state was changed
         """
         if ((self._enablable and value) or not value) and not self._force_off:
-            Logger.info(__name__, 'Set app state saving to %r' % value)
+            Logger.info(__name__, 'Set app state saving to %r', value)
             return True
         else:
             Logger.error(
@@ -209,7 +209,8 @@ class AppStateController(AbstractController):
                 if state_file:
                     Logger.info(
                         __name__,
-                        'Set app state file to "%s"' % self._filepath)
+                        'Set app state file to "%s"',
+                        self._filepath)
 
                     self._enablable = True
 
@@ -223,7 +224,8 @@ class AppStateController(AbstractController):
         except IOError:
             Logger.warning(
                 __name__,
-                'Failed to open "%s" to save app state' % self._filepath)
+                'Failed to open "%s" to save app state',
+                self._filepath)
 
             self._enablable = False
             self._opt_enabled.change(False)
@@ -275,8 +277,8 @@ class AppStateController(AbstractController):
                     except TypeError:
                         Logger.warning(
                             __name__,
-                            'Cannot update UI for option "%s"'
-                            % option.key)
+                            'Cannot update UI for option "%s"',
+                            option.key)
 
     def _write_state(self):
         """
@@ -287,7 +289,8 @@ class AppStateController(AbstractController):
 
         Logger.debug(
             __name__,
-            'Saving application state to "%s"' % self._filepath)
+            'Saving application state to "%s"',
+            self._filepath)
         with open(self._filepath, mode='w') as state_file:
             json.dump(self._state_data, state_file)
 
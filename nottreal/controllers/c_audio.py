@@ -0,0 +1,348 @@
+from ..utils.log import Logger
+from ..models.m_audio import Playback
+from .c_abstract import AbstractController
+
+from collections import deque
+
+import importlib
+import threading
+import time
+
+
+class AudioOutputController(AbstractController):
+    """
+    Play audio in NottReal for the voice subsystems, so they don't need
+    to start a process (or open the audio device) for each utterance.
+
+    One output stream is kept open (and reopened only if the format of
+    the audio changes). Voice subsystems queue audio with {play}, and
+    a thread writes it to the stream, a chunk at a time, so it can be
+    stopped straight away with {flush}. The queue is a {deque}, so
+    queuing audio never waits for the thread writing it.
+
+    PyAudio (as used by the {InputController}) is only loaded, and
+    the thread started, when a voice subsystem first plays audio (or
+    checks it can), and never when NottReal is headless.
+
+    Extends:
+        AbstractController
+
+    Variables:
+        CHUNK_FRAMES {int} -- Frames written to the stream at once
+    """
+    CHUNK_FRAMES = 1024
+
+    def __init__(self, nottreal, args):
+        """
+        Controller to play audio
+
+        Arguments:
+            nottreal {App} -- Application instance
+            args {[str]} -- Application arguments
+        """
+        super().__init__(nottreal, args)
+
+        self._queue = deque()
+        self._queued = threading.Event()
+        self._flushes = 0
+        self._stop = False
+
+        self._pyaudio = None
+        self._audio = None
+        self._stream = None
+        self._stream_format = None
+        self._stream_capacity = 0
+        self._thread = None
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def respond_to(self):
+        """
+        This class will handle "audio" commands
+
+        Returns:
+            str -- Label for this controller
+        """
+        return 'audio'
+
+    def ready_order(self, responder=None):
+        """
+        Ready before the voice subsystems, so they can play audio as
+        soon as they're initialised
+
+        Arguments:
+            responder {str} -- Ignored
+        """
+        return 20
+
+    def ready(self, responder=None):
+        """
+        Nothing to do until audio is first played
+
+        Arguments:
+            responder {str} -- Ignored
+        """
+        pass
+
+    def quit(self):
+        """
+        Stop playing audio and close the audio output
+        """
+        with self._start_lock:
+            self._started = True
+
+        if self._thread is None:
+            return
+
+        self._stop = True
+        self.flush()
+        self._thread.join()
+        self._thread = None
+
+        self._audio.terminate()
+
+    def available(self):
+        """
+        Can audio be played? The audio library is loaded the first
+        time this is checked (or audio is played).
+
+        Returns:
+            {bool}
+        """
+        self._start()
+        return self._thread is not None
+
+    def play(self,
+             frames,
+             width,
+             channels,
+             rate,
+             on_start=None,
+             on_end=None):
+        """
+        Queue audio to be played after any audio already queued
+
+        Arguments:
+            frames {bytes-like} -- Interleaved PCM samples (not copied,
+                                   e.g. a mapped {WavFile})
+            width {int} -- Bytes per sample
+            channels {int} -- Number of channels
+            rate {int} -- Samples per second
+
+        Keyword arguments:
+            on_start {callable} -- Called with the timestamp of when
+                                   the audio starts playing
+            on_end {callable} -- Called with the timestamp of when the
+                                 audio finished playing ({None} if it
+                                 never started) and whether it was
+                                 interrupted
+
+        Returns:
+            {Playback} -- Audio that was queued, or {None} if audio
+                          can't be played
+        """
+        if not self.available():
+            return None
+
+        playback = Playback(
+            frames,
+            width,
+            channels,
+            rate,
+            on_start=on_start,
+            on_end=on_end)
+        self._queue.append((self._flushes, playback))
+        self._queued.set()
+        return playback
+
+    def flush(self):
+        """
+        Stop the audio that is playing, and drop the audio that is
+        queued
+        """
+        self._flushes += 1
+
+        dropped = 0
+        while True:
+            try:
+                _, playback = self._queue.popleft()
+            except IndexError:
+                break
+            playback.finish(None, interrupted=True)
+            dropped += 1
+
+        self._queued.set()
+        Logger.debug(
+            __name__,
+            'Flushed the audio output (dropped %d queued)',
+            dropped)
+
+    def _start(self):
+        """
+        Open the audio library and start the thread that plays the
+        audio, unless this has already been tried (or NottReal is
+        headless)
+        """
+        if self._started:
+            return
+
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+
+            if self.args.headless:
+                Logger.debug(__name__, 'No audio output when headless')
+                return
+
+            Logger.debug(__name__, 'Loading "pyaudio" module')
+            try:
+                self._pyaudio = importlib.import_module('pyaudio')
+                self._audio = self._pyaudio.PyAudio()
+            except (ImportError, OSError) as e:
+                Logger.warning(
+                    __name__,
+                    'No audio output, as PyAudio could not be loaded: %s',
+                    e)
+                return
+
+            thread = threading.Thread(target=self._play_loop)
+            thread.daemon = True
+            thread.start()
+            self._thread = thread
+
+    def _play_loop(self):
+        """
+        Play the queued audio. Run this in a separate thread.
+        """
+        Logger.debug(__name__, 'Audio output thread started')
+
+        while not self._stop:
+            try:
+                flushes, playback = self._queue.popleft()
+            except IndexError:
+                self._queued.wait()
+                self._queued.clear()
+                continue
+
+            self._play(playback, flushes)
+
+        self._close_stream()
+        Logger.debug(__name__, 'Audio output thread finished')
+
+    def _play(self, playback, flushes):
+        """
+        Write audio to the output stream, a chunk at a time, until it
+        has all been written or the output is flushed. Timestamps
+        include the latency of the output stream, so are when the
+        audio is heard.
+
+        Arguments:
+            playback {Playback} -- Audio to play
+            flushes {int} -- Number of times the output had been
+                             flushed when the audio was queued
+        """
+        stream = self._open_stream(playback.audio_format())
+        if stream is None:
+            playback.finish(None, interrupted=True)
+            return
+
+        latency = stream.get_output_latency()
+        frames = playback.frames
+        step = self.CHUNK_FRAMES * playback.channels * playback.width
+        interrupted = False
+
+        try:
+            for offset in range(0, len(frames), step):
+                if self._flushes != flushes:
+                    interrupted = True
+                    break
+
+                if offset == 0:
+                    playback.start(time.perf_counter() + latency)
+
+                stream.write(frames[offset:offset + step])
+        except OSError as e:
+            Logger.error(__name__, 'Could not play audio: %s', e)
+            self._close_stream()
+            interrupted = True
+
+        ended_at = None
+        if playback.started_at is not None:
+            ended_at = time.perf_counter() + latency \
+                + self._buffered_frames(stream) / playback.rate
+        playback.finish(ended_at, interrupted)
+
+    def _buffered_frames(self, stream):
+        """
+        Number of frames written to the output stream that it hasn't
+        played yet
+
+        Arguments:
+            stream {pyaudio.Stream} -- Output stream
+
+        Returns:
+            {int}
+        """
+        try:
+            return max(0, self._stream_capacity - stream.get_write_available())
+        except OSError:
+            return 0
+
+    def _open_stream(self, audio_format):
+        """
+        Open the output stream in a format, unless it's already open
+        in that format
+
+        Arguments:
+            audio_format {(int, int, int)} -- Bytes per sample,
+                                              channels and rate
+
+        Returns:
+            {pyaudio.Stream} -- {None} if it couldn't be opened
+        """
+        if self._stream is not None and self._stream_format == audio_format:
+            return self._stream
+
+        self._close_stream()
+
+        width, channels, rate = audio_format
+        try:
+            self._stream = self._audio.open(
+                format=self._audio.get_format_from_width(width),
+                channels=channels,
+                rate=rate,
+                output=True,
+                frames_per_buffer=self.CHUNK_FRAMES)
+        except (OSError, ValueError) as e:
+            Logger.error(__name__, 'Could not open the audio output: %s', e)
+            return None
+
+        self._stream_format = audio_format
+        try:
+            self._stream_capacity = self._stream.get_write_available()
+        except OSError:
+            self._stream_capacity = 0
+
+        Logger.debug(
+            __name__,
+            'Opened the audio output (%d-bit, %d channels, %d Hz)',
+            width * 8,
+            channels,
+            rate)
+        return self._stream
+
+    def _close_stream(self):
+        """
+        Close the output stream (if open)
+        """
+        if self._stream is None:
+            return
+
+        try:
+            self._stream.close()
+        except OSError:
+            pass
+        self._stream = None
+        self._stream_format = None
+        self._stream_capacity = 0
@@ -1,10 +1,9 @@
 
+from ..utils.clock import Clock
 from ..utils.log import Logger
 from ..models.m_mvc import WizardAlert, WizardOption
 from .c_abstract import AbstractController
 
-from datetime import datetime
-
 import os
 
 
@@ -116,6 +115,30 @@ class DataRecorderController(AbstractController):
         """
         return 'data'
 
+    def directory(self):
+        """
+        The data recording directory
+
+        Returns:
+            {str} -- {None} if not yet set
+        """
+        try:
+            return self._opt_dir.value
+        except AttributeError:
+            return None
+
+    def recording(self):
+        """
+        Is data being recorded to the data directory?
+
+        Returns:
+            {bool}
+        """
+        try:
+            return self._enablable and bool(self._opt_enabled.value)
+        except AttributeError:
+            return False
+
     def enable_data_output(self, value):
         """
         Enable/disable data recording (if possible)
@@ -129,7 +152,8 @@ class DataRecorderController(AbstractController):
         if self._enablable:
             Logger.info(
                 __name__,
-                'Set data recording to %r' % value)
+                'Set data recording to %r',
+                value)
 
             self.router(
                 'wizard',
@@ -183,7 +207,7 @@ class DataRecorderController(AbstractController):
             {bool} -- {True} if the data recording directory was
                       changed
         """
-        timestamp = datetime.now().strftime(self.TIMESTAMP_FORMAT)
+        timestamp = Clock.now().strftime(self.TIMESTAMP_FORMAT)
         path = '%s%s%s' % (self.FILE_PREFIX, timestamp, self.FILE_EXT)
         filepath = os.path.join(new_dir, path)
 
@@ -195,7 +219,8 @@ class DataRecorderController(AbstractController):
                 self._file = file_object
                 Logger.info(
                     __name__,
-                    'Set data file to "%s"' % filepath)
+                    'Set data file to "%s"',
+                    filepath)
 
                 self._enablable = True
                 self._init_enabled = True
@@ -203,7 +228,8 @@ class DataRecorderController(AbstractController):
         except IOError:
             Logger.warning(
                 __name__,
-                'Failed to open "%s" to record data' % filepath)
+                'Failed to open "%s" to record data',
+                filepath)
 
             self._enablable = False
             self._init_enabled = False
@@ -233,9 +259,9 @@ class DataRecorderController(AbstractController):
 
         Logger.debug(
             __name__,
-            'Log event for "%s" with message "%s"' % (id, text))
+            'Log event for "%s" with message "%s"', id, text)
 
-        timestamp = datetime.now().strftime(self.TIMESTAMP_FORMAT)
+        timestamp = Clock.now().strftime(self.TIMESTAMP_FORMAT)
         print(
             '%s\t_Event\t%s\t\t%s' % (timestamp, id, text),
             file=self._file,
@@ -251,7 +277,7 @@ class DataRecorderController(AbstractController):
         if not self._opt_enabled.value:
             return
 
-        timestamp = datetime.now().strftime(self.TIMESTAMP_FORMAT)
+        timestamp = Clock.now().strftime(self.TIMESTAMP_FORMAT)
         print(
             '%s\t_Transcribed\t\t\t\t%s' % (timestamp, text),
             file=self._file,
@@ -267,12 +293,51 @@ class DataRecorderController(AbstractController):
         if not self._opt_enabled.value:
             return
 
-        timestamp = datetime.now().strftime(self.TIMESTAMP_FORMAT)
+        timestamp = Clock.now().strftime(self.TIMESTAMP_FORMAT)
         print(
             '%s\t\t\t\t%s' % (timestamp, text),
             file=self._file,
             flush=True)
 
+    def expired_message(self, text):
+        """
+        Record some text that was dropped from the queue without being
+        spoken, as it had been queued for too long
+
+        Arguments:
+            text {str} -- Text not spoken
+        """
+        if not self._opt_enabled.value:
+            return
+
+        timestamp = Clock.now().strftime(self.TIMESTAMP_FORMAT)
+        print(
+            '%s\t_Expired\t\t\t%s' % (timestamp, text),
+            file=self._file,
+            flush=True)
+
+    def latency(self, text, trace):
+        """
+        Record the time taken by each stage of an utterance to the
+        data log (in milliseconds)
+
+        Arguments:
+            text {str} -- Text spoken
+            trace {LatencyTrace} -- Timings of the utterance
+        """
+        if not self._opt_enabled.value:
+            return
+
+        durations = {stage: round(duration * 1e3, 3)
+                     for stage, duration in trace.durations().items()}
+        durations['total'] = round(trace.total() * 1e3, 3)
+
+        timestamp = Clock.now().strftime(self.TIMESTAMP_FORMAT)
+        print(
+            '%s\t_Latency\t\t%s\t%s' % (timestamp, durations, text),
+            file=self._file,
+            flush=True)
+
     def sent_prepared_message(self, text, cat, id, slots):
         """
         Record some text being spoken to the data log that was from a
@@ -287,7 +352,7 @@ class DataRecorderController(AbstractController):
         if not self._opt_enabled.value:
             return
 
-        timestamp = datetime.now().strftime(self.TIMESTAMP_FORMAT)
+        timestamp = Clock.now().strftime(self.TIMESTAMP_FORMAT)
         print(
             '%s\t%s\t%s\t%s\t%s' % (timestamp, cat, id, slots, text),
             file=self._file,
@@ -3,8 +3,6 @@ from ..utils.log import Logger
 from ..models.m_mvc import WizardAlert, WizardOption
 from .c_abstract import AbstractController
 
-from speech_recognition import Microphone
-
 import importlib
 import audioop
 import threading
@@ -34,6 +32,10 @@ class InputController(AbstractController):
         self._num_callbacks = 0
         self._callbacks_volume = {}
 
+        self.source = None
+        self.devices = {}
+        self._thread = None
+
     def open_portaudio_installation(self):
         webbrowser.open_new_tab(
             'https://people.csail.mit.edu/hubert/pyaudio/#downloads')
@@ -50,6 +52,9 @@ class InputController(AbstractController):
 
     def ready(self):
         """Set the default input source"""
+        if self.args.headless:
+            Logger.info(__name__, 'No input sources when headless')
+            return
 
         Logger.debug(__name__, 'Loading "pyaudio" module')
         try:
@@ -57,7 +62,8 @@ class InputController(AbstractController):
         except ImportError as e:
             Logger.critical(
                 __name__,
-                'It seems Portaudio isn\'t installed: "%s"' % str(e))
+                'It seems Portaudio isn\'t installed: "%s"',
+                e)
 
             button_install_info = WizardAlert.Button(
                     key='pyaudio_install',
@@ -86,11 +92,10 @@ class InputController(AbstractController):
             self.router('wizard', 'show_alert', alert=alert)
             sys.exit(-1)
 
+        Microphone = importlib.import_module('speech_recognition').Microphone
         self.source = Microphone()
         self._pyaudio = self.source.pyaudio_module
-        self._thread = None
 
-        self.devices = {}
         audio = self._pyaudio.PyAudio()
         for i in range(audio.get_device_count()):
             device = audio.get_device_info_by_index(i)
@@ -101,7 +106,8 @@ class InputController(AbstractController):
 
         Logger.debug(
             __name__,
-            'Found input sources: %s' % str(self.devices)
+            'Found input sources: %s',
+            self.devices
             )
 
         self._vol_sensitivity = self.nottreal.config.cfg().getint(
@@ -136,7 +142,8 @@ class InputController(AbstractController):
         """
         Logger.info(
             __name__,
-            'Set input source to "%s"' % self.devices[device])
+            'Set input source to "%s"',
+            self.devices[device])
 
         self.selected_device = device
         self._swap_to_device = device
@@ -176,6 +183,10 @@ class InputController(AbstractController):
         """
         Starts the thread for listening to the input source.
         """
+        if self.source is None:
+            Logger.warning(__name__, 'No input source to listen to')
+            return
+
         if self._thread is not None:
             Logger.error(__name__, 'Already listening on another thread')
             return
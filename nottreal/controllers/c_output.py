@@ -53,7 +53,7 @@ class OutputController(AbstractController):
             try:
                 self.nottreal.view.output[output.lower()].toggle_visibility()
             except KeyError:
-                Logger.error(__name__, 'No output view "%s"' % output)
+                Logger.error(__name__, 'No output view "%s"', output)
 
     def toggle_maximise(self, output):
         """
@@ -65,7 +65,7 @@ class OutputController(AbstractController):
         try:
             self.nottreal.view.output[output.lower()].toggle_fullscreen()
         except KeyError:
-            Logger.error(__name__, 'No output view "%s"' % output)
+            Logger.error(__name__, 'No output view "%s"', output)
 
     def now_speaking(self, text=None, orb=1):
         """
@@ -4,7 +4,6 @@ from ..utils.init import ClassUtils
 from ..models.m_mvc import VUIState, WizardOption
 from .c_abstract import AbstractController
 
-import abc
 import sys
 
 
@@ -122,10 +121,19 @@ class RecognitionController(AbstractController):
         return True
 
     def available_recognisers(self):
-        return {c: self.nottreal.controllers[c].name()
-                for k, c in enumerate(self.nottreal.controllers)
-                if c.startswith('Recognition')
-                and ClassUtils.is_subclass(c, AbstractRecognitionController)}
+        """
+        Recognition subsystems (without instantiating them)
+
+        Returns:
+            {dict(str,str)} -- Names of the subsystems by class name
+        """
+        controllers = self.nottreal.controllers
+        recognisers = [
+            c for c in controllers
+            if c.startswith('Recognition')
+            and ClassUtils.is_subclass(c, AbstractRecognitionController)]
+
+        return {c: controllers.display_name(c) for c in recognisers}
 
     def now_listening(self):
         """Does nothing as no recogniser is set"""
@@ -159,7 +167,8 @@ class RecognitionController(AbstractController):
         """
         Logger.info(
             __name__,
-            'Set voice recognition to "%s"' % recogniser)
+            'Set voice recognition to "%s"',
+            recogniser)
 
         previous_instance = self.recogniser_instance
         try:
@@ -205,11 +214,20 @@ class RecognitionController(AbstractController):
 
 class AbstractRecognitionController(AbstractController):
     """
-    Base voice recognition library that handles the mic and setup
+    Base voice recognition library that handles the mic and setup.
+    Recognisers are only instantiated once they are selected.
 
     Extends:
         AbstractVoiceSystem
+
+    Variables:
+        NAME {str} -- Name of the recogniser shown to the Wizard (a
+                      class attribute, so the menu of recognisers can
+                      be built from the manifest)
     """
+    ON_DEMAND = True
+    NAME = 'Unimplemented recogniser'
+
     def __init__(self, nottreal, args):
         """
         Create the thread that sends audio and receives responses
@@ -264,9 +282,9 @@ class AbstractRecognitionController(AbstractController):
         """
         self.stop_recognising(on_complete=on_complete)
 
-    @abc.abstractmethod
-    def name(self):
-        return 'Unimplemented recogniser'
+    @classmethod
+    def name(cls):
+        return cls.NAME
 
     def relinquish(self, instance):
         """
@@ -301,7 +319,8 @@ class AbstractRecognitionController(AbstractController):
         """
         Logger.debug(
             __name__,
-            'Set recognition only while \'listening\' to %r' % value)
+            'Set recognition only while \'listening\' to %r',
+            value)
 
         if not self._opt_rec_during_listening.value \
                 and not self.is_recognising():
@@ -317,7 +336,7 @@ class AbstractRecognitionController(AbstractController):
     def recognised_words(self, words):
         Logger.debug(
             __name__,
-            'Recognised the words: "%s"' % words
+            'Recognised the words: "%s"', words
         )
         self.router(
             'wizard',
@@ -376,6 +395,8 @@ class RecognitionNone(AbstractRecognitionController):
     Extends:
         AbstractRecognitionController
     """
+    NAME = 'None'
+
     def __init__(self, nottreal, args):
         """
         Create the thread that sends audio and receives responses
@@ -386,9 +407,6 @@ class RecognitionNone(AbstractRecognitionController):
         """
         super(RecognitionNone, self).__init__(nottreal, args)
 
-    def name(self):
-        return 'None'
-
     def ready(self, responder=None):
         """
         Ensure the recognised words list isn't in the UI
@@ -18,6 +18,8 @@ class SRRecognition(AbstractRecognitionController):
     Extends:
         AbstractVoiceSystem
     """
+    NAME = 'Unimplemented recogniser'
+
     def __init__(self, nottreal, args):
         """
         Create the thread that sends audio and receives responses
@@ -35,9 +37,6 @@ class SRRecognition(AbstractRecognitionController):
         Logger.debug(__name__, 'Loading "speech_recognition" module')
         self.sr = importlib.import_module('speech_recognition')
 
-    def name(self):
-        return 'Unimplemented recogniser'
-
     def packdown(self, on_complete=None):
         """
         Packdown the current voice recognition system and
@@ -127,6 +126,7 @@ class RecognitionGoogleSpeech(SRRecognition):
     This should not be used, it is only included for
     testing/development purposes.
     """
+    NAME = 'Google Speech Recognition'
 
     def __init__(self, nottreal, args):
         """
@@ -138,9 +138,6 @@ class RecognitionGoogleSpeech(SRRecognition):
         """
         super(RecognitionGoogleSpeech, self).__init__(nottreal, args)
 
-    def name(self):
-        return 'Google Speech Recognition'
-
     def process_audio(self, rec, audio):
         """
         Send some audio off to Google for recognition
@@ -173,7 +170,8 @@ class RecognitionGoogleSpeech(SRRecognition):
         except self.sr.RequestError as e:
             Logger.error(
                 __name__,
-                'Error retrieving results from Google: %s' % str(e)
+                'Error retrieving results from Google: %s',
+                e
             )
             self.alert_recogniser_error(str(e))
 
@@ -182,6 +180,7 @@ class RecognitionGoogleCloud(SRRecognition):
     """
     Use Google Cloud Speech-to-Text for recognition
     """
+    NAME = 'Google Text-to-Speech'
 
     def __init__(self, nottreal, args):
         """
@@ -193,9 +192,6 @@ class RecognitionGoogleCloud(SRRecognition):
         """
         super(RecognitionGoogleCloud, self).__init__(nottreal, args)
 
-    def name(self):
-        return 'Google Text-to-Speech'
-
     def process_audio(self, rec, audio):
         """
         Send some audio off to Google for recognition
@@ -225,7 +221,8 @@ class RecognitionGoogleCloud(SRRecognition):
         except self.sr.RequestError as e:
             Logger.error(
                 __name__,
-                'Error retrieving results from Google: %s' % str(e)
+                'Error retrieving results from Google: %s',
+                e
             )
             self.alert_recogniser_error(str(e))
 
@@ -234,6 +231,7 @@ class RecognitionWitai(SRRecognition):
     """
     Use Wit.ai for recognition
     """
+    NAME = 'Wit.ai'
 
     def __init__(self, nottreal, args):
         """
@@ -245,9 +243,6 @@ class RecognitionWitai(SRRecognition):
         """
         super(RecognitionWitai, self).__init__(nottreal, args)
 
-    def name(self):
-        return 'Wit.ai'
-
     def process_audio(self, rec, audio):
         """
         Send some audio off to Wit.ai for recognition
@@ -273,7 +268,8 @@ class RecognitionWitai(SRRecognition):
         except self.sr.RequestError as e:
             Logger.error(
                 __name__,
-                'Error retrieving results from Wit.ai: %s' % str(e)
+                'Error retrieving results from Wit.ai: %s',
+                e
             )
             self.alert_recogniser_error(str(e))
 
@@ -282,6 +278,7 @@ class RecognitionBing(SRRecognition):
     """
     Use the Microsoft Bing Speech API
     """
+    NAME = 'Microsoft Bing'
 
     def __init__(self, nottreal, args):
         """
@@ -293,9 +290,6 @@ class RecognitionBing(SRRecognition):
         """
         super(RecognitionBing, self).__init__(nottreal, args)
 
-    def name(self):
-        return 'Microsoft Bing'
-
     def process_audio(self, rec, audio):
         """
         Send some audio off to Microsoft for recognition
@@ -325,7 +319,8 @@ class RecognitionBing(SRRecognition):
         except self.sr.RequestError as e:
             Logger.error(
                 __name__,
-                'Error retrieving results from Microsoft: %s' % str(e)
+                'Error retrieving results from Microsoft: %s',
+                e
             )
             self.alert_recogniser_error(str(e))
 
@@ -334,6 +329,7 @@ class RecognitionAzure(SRRecognition):
     """
     Use the Microsoft Azure Speech API
     """
+    NAME = 'Microsoft Azure'
 
     def __init__(self, nottreal, args):
         """
@@ -345,9 +341,6 @@ class RecognitionAzure(SRRecognition):
         """
         super(RecognitionAzure, self).__init__(nottreal, args)
 
-    def name(self):
-        return 'Microsoft Azure'
-
     def process_audio(self, rec, audio):
         """
         Send some audio off to Microsoft for recognition
@@ -377,7 +370,8 @@ class RecognitionAzure(SRRecognition):
         except self.sr.RequestError as e:
             Logger.error(
                 __name__,
-                'Error retrieving results from Microsoft: %s' % str(e)
+                'Error retrieving results from Microsoft: %s',
+                e
             )
             self.alert_recogniser_error(str(e))
 
@@ -386,6 +380,7 @@ class RecognitionLex(SRRecognition):
     """
     Use the Amazon Lex API
     """
+    NAME = 'Amazon Lex'
 
     def __init__(self, nottreal, args):
         """
@@ -397,9 +392,6 @@ class RecognitionLex(SRRecognition):
         """
         super(RecognitionLex, self).__init__(nottreal, args)
 
-    def name(self):
-        return 'Amazon Lex'
-
     def process_audio(self, rec, audio):
         """
         Send some audio off to Amazon for recognition
@@ -452,7 +444,8 @@ class RecognitionLex(SRRecognition):
         except self.sr.RequestError as e:
             Logger.error(
                 __name__,
-                'Error retrieving results from Amazon: %s' % str(e)
+                'Error retrieving results from Amazon: %s',
+                e
             )
             self.alert_recogniser_error(str(e))
 
@@ -461,6 +454,7 @@ class RecognitionHoundify(SRRecognition):
     """
     Use Houndify for recognition
     """
+    NAME = 'Houndify'
 
     def __init__(self, nottreal, args):
         """
@@ -472,9 +466,6 @@ class RecognitionHoundify(SRRecognition):
         """
         super(RecognitionHoundify, self).__init__(nottreal, args)
 
-    def name(self):
-        return 'Houndify'
-
     def process_audio(self, rec, audio):
         """
         Send some audio off to Houndify for recognition
@@ -504,7 +495,8 @@ class RecognitionHoundify(SRRecognition):
         except self.sr.RequestError as e:
             Logger.error(
                 __name__,
-                'Error retrieving results from Houndify: %s' % str(e)
+                'Error retrieving results from Houndify: %s',
+                e
             )
             self.alert_recogniser_error(str(e))
 
@@ -513,6 +505,7 @@ class RecognitionIBM(SRRecognition):
     """
     Use IBM Speech to Text API for recognition
     """
+    NAME = 'IBM Watson'
 
     def __init__(self, nottreal, args):
         """
@@ -524,9 +517,6 @@ class RecognitionIBM(SRRecognition):
         """
         super(RecognitionIBM, self).__init__(nottreal, args)
 
-    def name(self):
-        return 'IBM Watson'
-
     def process_audio(self, rec, audio):
         """
         Send some audio off to IBM for recognition
@@ -560,7 +550,8 @@ class RecognitionIBM(SRRecognition):
         except self.sr.RequestError as e:
             Logger.error(
                 __name__,
-                'Error retrieving results from IBM: %s' % str(e)
+                'Error retrieving results from IBM: %s',
+                e
             )
             self.alert_recogniser_error(str(e))
 
@@ -569,6 +560,7 @@ class RecognitionTensorflow(SRRecognition):
     """
     Use Tensowflow for recognition
     """
+    NAME = 'Tensorflow'
 
     def __init__(self, nottreal, args):
         """
@@ -580,9 +572,6 @@ class RecognitionTensorflow(SRRecognition):
         """
         super(RecognitionTensorflow, self).__init__(nottreal, args)
 
-    def name(self):
-        return 'Tensorflow'
-
     def process_audio(self, rec, audio):
         """
         Send some audio off to Tensorflow for recognition
@@ -612,6 +601,7 @@ class RecognitionTensorflow(SRRecognition):
         except self.sr.RequestError as e:
             Logger.error(
                 __name__,
-                'Error retrieving results from Tensorflow: %s' % str(e)
+                'Error retrieving results from Tensorflow: %s',
+                e
             )
             self.alert_recogniser_error(str(e))
@@ -0,0 +1,316 @@
+from ..utils.clock import Clock
+from ..utils.log import Logger
+from ..utils.stats import StatsCollection
+from ..models.m_mvc import WizardAlert, WizardOption
+from .c_abstract import AbstractController
+
+import json
+import os
+import threading
+
+
+class SignalStatsController(AbstractController):
+    """
+    Record the latency and number of calls of the signals routed
+    between controllers, and the time taken by each stage of every
+    utterance, and periodically save them to the data directory
+    while data is being recorded (the signal timings only while
+    they're being recorded).
+
+    Extends:
+        AbstractController
+
+    Variables:
+        TIMESTAMP_FORMAT {str} -- Timestamp for files
+        FILE_PREFIX {str} -- Filename prefix for signal timings
+        LATENCY_FILE_PREFIX {str} -- Filename prefix for utterance
+                                     latencies
+        FILE_EXT {str} -- Filename suffix
+        SAVE_INTERVAL {int} -- Seconds between saving the stats
+        SUMMARY_ROWS {int} -- Number of signals shown to the Wizard
+    """
+    TIMESTAMP_FORMAT = '%Y-%m-%d %H.%M.%S'
+    FILE_PREFIX = 'signals-'
+    LATENCY_FILE_PREFIX = 'latency-'
+    FILE_EXT = '.json'
+    SAVE_INTERVAL = 30
+    SUMMARY_ROWS = 20
+
+    def __init__(self, nottreal, args):
+        """
+        Controller to record signal statistics
+
+        Arguments:
+            nottreal {App} -- Application instance
+            args {[str]} -- Application arguments
+        """
+        super().__init__(nottreal, args)
+
+        self._stats = StatsCollection()
+        self._latency = StatsCollection()
+        self._collections = {
+            self.FILE_PREFIX: self._stats,
+            self.LATENCY_FILE_PREFIX: self._latency}
+        self._timers = {}
+        self._timer_lock = threading.Lock()
+        self._enabled = False
+        self._filepaths = {}
+
+        if args.stats:
+            self.nottreal.instrument(self._stats)
+
+    def ready_order(self, responder=None):
+        """
+        Ready after the data recorder so its directory is known
+
+        Arguments:
+            responder {str} -- Ignored
+        """
+        return 60
+
+    def ready(self, responder=None):
+        """
+        Register the options for the Wizard
+
+        Arguments:
+            responder {str} -- Ignored
+        """
+        self._opt_enabled = WizardOption(
+                key=__name__ + '.enabled',
+                label='Record signal timings',
+                method=self._set_enabled,
+                category=WizardOption.CAT_WIZARD,
+                choose=WizardOption.CHOOSE_BOOLEAN,
+                default=self.args.stats,
+                order=0,
+                group='stats',
+                restorable=True,
+                restore=not self.args.stats)
+        self.router(
+            'wizard',
+            'register_option',
+            option=self._opt_enabled)
+
+        self._opt_show = WizardOption(
+                key=__name__ + '.show',
+                label='Show signal timings…',
+                method=self._show_stats,
+                category=WizardOption.CAT_WIZARD,
+                choose=WizardOption.BUTTON,
+                order=1,
+                group='stats')
+        self.router(
+            'wizard',
+            'register_option',
+            option=self._opt_show)
+
+        self._opt_show_latency = WizardOption(
+                key=__name__ + '.show_latency',
+                label='Show speech latency…',
+                method=self._show_latency,
+                category=WizardOption.CAT_WIZARD,
+                choose=WizardOption.BUTTON,
+                order=2,
+                group='stats')
+        self.router(
+            'wizard',
+            'register_option',
+            option=self._opt_show_latency)
+
+        self._set_enabled(self._opt_enabled.value)
+        with self._timer_lock:
+            self._schedule_save(self.LATENCY_FILE_PREFIX)
+
+    def respond_to(self):
+        """
+        This class will handle "stats" commands only.
+
+        Returns:
+            str -- Label for this controller
+        """
+        return 'stats'
+
+    def quit(self):
+        """
+        Stop saving the statistics periodically, and save them one
+        last time
+        """
+        with self._timer_lock:
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+
+            for prefix in self._collections:
+                self._save(prefix)
+
+    def utterance_latency(self, trace):
+        """
+        Record the time taken by each stage of an utterance
+
+        Arguments:
+            trace {LatencyTrace} -- Timings of the utterance
+        """
+        for stage, duration in trace.durations().items():
+            self._latency.record(stage, duration)
+        self._latency.record('total', trace.total())
+
+    def remote_latency(self, trace):
+        """
+        Record the time taken by each stage of an utterance sent to a
+        remote voice subsystem, as it reported them
+
+        Arguments:
+            trace {LatencyTrace} -- Timings of the utterance
+        """
+        for stage, duration in trace.durations().items():
+            self._latency.record('remote %s' % stage, duration)
+        self._latency.record('remote total', trace.total())
+
+    def interrupt_latency(self, duration):
+        """
+        Record the time taken for the voice to stop after the Wizard
+        interrupted it
+
+        Arguments:
+            duration {float} -- Seconds to stop
+        """
+        self._latency.record('interrupt', duration)
+
+    def _set_enabled(self, value):
+        """
+        Start or stop recording signal statistics
+
+        Arguments:
+            value {bool} -- New checked status
+
+        Return:
+            {bool} -- Always {True}
+        """
+        Logger.info(__name__, 'Set recording of signal timings to %r', value)
+
+        with self._timer_lock:
+            was_enabled = self._enabled
+            self._enabled = value
+
+            if value:
+                self.nottreal.instrument(self._stats)
+                if self.FILE_PREFIX not in self._timers:
+                    self._schedule_save(self.FILE_PREFIX)
+            else:
+                self.nottreal.instrument(None)
+                timer = self._timers.pop(self.FILE_PREFIX, None)
+                if timer is not None:
+                    timer.cancel()
+                if was_enabled:
+                    self._save(self.FILE_PREFIX)
+
+        return True
+
+    def _show_stats(self, _):
+        """
+        Show the Wizard the signals that have taken the most time
+
+        Return:
+            {bool} -- Always {False} (the button has no value)
+        """
+        alert = WizardAlert(
+            'Signal timings',
+            self._stats.summary(limit=self.SUMMARY_ROWS),
+            WizardAlert.LEVEL_INFO)
+
+        self.router('wizard', 'show_alert', alert=alert)
+        return False
+
+    def _show_latency(self, _):
+        """
+        Show the Wizard the time taken by each stage of the utterances
+
+        Return:
+            {bool} -- Always {False} (the button has no value)
+        """
+        alert = WizardAlert(
+            'Speech latency',
+            self._latency.summary(),
+            WizardAlert.LEVEL_INFO)
+
+        self.router('wizard', 'show_alert', alert=alert)
+        return False
+
+    def _schedule_save(self, prefix):
+        """
+        Save some statistics after {SAVE_INTERVAL} seconds (the caller
+        must hold {_timer_lock})
+
+        Arguments:
+            prefix {str} -- Filename prefix of the statistics
+        """
+        timer = threading.Timer(
+            self.SAVE_INTERVAL,
+            self._on_timer,
+            args=(prefix,))
+        timer.daemon = True
+        self._timers[prefix] = timer
+        timer.start()
+
+    def _on_timer(self, prefix):
+        """
+        Save some statistics and schedule the next save, unless the
+        timer was cancelled while waiting for the lock
+
+        Arguments:
+            prefix {str} -- Filename prefix of the statistics
+        """
+        with self._timer_lock:
+            if threading.current_thread() is not self._timers.get(prefix):
+                return
+
+            self._save(prefix)
+            self._schedule_save(prefix)
+
+    def _save(self, prefix):
+        """
+        Write some statistics to a JSON file in the data directory (if
+        data is being recorded)
+
+        Arguments:
+            prefix {str} -- Filename prefix of the statistics
+        """
+        if not self.router('data', 'recording'):
+            return
+
+        self._save_collection(prefix, self._collections[prefix])
+
+    def _save_collection(self, prefix, stats):
+        """
+        Write a collection of statistics (if not empty) to a JSON file
+        in the data directory
+
+        Arguments:
+            prefix {str} -- Filename prefix
+            stats {StatsCollection} -- Statistics to save
+        """
+        summary = stats.to_dict()
+        if not summary:
+            return
+
+        try:
+            filepath = self._filepaths[prefix]
+        except KeyError:
+            directory = self.router('data', 'directory')
+            if directory is None:
+                return
+
+            timestamp = Clock.now().strftime(self.TIMESTAMP_FORMAT)
+            filename = '%s%s%s' % (prefix, timestamp, self.FILE_EXT)
+            filepath = self._filepaths[prefix] = os.path.join(
+                directory,
+                filename)
+
+        try:
+            with open(filepath, mode='w') as stats_file:
+                json.dump(summary, stats_file, indent=1)
+        except IOError:
+            Logger.warning(
+                __name__,
+                'Failed to save statistics to "%s"',
+                filepath)
@@ -1,16 +1,25 @@
 
+from ..utils.clock import Clock
 from ..utils.log import Logger
 from ..utils.init import ClassUtils
-from ..models.m_mvc import Message, VUIState, WizardOption
+from ..utils.proc import CoProcess, ProcessGroup
+from ..models.m_audio import AudioCache, WavFile
+from ..models.m_mvc import (LatencyTrace, Message, MessageQueue, VUIState,
+                            WizardOption)
 from .c_abstract import AbstractController
 
-from collections import deque
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from subprocess import Popen
 
 import abc
+import itertools
+import os
+import re
+import tempfile
 import threading
-import time
 import sys
+import time
 
 
 class VoiceController(AbstractController):
@@ -113,18 +122,43 @@ class VoiceController(AbstractController):
         return instance == self.voice_instance
 
     def available_voices(self):
-        return {c: self.nottreal.controllers[c].name()
-                for k, c in enumerate(self.nottreal.controllers)
-                if c.startswith('Voice')
-                and ClassUtils.is_subclass(c, AbstractVoiceController)
-                and self.nottreal.controllers[c].enabled()}
+        """
+        Voice subsystems that could be used on this machine (without
+        instantiating them)
+
+        Returns:
+            {dict(str,str)} -- Names of the subsystems by class name
+        """
+        controllers = self.nottreal.controllers
+        voices = [c for c in controllers
+                  if c.startswith('Voice')
+                  and ClassUtils.is_subclass(c, AbstractVoiceController)]
+
+        return {c: controllers.display_name(c)
+                for c in voices
+                if controllers.probe(c)}
 
-    def speak(self, text):
+    def speak(self,
+              text,
+              cat=None,
+              id=None,
+              slots=None,
+              loading=False,
+              trace=None,
+              priority=None):
         """
         Respond to the "speak" button being clicked.
 
         Arguments:
             text {string} -- Text that should be spoken
+
+        Keyword Arguments:
+            cat {str} -- Ignored
+            id {str} -- Ignored
+            slots {dict(str,str)} -- Ignored
+            loading {bool} -- Ignored
+            trace {LatencyTrace} -- Ignored
+            priority {int} -- Ignored
         Return:
             {bool} -- True if the text was queued to be spoken
         """
@@ -145,6 +179,25 @@ class VoiceController(AbstractController):
         Logger.error(__name__, 'No voice instantiated!')
         return False
 
+    def messages_loaded(self, msgs):
+        """
+        Prepared messages are only used by the voice subsystems
+
+        Arguments:
+            msgs {OrderedDict} -- Prepared messages by their ID
+        """
+        pass
+
+    def speculate(self, texts):
+        """
+        Text that may be spoken soon is only used by the voice
+        subsystems
+
+        Arguments:
+            texts {[str]} -- Text, most likely to be spoken first
+        """
+        pass
+
     def _set_voice(self, voice):
         """
         Set a voice subsystem to the used system
@@ -175,20 +228,43 @@ class VoiceController(AbstractController):
                     'Unknown voice ID: "%s"' % voice).with_traceback(tb)
                 return False
 
-        Logger.info(__name__, 'Set voice synthesis to "%s"' % name)
+        Logger.info(__name__, 'Set voice synthesis to "%s"', name)
 
         self.responder('voice', self.voice_instance)
         self.router('voice', 'init', args=self.args)
+        self.router(
+            'voice',
+            'messages_loaded',
+            msgs=self.router('wizard', 'prepared_messages'))
         return True
 
 
 class AbstractVoiceController(AbstractController):
     """
     Base class that implements a simple abstract voice controller.
+    Voice subsystems are only instantiated once they are selected.
+
+    The name and requirements of each subsystem are class attributes,
+    so the menu of voices can be built from the manifest, without
+    importing them.
 
     Extends:
         AbstractVoiceController
+
+    Variables:
+        NAME {str} -- Name of the subsystem shown to the Wizard
+        PROBE_MODULES {str} -- Comma-separated modules the subsystem
+                               needs installed
+        PROBE_PLATFORMS {str} -- Comma-separated platforms the
+                                 subsystem runs on (see
+                                 {ClassUtils.requirements_met}), or
+                                 empty for any
     """
+    ON_DEMAND = True
+    NAME = 'Unimplemented voice'
+    PROBE_MODULES = ''
+    PROBE_PLATFORMS = ''
+
     def __init__(self, nottreal, args):
         """
         Base voice class that does nothing.
@@ -227,6 +303,19 @@ class AbstractVoiceController(AbstractController):
     def enabled(self):
         return True
 
+    @classmethod
+    def probe(cls):
+        """
+        Check whether this subsystem can be used on this machine
+        without instantiating it (e.g. its modules are installed)
+
+        Returns:
+            {bool}
+        """
+        return ClassUtils.requirements_met(
+            cls.PROBE_MODULES,
+            cls.PROBE_PLATFORMS)
+
     def ready_order(self, responder=None):
         """
         Voice controllers are readied by the {VoiceController}
@@ -249,9 +338,9 @@ class AbstractVoiceController(AbstractController):
             'deregister_option',
             option=self._opt_listen_after)
 
-    @abc.abstractmethod
-    def name(self):
-        return 'Unimplemented voice'
+    @classmethod
+    def name(cls):
+        return cls.NAME
 
     def relinquish(self, instance):
         """
@@ -280,7 +369,9 @@ class AbstractVoiceController(AbstractController):
               cat=None,
               id=None,
               slots=None,
-              loading=False):
+              loading=False,
+              trace=None,
+              priority=None):
         """
         Produce a particular utterance.
 
@@ -295,6 +386,8 @@ class AbstractVoiceController(AbstractController):
             id {str} -- Prepared message ID if a prepared message
             slots {dict(str,str)} -- Slots changed by the user
             loading {bool} -- Is a loading message
+            trace {LatencyTrace} -- Timings of the message so far
+            priority {int} -- Priority class ({Message.PRIORITY_*})
         """
         self._produce_voice(text, text, cat, id, slots)
 
@@ -311,8 +404,8 @@ class AbstractVoiceController(AbstractController):
         """
         Logger.info(
             __name__,
-            'Change to %s state after speaking'
-            % ('listening' if value else 'busy'))
+            'Change to %s state after speaking',
+            'listening' if value else 'busy')
         return True
 
     @abc.abstractmethod
@@ -347,6 +440,26 @@ class AbstractVoiceController(AbstractController):
         """
         self.send_to_recorder(text, cat, id, slots)
 
+    def messages_loaded(self, msgs):
+        """
+        Called when the prepared messages are loaded (e.g. to prepare
+        their audio ahead of time)
+
+        Arguments:
+            msgs {OrderedDict} -- Prepared messages by their ID
+        """
+        pass
+
+    def speculate(self, texts):
+        """
+        Called when the Wizard selects text that may be spoken soon
+        (e.g. to prepare its audio ahead of time)
+
+        Arguments:
+            texts {[str]} -- Text, most likely to be spoken first
+        """
+        pass
+
     def send_to_recorder(self, text, cat=None, id=None, slots=None):
         """
         Send data to the data recorder.
@@ -392,9 +505,34 @@ class ThreadedBaseVoice(AbstractVoiceController):
     Base class that implements threading for calling a voice
     subsystem from a separate thread.
 
+    Subsystems that can synthesise audio separately from playing it
+    can speak long messages a segment (e.g. a sentence) at a time, by
+    overriding {_segments}, {_synthesise_segment} and
+    {_play_segment}. The next segments are synthesised while the
+    current segment plays.
+
+    Subsystems that synthesise audio can play it through the shared
+    {AudioOutputController} with {_play_audio}, which records when the
+    audio is actually heard.
+
     Extends:
         AbstractVoiceController
+
+    Variables:
+        RE_SEGMENT {re.Pattern} -- Boundary between segments
+        PIPELINE_LOOKAHEAD {int} -- Maximum number of segments that are
+                                    synthesised ahead
+        EXPIRE_AFTER {OrderedDict} -- Choices of seconds after which
+                                      queued messages are dropped
     """
+    RE_SEGMENT = re.compile(r'(?<=[.!?;:])\s+(?=\S)')
+    PIPELINE_LOOKAHEAD = 2
+    EXPIRE_AFTER = OrderedDict([
+        (0, 'Never'),
+        (30, '30 seconds'),
+        (60, '1 minute'),
+        (120, '2 minutes'),
+        (300, '5 minutes')])
 
     def __init__(self, nottreal, args, blocking=True):
         """
@@ -422,10 +560,18 @@ class ThreadedBaseVoice(AbstractVoiceController):
         """
         super().init(args)
 
-        self._sleep_between_queue_checks = .3
         self._interrupt = threading.Event()
         self._stop_voice_loop = False
-        self._text_queue = deque()
+        self._text_queue = MessageQueue()
+        self._queue_changed = threading.Condition()
+        self._trace = None
+        self._producing = None
+        self._combined_parts = {}
+        self._interruptions = 0
+        self._interrupted_at = None
+        self._playback = None
+        self._played_until = None
+        self._synthesiser = ThreadPoolExecutor(max_workers=1)
 
         self.append_override = Message.NO_OVERRIDE
         self._dont_append_cat_change = True
@@ -443,6 +589,34 @@ class ThreadedBaseVoice(AbstractVoiceController):
             'register_option',
             option=self._opt_clear_queue)
 
+        self._opt_expire_after = WizardOption(
+                key=__name__ + '.expire_after',
+                label='Drop queued messages after',
+                category=WizardOption.CAT_WIZARD,
+                choose=WizardOption.CHOOSE_SINGLE_CHOICE,
+                method=self._set_expire_after,
+                default=0,
+                values=self.EXPIRE_AFTER,
+                restorable=True)
+
+        self.nottreal.router(
+            'wizard',
+            'register_option',
+            option=self._opt_expire_after)
+
+        self._opt_combine = WizardOption(
+                key=__name__ + '.combine',
+                label='Combine queued messages',
+                category=WizardOption.CAT_WIZARD,
+                method=self._set_combine,
+                default=False,
+                restorable=True)
+
+        self.nottreal.router(
+            'wizard',
+            'register_option',
+            option=self._opt_combine)
+
         self._voice_thread = threading.Thread(
                 target=self._speak,
                 args=())
@@ -458,13 +632,27 @@ class ThreadedBaseVoice(AbstractVoiceController):
         """
         super().packdown()
 
-        self._stop_voice_loop = True
+        with self._queue_changed:
+            self._stop_voice_loop = True
+            self._queue_changed.notify()
+
+        self._synthesiser.shutdown(wait=False)
 
         self.router(
             'wizard',
             'deregister_option',
             option=self._opt_clear_queue)
 
+        self.router(
+            'wizard',
+            'deregister_option',
+            option=self._opt_expire_after)
+
+        self.router(
+            'wizard',
+            'deregister_option',
+            option=self._opt_combine)
+
     def _set_clear_queue_on_interrupt(self, value):
         """
         Clear the queue when the speech output is interrupted
@@ -477,24 +665,90 @@ class ThreadedBaseVoice(AbstractVoiceController):
         """
         Logger.info(
             __name__,
-            'Set clearing of the queue on interrupt to %r' % value)
+            'Set clearing of the queue on interrupt to %r',
+            value)
+        return True
+
+    def _set_expire_after(self, value):
+        """
+        Drop messages that have been queued for too long
+
+        Arguments:
+            value {int} -- Seconds after which messages are dropped
+                           (0 to never drop them)
+
+        Return:
+            {bool} -- Always {True}
+        """
+        Logger.info(
+            __name__,
+            'Set dropping of queued messages to %s',
+            self.EXPIRE_AFTER[value].lower())
+        return True
+
+    def _set_combine(self, value):
+        """
+        Combine consecutive queued messages into one utterance (unless
+        a message overrides this)
+
+        Arguments:
+            value {bool} -- New checked status
+
+        Return:
+            {bool} -- Always {True}
+        """
+        Logger.info(__name__, 'Set combining of queued messages to %r', value)
         return True
 
+    def _can_append(self, previous, message):
+        """
+        Can a queued message be combined with the message before it?
+
+        Arguments:
+            previous {Message} -- Message before it in the queue
+            message {Message} -- Message to append
+
+        Return:
+            {bool}
+        """
+        if message.override == Message.FORCE_DONT_APPEND \
+                or message.priority != previous.priority \
+                or message.loading != previous.loading:
+            return False
+
+        return message.override == Message.FORCE_APPEND \
+            or self._opt_combine.value
+
+    def _on_expired(self, message):
+        """
+        A message was dropped from the queue as it expired
+
+        Arguments:
+            message {Message} -- Expired message
+        """
+        Logger.info(__name__, 'Dropped expired message "%s"', message.text)
+        self.router('wizard', 'dequeue_text', text=message.text)
+        self.router('data', 'expired_message', text=message.text)
+
     def category_changed(self, new_cat_id):
         """
-        We don't do anything with this yet
+        Don't combine the next message with messages from a previous
+        category
 
         Arguments:
             new_cat_id {str} -- New category ID
         """
-        pass
+        if self._dont_append_cat_change:
+            self.append_override = Message.FORCE_DONT_APPEND
 
     def speak(self,
               text,
               cat=None,
               id=None,
               slots=None,
-              loading=False):
+              loading=False,
+              trace=None,
+              priority=None):
         """
         Add the message to the queue to be spoken.
 
@@ -505,18 +759,35 @@ class ThreadedBaseVoice(AbstractVoiceController):
             id {str} -- Prepared message ID if a prepared message
             slots {dict(str,str)} -- Slots changed by the user
             loading {bool} -- Is a loading message (default: False)
+            trace {LatencyTrace} -- Timings of the message so far
+            priority {int} -- Priority class ({Message.PRIORITY_*},
+                              default: from {loading})
         Return:
             {bool} -- True if the text was queued to be spoken
         """
-        self.router('wizard', 'enqueue_text', text=text)
+        expires = None
+        if self._opt_expire_after.value:
+            expires = Clock.monotonic() + self._opt_expire_after.value
+
         message = Message(
             text.strip(),
             override=self.append_override,
             cat=cat,
             id=id,
             slots=slots,
-            loading=loading)
-        self._text_queue.append(message)
+            loading=loading,
+            trace=trace,
+            priority=priority,
+            expires=expires)
+        self.router(
+            'wizard',
+            'enqueue_text',
+            text=text,
+            priority=message.priority)
+        message.trace.mark(LatencyTrace.QUEUED)
+        with self._queue_changed:
+            self._text_queue.push(message)
+            self._queue_changed.notify()
         self.append_override = Message.NO_OVERRIDE
         return True
 
@@ -541,19 +812,38 @@ class ThreadedBaseVoice(AbstractVoiceController):
         Logger.debug(__name__, 'Voice thread started')
 
         while self._stop_voice_loop is False:
-            while not self._stop_voice_loop \
-                  and not self._text_queue \
-                  or (self._blocking and self._is_speaking):
-                time.sleep(self._sleep_between_queue_checks)
-
-            if self._stop_voice_loop:
-                break
+            with self._queue_changed:
+                while not self._stop_voice_loop \
+                        and (not self._text_queue
+                             or (self._blocking and self._is_speaking)):
+                    self._queue_changed.wait()
+
+                if self._stop_voice_loop:
+                    break
+
+                message, expired = self._text_queue.pop(
+                    can_append=self._can_append)
+
+            for dropped in expired:
+                self._on_expired(dropped)
+            if message is None:
+                continue
+
+            message.mark(LatencyTrace.DEQUEUED)
+            self._report_latency()
+            self._trace = message
+            self._interrupted_at = None
+            self._played_until = None
+            self._producing = message
+            if len(message.parts) > 1:
+                self._combined_parts[message.text] = \
+                    [part.text for part in message.parts]
 
             try:
-                message = self._text_queue.popleft()
                 text = message.text
                 loading = message.loading
                 prepared_text, text_to_show = self._prepare_text(text)
+                message.mark(LatencyTrace.PREPARED)
 
                 if loading:
                     self._on_start_speaking(
@@ -569,20 +859,36 @@ class ThreadedBaseVoice(AbstractVoiceController):
                 if self._blocking:
                     self._is_speaking = True
 
-                self._produce_voice(
-                    text,
-                    prepared_text,
-                    message.cat,
-                    message.id,
-                    message.slots)
+                message.mark(LatencyTrace.PRODUCING)
+                segments = self._segments(text, prepared_text)
+                if segments:
+                    self._produce_voice_pipelined(
+                        text,
+                        segments,
+                        message.cat,
+                        message.id,
+                        message.slots)
+                else:
+                    self._produce_voice(
+                        text,
+                        prepared_text,
+                        message.cat,
+                        message.id,
+                        message.slots)
+                message.mark(LatencyTrace.PRODUCED)
+                self._producing = None
+                self._report_interrupt_latency()
 
                 if self._blocking:
-                    self._on_stop_speaking(loading=loading)
+                    self._on_stop_speaking(
+                        loading=loading,
+                        timestamp=self._played_until)
 
             except Exception as e:
                 Logger.critical(
                     __name__,
-                    'Error generating voice: %s' % repr(e))
+                    'Error generating voice: %s',
+                    repr(e))
                 raise e
 
         Logger.debug(__name__, 'Voice thread finished')
@@ -591,7 +897,7 @@ class ThreadedBaseVoice(AbstractVoiceController):
         return not self._interrupt.is_set()
 
     def wait(self, timeout):
-        return self._interrupt.wait(timeout)
+        return Clock.wait(self._interrupt, timeout)
 
     def stop_speaking(self, clear_all=None):
         """
@@ -609,15 +915,220 @@ class ThreadedBaseVoice(AbstractVoiceController):
 
         if clear_all:
             self.router('wizard', 'clear_queue')
-            self._text_queue.clear()
+            with self._queue_changed:
+                self._text_queue.clear()
             Logger.debug(__name__, 'Queued text cleared')
         else:
             Logger.debug(__name__, 'Not clearing the queued')
 
-        self._interrupt_voice()
+        self._interruptions += 1
+        if self._producing is not None and self._interrupted_at is None:
+            self._interrupted_at = time.perf_counter()
+
+        if self._playback is not None:
+            self.router('audio', 'flush')
+        else:
+            self._interrupt_voice()
+
+        return True
+
+    def _segments(self, text, prepared_text):
+        """
+        Split text into segments to synthesise and play one at a time
+
+        Arguments:
+            text {str} -- Text from the top of the queue
+            prepared_text {str} -- Text that has been prepared by
+                                   #prepare_text()
+
+        Return:
+            {[str]} -- Segments, or {None} to produce the voice for
+                       the whole text at once (the default)
+        """
+        return None
+
+    def _split_segments(self, text):
+        """
+        Split text into sentences and clauses
+
+        Arguments:
+            text {str} -- Text to split
+
+        Return:
+            {[str]} -- Segments, or {None} if there's only one
+        """
+        segments = self.RE_SEGMENT.split(text.strip())
+        return segments if len(segments) > 1 else None
+
+    def _synthesise_segment(self, segment):
+        """
+        Synthesise the audio of one segment. This is called from a
+        separate thread while the previous segment is played, and only
+        if {_segments} returns segments, so subclasses that override
+        {_segments} must override this too. Does nothing by default.
+
+        Arguments:
+            segment {str} -- Segment of text
+
+        Return:
+            {object} -- Audio to pass to {_play_segment}
+        """
+        return None
+
+    def _play_segment(self, audio):
+        """
+        Play the audio of one segment, blocking until it's played.
+        Like {_synthesise_segment}, this is only called if {_segments}
+        returns segments. Does nothing by default.
+
+        Arguments:
+            audio {object} -- Audio from {_synthesise_segment}
+        """
+        pass
+
+    def _discard_segment(self, audio):
+        """
+        Discard the audio of a segment that won't be played (e.g.
+        after an interruption)
+
+        Arguments:
+            audio {object} -- Audio from {_synthesise_segment}
+        """
+        pass
+
+    def _produce_voice_pipelined(self,
+                                 text,
+                                 segments,
+                                 cat=None,
+                                 id=None,
+                                 slots=None):
+        """
+        Produce the voice one segment at a time, synthesising the
+        following segments while each segment is played. The message is
+        recorded once, as with {_produce_voice}.
+
+        Arguments:
+            text {str} -- Text from the top of the queue
+            segments {[str]} -- Text split by {_segments}
+
+        Keyword Arguments:
+            cat {str} -- Category ID if a prepared message
+            id {str} -- Prepared message ID if a prepared message
+            slots {dict(str,str)} -- Slots changed by the user
+        """
+        self.send_to_recorder(text, cat, id, slots)
+        Logger.debug(
+            __name__,
+            'Speaking "%s" in %d segments',
+            text,
+            len(segments))
+
+        interruptions = self._interruptions
+        pending = deque()
+        remaining = deque(segments)
+
+        def synthesise_next():
+            if not remaining:
+                return
+
+            try:
+                pending.append(
+                    self._synthesiser.submit(
+                        self._synthesise_segment,
+                        remaining.popleft()))
+            except RuntimeError:
+                # the synthesiser has been shut down by {packdown}
+                remaining.clear()
+
+        def discard(future):
+            if not future.cancelled() and future.exception() is None:
+                self._discard_segment(future.result())
+
+        for _ in range(self.PIPELINE_LOOKAHEAD):
+            synthesise_next()
+
+        while pending and self._interruptions == interruptions:
+            try:
+                audio = pending.popleft().result()
+            except Exception as e:
+                Logger.error(
+                    __name__,
+                    'Skipping a segment of "%s" that could not be '
+                    'synthesised: %r',
+                    text,
+                    e)
+                continue
+            finally:
+                synthesise_next()
+
+            if self._interruptions != interruptions:
+                self._discard_segment(audio)
+                break
+
+            self._play_segment(audio)
+
+        for future in pending:
+            if not future.cancel():
+                future.add_done_callback(discard)
 
+    def _play_audio(self, frames, width, channels, rate):
+        """
+        Play audio through the shared audio output, blocking until
+        it's played (or the voice is interrupted)
+
+        Arguments:
+            frames {bytes-like} -- Interleaved PCM samples
+            width {int} -- Bytes per sample
+            channels {int} -- Number of channels
+            rate {int} -- Samples per second
+
+        Returns:
+            {bool} -- {False} if the audio output isn't available
+        """
+        playback = self.router(
+            'audio',
+            'play',
+            frames=frames,
+            width=width,
+            channels=channels,
+            rate=rate,
+            on_start=self._on_playback_start,
+            on_end=self._on_playback_end)
+        if playback is None:
+            return False
+
+        self._playback = playback
+        playback.wait()
+        self._playback = None
         return True
 
+    def _on_playback_start(self, timestamp):
+        """
+        The audio output started playing audio of the current
+        utterance
+
+        Arguments:
+            timestamp {float} -- When it was heard
+                                 ({time.perf_counter()})
+        """
+        message = self._producing
+        if message is not None and self._played_until is None:
+            message.mark(LatencyTrace.PLAYING, timestamp)
+
+    def _on_playback_end(self, timestamp, interrupted):
+        """
+        The audio output finished playing audio of the current
+        utterance
+
+        Arguments:
+            timestamp {float} -- When it was last heard
+                                 ({time.perf_counter()}, or {None} if
+                                 it was never played)
+            interrupted {bool} -- Was it stopped before the end?
+        """
+        if timestamp is not None:
+            self._played_until = timestamp
+
     def _on_start_speaking(self,
                            text=None,
                            text_to_show=None,
@@ -632,18 +1143,43 @@ class ThreadedBaseVoice(AbstractVoiceController):
             state {int} -- State of the Wizard
         """
         self._is_speaking = True
-        self.router('wizard', 'now_speaking', text=text)
+
+        parts = self._combined_parts.pop(text, None)
+        if parts is None:
+            self.router('wizard', 'now_speaking', text=text)
+        else:
+            self.router('wizard', 'now_speaking', text=text, parts=parts)
         self.router('output', 'now_speaking', text=text_to_show, orb=state)
 
-    def _on_stop_speaking(self, state=None, loading=False):
+    def _on_stop_speaking(self,
+                          state=None,
+                          loading=False,
+                          timestamp=None,
+                          message=None):
         """
         Update NottReal to denote we've finished speaking (will request
         the outputs to update if needed).
 
         Keyword arguments:
             state {int} -- State of the VUI (if external to NottReal)
+            loading {bool} -- Was a loading message
+            timestamp {float} -- When the audio output finished playing
+                                 the voice ({time.perf_counter()}, or
+                                 {None} for now)
+            message {Message} -- Message that has stopped (default:
+                                 {None}, the current message if the
+                                 voice is blocking, otherwise none)
         """
-        self._is_speaking = False
+        with self._queue_changed:
+            self._is_speaking = False
+            self._queue_changed.notify()
+
+        if message is None and self._blocking:
+            message = self._take_trace()
+
+        if message is not None:
+            message.mark(LatencyTrace.STOPPED, timestamp)
+            self._report_latency(message)
 
         if not loading:
             if (state is None and self._opt_listen_after.value) \
@@ -663,6 +1199,75 @@ class ThreadedBaseVoice(AbstractVoiceController):
                     'change_state',
                     state=VUIState.RESTING)
 
+    def _take_trace(self):
+        """
+        Take the message being produced, so its timings are no longer
+        reported when the next message is taken off the queue (e.g. for
+        a non-blocking voice to report them once it's told the message
+        has been spoken)
+
+        Returns:
+            {Message} -- {None} if there is no such message
+        """
+        message, self._trace = self._trace, None
+        return message
+
+    def _report_latency(self, message=None):
+        """
+        Send the timings of an utterance to the data recorder and the
+        statistics (once only)
+
+        Keyword arguments:
+            message {Message} -- Message to report (default: {None},
+                                 the current utterance)
+        """
+        if message is None:
+            message = self._take_trace()
+        if message is None:
+            return
+
+        for part in message.parts:
+            self.router('data', 'latency', text=part.text, trace=part.trace)
+            self.router('stats', 'utterance_latency', trace=part.trace)
+
+    def _report_interrupt_latency(self):
+        """
+        Log the time from the Wizard interrupting the voice to the
+        voice stopping, and send it to the statistics (if the voice
+        was interrupted)
+        """
+        interrupted_at, self._interrupted_at = self._interrupted_at, None
+        if interrupted_at is None:
+            return
+
+        latency = time.perf_counter() - interrupted_at
+        Logger.info(
+            __name__,
+            'Voice stopped %.1f ms after being interrupted',
+            latency * 1e3)
+        self.router('stats', 'interrupt_latency', duration=latency)
+
+    def send_to_recorder(self, text, cat=None, id=None, slots=None):
+        """
+        Send data to the data recorder. If the text combines several
+        queued messages, each message is recorded.
+
+        Arguments:
+            text {str} -- Text from the top of the queue
+
+        Keyword Arguments:
+            cat {str} -- Category ID if a prepared message
+            id {str} -- Prepared message ID if a prepared message
+            slots {dict(str,str)} -- Slots changed by the user
+        """
+        message = self._producing
+        if message is None or len(message.parts) == 1 \
+                or message.text != text:
+            return super().send_to_recorder(text, cat, id, slots)
+
+        for part in message.parts:
+            super().send_to_recorder(part.text, part.cat, part.id, part.slots)
+
     def _interrupt_voice(self):
         """
         Immediately cancel waiting (if we are waiting)
@@ -695,6 +1300,8 @@ class VoiceOutputToLog(ThreadedBaseVoice):
     Extends:
         AbstractVoiceSystem
     """
+    NAME = 'Output to log'
+
     def __init__(self, nottreal, args):
         """
         Create the thread that sends commands to the log
@@ -732,9 +1339,6 @@ class VoiceOutputToLog(ThreadedBaseVoice):
             'deregister_option',
             option=self._opt_dont_simulate)
 
-    def name(self):
-        return 'Output to log'
-
     def _set_no_waiting(self, value):
         """
         Change the artificial waiting for the delay in the
@@ -748,7 +1352,8 @@ class VoiceOutputToLog(ThreadedBaseVoice):
         """
         Logger.info(
             __name__,
-            'Set no simulated speaking time to %r' % value)
+            'Set no simulated speaking time to %r',
+            value)
         return True
 
     def _produce_voice(self,
@@ -772,7 +1377,7 @@ class VoiceOutputToLog(ThreadedBaseVoice):
             slots {dict(str,str)} -- Slots changed by the user
         """
         self.send_to_recorder(text, cat, id, slots)
-        Logger.info(__name__, 'Now saying "%s"' % text)
+        Logger.info(__name__, 'Now saying "%s"', text)
 
         if not self._opt_dont_simulate.value:
             timeout = len(text)/10
@@ -781,11 +1386,34 @@ class VoiceOutputToLog(ThreadedBaseVoice):
 
 class VoiceShellCmd(ThreadedBaseVoice):
     """
-    Call a command via the shell to generate the voice.
+    Call a command via the shell to generate the voice, or send the
+    text to a command that is kept running (see {CoProcess}).
+
+    If a command to render the voice to a file is configured, the
+    audio of prepared messages without slots is rendered in the
+    background when they are loaded, and played from the cache
+    instead of calling the command to speak. The audio of messages
+    the Wizard selects is also rendered speculatively, and kept in
+    a temporary directory in case they're spoken. Long messages are
+    rendered and played a sentence at a time. If there's no command
+    to play rendered audio, it's played by the shared audio output.
 
     Extends:
         AbstractVoiceSystem
+
+    Variables:
+        CONFIG_SECTION {str} -- Section of the settings file
+        RE_SLOT {re.Pattern} -- Slot in a prepared message
+        SPECULATE_WORKERS {int} -- Number of speculative renders at
+                                   once
+        SPECULATE_KEEP {int} -- Number of speculative renders to keep
     """
+    NAME = 'Shell command'
+    CONFIG_SECTION = 'VoiceShellCmd'
+    RE_SLOT = re.compile(r'\[([\w /\*\$|]*)\]')
+    SPECULATE_WORKERS = 2
+    SPECULATE_KEEP = 8
+
     def __init__(self, nottreal, args):
         """
         Create the thread that sends commands to the external shell
@@ -805,29 +1433,445 @@ class VoiceShellCmd(ThreadedBaseVoice):
         self._cfg = self.nottreal.config.cfg()
 
         self._command_speak = self._cfg.get(
-            'VoiceShellCmd',
+            self.CONFIG_SECTION,
             'command_speak')
         self._command_interrupt = self._cfg.get(
-            'VoiceShellCmd',
+            self.CONFIG_SECTION,
             'command_interrupt')
 
-    def name(self):
-        return 'Shell command'
+        self._coprocess = None
+        command_coprocess = self._cfg.get(
+            self.CONFIG_SECTION,
+            'command_coprocess',
+            fallback='')
+        if len(command_coprocess) > 0:
+            try:
+                self._coprocess = CoProcess(
+                    command_coprocess.split(),
+                    protocol=self._cfg.get(
+                        self.CONFIG_SECTION,
+                        'coprocess_protocol',
+                        fallback=CoProcess.PROTOCOL_LINE),
+                    interrupt=self._cfg.get(
+                        self.CONFIG_SECTION,
+                        'coprocess_interrupt',
+                        fallback=''),
+                    timeout=self._cfg.getfloat(
+                        self.CONFIG_SECTION,
+                        'coprocess_timeout',
+                        fallback=CoProcess.TIMEOUT))
+            except ValueError as e:
+                Logger.error(
+                    __name__,
+                    'Not using the co-process, calling command_speak '
+                    'instead: %s',
+                    e)
+
+        if self._coprocess is not None:
+            try:
+                self._coprocess.start()
+            except OSError as e:
+                Logger.error(
+                    __name__,
+                    'Could not start "%s": %s',
+                    command_coprocess,
+                    e)
+
+        self._proc = None
+        self._cache = None
+        self._command_render = ''
+        self._command_play = ''
+        self._stop_warming = threading.Event()
+
+        self._speculator = ThreadPoolExecutor(
+            max_workers=self.SPECULATE_WORKERS)
+        self._speculative = OrderedDict()
+        self._speculative_lock = threading.Lock()
+        self._speculative_dir = tempfile.TemporaryDirectory(
+            prefix='nottreal-')
+
+        self._segment_ids = itertools.count()
+
+        self._opt_speculate = WizardOption(
+                key=__name__ + '.speculate',
+                label='Prepare the audio of selected messages',
+                category=WizardOption.CAT_OUTPUT,
+                method=self._set_speculate,
+                default=True,
+                restorable=True)
+        self.router(
+            'wizard',
+            'register_option',
+            option=self._opt_speculate)
+
+        self._opt_pipeline = WizardOption(
+                key=__name__ + '.pipeline',
+                label='Speak long messages a sentence at a time',
+                category=WizardOption.CAT_OUTPUT,
+                method=self._set_pipeline,
+                default=True,
+                restorable=True)
+        self.router(
+            'wizard',
+            'register_option',
+            option=self._opt_pipeline)
+
+    def packdown(self):
+        """
+        Packdown this voice subsystem (e.g. if the user changes
+        the system used)
+        """
+        super().packdown()
+
+        self._stop_warming.set()
+        self._clear_speculative()
+        self._speculator.shutdown(wait=False)
+        self._speculative_dir.cleanup()
+
+        if self._coprocess is not None:
+            self._coprocess.stop()
+
+        self.router(
+            'wizard',
+            'deregister_option',
+            option=self._opt_speculate)
+
+        self.router(
+            'wizard',
+            'deregister_option',
+            option=self._opt_pipeline)
+
+    def messages_loaded(self, msgs):
+        """
+        Render the audio of the prepared messages without slots
+        into the cache (in a separate thread)
+
+        Arguments:
+            msgs {OrderedDict} -- Prepared messages by their ID
+        """
+        self._stop_warming.set()
+        self._load_cache()
+        if self._cache is None:
+            return
+
+        texts = [msg['text'].strip() for msg in msgs.values()
+                 if not self.RE_SLOT.search(msg['text'])]
+
+        self._stop_warming = threading.Event()
+        thread = threading.Thread(
+            target=self._warm_cache,
+            args=(texts, self._stop_warming))
+        thread.daemon = True
+        thread.start()
+
+    def speculate(self, texts):
+        """
+        Render the audio of text the Wizard has selected, in case it's
+        spoken. Renders that haven't started for text that is no longer
+        selected are cancelled.
+
+        Arguments:
+            texts {[str]} -- Text, most likely to be spoken first
+        """
+        if not self._opt_speculate.value or len(self._command_render) == 0:
+            return
+
+        keys = []
+        for text in texts:
+            text = text.strip()
+            if len(text) == 0 or self.RE_SLOT.search(text):
+                continue
+
+            markup, _ = self._prepare_markup(text)
+            key = self._cache_key(markup)
+            if self._cache is not None and key in self._cache:
+                continue
+            keys.append((key, markup))
+
+        with self._speculative_lock:
+            wanted = set(key for key, _ in keys)
+            for key, future in list(self._speculative.items()):
+                if key not in wanted and future.cancel():
+                    del self._speculative[key]
+
+            for key, markup in keys:
+                if key not in self._speculative:
+                    self._speculative[key] = self._speculator.submit(
+                        self._render_speculative,
+                        markup,
+                        os.path.join(
+                            self._speculative_dir.name,
+                            key + '.wav'))
+
+            for key, _ in reversed(keys):
+                self._speculative.move_to_end(key)
+
+            while len(self._speculative) > self.SPECULATE_KEEP:
+                _, future = self._speculative.popitem(last=False)
+                self._discard_speculative(future)
+
+    def _set_speculate(self, value):
+        """
+        Change whether the audio of selected messages is rendered
+        before they're spoken
+
+        Arguments:
+            value {bool} -- New checked status
+
+        Return:
+            {bool} -- Always {True}
+        """
+        Logger.info(
+            __name__,
+            'Set preparing the audio of selected messages to %r',
+            value)
+        if not value:
+            self._clear_speculative()
+        return True
+
+    def _set_pipeline(self, value):
+        """
+        Change whether long messages are synthesised and played a
+        sentence at a time
+
+        Arguments:
+            value {bool} -- New checked status
+
+        Return:
+            {bool} -- Always {True}
+        """
+        Logger.info(
+            __name__,
+            'Set speaking long messages a sentence at a time to %r',
+            value)
+        return True
+
+    def _render_speculative(self, markup, file):
+        """
+        Render the voice to a file, in a worker thread
+
+        Arguments:
+            markup {str} -- Text prepared for the voice subsystem
+            file {str} -- File to write the audio to
+
+        Returns:
+            {str} -- The file, or {None} if it wasn't rendered
+        """
+        try:
+            if self._render(markup, file):
+                return file
+        except OSError as e:
+            Logger.warning(__name__, 'Could not prepare audio: %s', e)
+        return None
+
+    def _speculative_audio(self, key):
+        """
+        Retrieve the speculatively rendered audio for a key. If it's
+        still being rendered, wait for it, as that's quicker than
+        starting again.
+
+        Arguments:
+            key {str} -- Key of the audio
+
+        Returns:
+            {str} -- Path to the file, or {None} if there isn't any
+        """
+        with self._speculative_lock:
+            future = self._speculative.get(key)
+            if future is None or future.cancel():
+                self._speculative.pop(key, None)
+                return None
+            self._speculative.move_to_end(key)
+
+        return future.result()
+
+    def _discard_speculative(self, future):
+        """
+        Cancel a speculative render, or remove its file once rendered
+
+        Arguments:
+            future {Future} -- Speculative render
+        """
+        if future.cancel():
+            return
+
+        def remove(future):
+            file = future.result()
+            if file is not None:
+                try:
+                    os.remove(file)
+                except OSError:
+                    pass
+
+        future.add_done_callback(remove)
+
+    def _clear_speculative(self):
+        """
+        Cancel or discard every speculative render
+        """
+        with self._speculative_lock:
+            futures = list(self._speculative.values())
+            self._speculative.clear()
+
+        for future in futures:
+            self._discard_speculative(future)
+
+    def _load_cache(self):
+        """
+        Open the audio cache of the current configuration, if a
+        command to render the voice to a file is configured
+        """
+        self._cache = None
+
+        self._command_render = self._cfg.get(
+            self.CONFIG_SECTION,
+            'command_render',
+            fallback='')
+        self._command_play = self._cfg.get(
+            self.CONFIG_SECTION,
+            'command_play',
+            fallback='')
+        if len(self._command_render) == 0 \
+                or (len(self._command_play) == 0
+                    and not self.router('audio', 'available')):
+            return
+
+        directory = os.path.join(
+            self.nottreal.config.config_dir,
+            self._cfg.get('AudioCache', 'directory', fallback='cache'))
+        max_size = self._cfg.getint('AudioCache', 'max_size', fallback=256)
+
+        try:
+            self._cache = AudioCache(directory, max_size * 1024 * 1024)
+        except OSError as e:
+            Logger.error(
+                __name__,
+                'Could not open the audio cache "%s": %s',
+                directory,
+                e)
+
+    def _warm_cache(self, texts, stop):
+        """
+        Render the audio for text that isn't already in the cache.
+        Run this in a separate thread.
+
+        Arguments:
+            texts {[str]} -- Text of the prepared messages
+            stop {threading.Event} -- Set to stop rendering
+        """
+        cache = self._cache
+        rendered = 0
+        for text in texts:
+            if stop.is_set():
+                break
+            if len(text) == 0:
+                continue
+
+            markup, _ = self._prepare_markup(text)
+            key = self._cache_key(markup)
+            if key not in cache and cache.put(
+                    key,
+                    lambda file: self._render(markup, file)):
+                rendered += 1
+
+        Logger.debug(
+            __name__,
+            'Rendered %d prepared messages into the audio cache',
+            rendered)
+
+    def _cache_key(self, markup):
+        """
+        Key of the audio for some markup. The markup includes
+        anything that changes the voice (e.g. Cerevoice's options).
+
+        Arguments:
+            markup {str} -- Text prepared for the voice subsystem
+
+        Returns:
+            {str}
+        """
+        return AudioCache.key(
+            self.__class__.__name__,
+            self._command_render,
+            markup)
+
+    def _render(self, markup, file):
+        """
+        Render the voice to a file
+
+        Arguments:
+            markup {str} -- Text prepared for the voice subsystem
+            file {str} -- File to write the audio to
+
+        Returns:
+            {bool} -- {True} if the command succeeded
+        """
+        cmd = self._command(self._command_render, text=markup, file=file)
+        return Popen(cmd).wait() == 0
+
+    def _command(self, command, **values):
+        """
+        Split a configured command into its arguments, then substitute
+        values into each argument (so values may contain spaces)
+
+        Arguments:
+            command {str} -- Configured command
+            **values {str} -- Values to substitute
+
+        Returns:
+            {[str]}
+        """
+        return [arg % values for arg in command.split()]
+
+    def _prepare_markup(self, text):
+        """
+        Prepare the text for the voice subsystem and for display
+
+        Arguments:
+            text {str} -- Text from the Wizard manager window
+
+        Return:
+            {(str, str)} -- Text for the voice subsystem and the text
+                to show ({None} if should not be written to screen)
+        """
+        return (text.replace('"', ''), text)
 
     def _prepare_text(self, text):
         """
         Construct the command for the shell execution and
-        prepare the text for display
+        prepare the text for display. Audio in the cache is played
+        instead, and if there is a co-process, the text is sent to it
+        instead.
 
         Arguments:
             text {str} -- Text from the Wizard manager window
 
         Return:
-            {(str, str)} -- Command and the prepared text
+            {(str/[str]/WavFile, str)} -- Command (or text for the
+                co-process, or audio to play) and the prepared text
                 ({None} if should not be written to screen)
         """
-        cmd_text = text.replace('"', '')
-        return (self._command_speak % cmd_text, text)
+        markup, text_to_show = self._prepare_markup(text)
+
+        filepath = None
+        if len(self._command_render) > 0:
+            key = self._cache_key(markup)
+            if self._cache is not None:
+                filepath = self._cache.get(key)
+            if filepath is None:
+                filepath = self._speculative_audio(key)
+
+        audio = None
+        if filepath is not None:
+            audio = self._playable(filepath)
+        if audio is not None:
+            Logger.debug(__name__, 'Playing prepared audio of "%s"', text)
+            return (audio, text_to_show)
+
+        if self._coprocess is not None:
+            return (markup, text_to_show)
+
+        return (self._command_speak % markup, text_to_show)
 
     def _produce_voice(self,
                        text,
@@ -837,11 +1881,14 @@ class VoiceShellCmd(ThreadedBaseVoice):
                        slots=None):
         """
         Receive the text (which should be a command), and then
-        call it.
+        call it (or send the text to the co-process, or play the
+        audio).
 
         Arguments:
             text {str} -- Text to record as being produced
-            prepared_cmd {str} -- Command to call through a shell
+            prepared_cmd {str/[str]/WavFile} -- Command to call through
+                                                a shell (or its
+                                                arguments), or audio
 
         Keyword Arguments:
             cat {str} -- Category ID if a prepared message
@@ -849,16 +1896,186 @@ class VoiceShellCmd(ThreadedBaseVoice):
             slots {dict(str,str)} -- Slots changed by the user
         """
         self.send_to_recorder(text, cat, id, slots)
-        Logger.debug(__name__, 'Calling %s' % prepared_cmd)
 
-        proc = Popen(prepared_cmd.split())
-        proc.wait()
+        if isinstance(prepared_cmd, WavFile):
+            self._play_wav(prepared_cmd)
+            return
 
-    def _interrupt_voice(self):
+        if self._coprocess is not None and isinstance(prepared_cmd, str):
+            Logger.debug(__name__, 'Sending "%s"', prepared_cmd)
+            self._coprocess.send(prepared_cmd)
+            return
+
+        self._call(prepared_cmd)
+
+    def _call(self, cmd):
         """
-        Immediately cancel waiting (if we are waiting)
+        Call a command and wait for it to finish
+
+        Arguments:
+            cmd {str/[str]} -- Command to call through a shell (or
+                               its arguments)
+        """
+        Logger.debug(__name__, 'Calling %s', cmd)
+        if isinstance(cmd, str):
+            cmd = cmd.split()
+
+        self._proc = ProcessGroup.popen(cmd)
+        self._proc.wait()
+        self._proc = None
+
+    def _playable(self, filepath):
+        """
+        Prepare to play a rendered file, with the command to play it,
+        or with the shared audio output if there isn't one
+
+        Arguments:
+            filepath {str} -- Path to the file
+
+        Returns:
+            {[str]/WavFile} -- Command, or the mapped file ({None} if
+                               it can't be played)
+        """
+        if len(self._command_play) > 0:
+            return self._command(self._command_play, file=filepath)
+
+        if not self.router('audio', 'available'):
+            return None
+        return self._map_audio(filepath)
+
+    def _map_audio(self, filepath):
+        """
+        Map a WAV file to play it with the shared audio output
+
+        Arguments:
+            filepath {str} -- Path to the file
+
+        Returns:
+            {WavFile} -- {None} if it can't be mapped
+        """
+        try:
+            return WavFile(filepath)
+        except (OSError, ValueError) as e:
+            Logger.warning(__name__, 'Could not play audio: %s', e)
+            return None
+
+    def _play_wav(self, wav):
+        """
+        Play a mapped file with the shared audio output, then unmap it
+
+        Arguments:
+            wav {WavFile} -- File to play
+        """
+        self._play_audio(wav.frames, wav.width, wav.channels, wav.rate)
+        wav.close()
+
+    def _segments(self, text, prepared_text):
+        """
+        Split long messages into sentences, if their audio can be
+        rendered, and the whole message isn't already rendered
+
+        Arguments:
+            text {str} -- Text from the top of the queue
+            prepared_text {str/[str]} -- Command from #prepare_text()
+
+        Return:
+            {[str]} -- Segments, or {None} to speak the whole text
+        """
+        if not self._opt_pipeline.value \
+                or len(self._command_render) == 0 \
+                or (len(self._command_play) == 0
+                    and not self.router('audio', 'available')) \
+                or self._coprocess is not None \
+                or not isinstance(prepared_text, str):
+            return None
+
+        return self._split_segments(text)
+
+    def _synthesise_segment(self, segment):
+        """
+        Render the audio of one segment (or find it already rendered)
+
+        Arguments:
+            segment {str} -- Segment of text
+
+        Return:
+            {([str]/WavFile, str)} -- Command to play the segment (or
+                                      its audio), and the temporary
+                                      file to remove afterwards (if
+                                      any)
+        """
+        markup, _ = self._prepare_markup(segment)
+        key = self._cache_key(markup)
+
+        filepath = None
+        if self._cache is not None:
+            filepath = self._cache.get(key)
+        if filepath is None:
+            filepath = self._speculative_audio(key)
+        if filepath is not None:
+            audio = self._playable(filepath)
+            if audio is not None:
+                return (audio, None)
+
+        filepath = self._render_speculative(
+            markup,
+            os.path.join(
+                self._speculative_dir.name,
+                'segment-%d.wav' % next(self._segment_ids)))
+        if filepath is None:
+            return (self._command_speak % markup, None)
+
+        audio = self._playable(filepath)
+        if audio is None:
+            return (self._command_speak % markup, filepath)
+
+        return (audio, filepath)
+
+    def _play_segment(self, audio):
+        """
+        Play the audio of one segment
+
+        Arguments:
+            audio {([str]/WavFile, str)} -- Command (or audio) and
+                                            temporary file
+        """
+        played, _ = audio
+        if isinstance(played, WavFile):
+            self._play_wav(played)
+        else:
+            self._call(played)
+        self._discard_segment(audio)
+
+    def _discard_segment(self, audio):
+        """
+        Remove the temporary file of a segment
+
+        Arguments:
+            audio {([str]/WavFile, str)} -- Command (or audio) and
+                                            temporary file
+        """
+        played, filepath = audio
+        if isinstance(played, WavFile):
+            played.close()
+        if filepath is not None:
+            try:
+                os.remove(filepath)
+            except OSError:
+                pass
+
+    def _interrupt_voice(self):
         """
-        if len(self._command_interrupt) > 0:
+        Stop the command that is speaking, and any processes it
+        started, with a signal. If it can't be signalled, interrupt
+        the co-process (if it's speaking), or call the interrupt
+        command.
+        """
+        if ProcessGroup.signal(self._proc):
+            Logger.debug(__name__, 'Signalled the voice command to stop')
+        elif self._coprocess is not None:
+            if self._coprocess.interrupt():
+                Logger.debug(__name__, 'Interrupted the co-process')
+        elif len(self._command_interrupt) > 0:
             return Popen(self._command_interrupt.split())
         else:
             Logger.error('voice', 'No interrupt command supplied')
@@ -1,11 +1,15 @@
 
 from ..utils.log import Logger
-from ..models.m_mvc import VUIState, WizardAlert
+from ..models.m_mvc import LatencyTrace, VUIState, WizardAlert, WizardOption
 from .c_voice import NonBlockingThreadedBaseVoice
 
-from collections import deque
+from collections import deque, OrderedDict
 
 import importlib
+import itertools
+import threading
+import time
+import uuid
 
 
 class VoiceActiveMQ(NonBlockingThreadedBaseVoice):
@@ -28,16 +32,51 @@ class VoiceActiveMQ(NonBlockingThreadedBaseVoice):
     `speaking` is happening. This allows for a remote system to
     block new messages.
 
+    Each message is sent with a `correlation-id` header (and a
+    `timestamp` header, in milliseconds since the epoch). If the state
+    messages sent back have the same `correlation-id` header, they're
+    matched to the message, otherwise they're matched to the oldest
+    message that hasn't been spoken (or finished). The time from
+    sending each message to it being spoken and then finished is
+    recorded.
+
+    The connection is made (and remade if it's lost) in the background,
+    waiting longer after each failed attempt. While not connected,
+    messages are buffered and sent once reconnected. Each message asks
+    the server for a receipt (with its correlation ID as the receipt
+    ID), and messages without a receipt when the connection is lost
+    are sent again once reconnected, so the other end may receive a
+    message twice, with the same `correlation-id`.
+
     Extends:
         NonBlockingThreadedBaseVoice
 
     Variables:
         RECEIVE_QUEUE, SEND_QUEUE {int} -- ActiveMQ queue identifiers
+        HEADER_CORRELATION_ID {str} -- Header of a message's ID
+        HEADER_TIMESTAMP {str} -- Header of when a message was sent
+        HEADER_RECEIPT {str} -- Header asking the server for a receipt
+        SENT, SPEAKING, FINISHED {str} -- Stages of a message
+        MAX_IN_FLIGHT {int} -- Maximum number of messages waiting to
+                               finish before the oldest is forgotten
+        RECONNECT_DELAY {float} -- Seconds before the first attempt to
+                                   reconnect (doubled after each
+                                   failed attempt)
 
     Extends:
         AbstractVoiceSystem
     """
+    NAME = 'ActiveMQ'
+    PROBE_MODULES = 'stomp'
     RECEIVE_QUEUE, SEND_QUEUE = range(0, 2)
+    HEADER_CORRELATION_ID = 'correlation-id'
+    HEADER_TIMESTAMP = 'timestamp'
+    HEADER_RECEIPT = 'receipt'
+    SENT = 'sent'
+    SPEAKING = 'speaking'
+    FINISHED = 'finished'
+    MAX_IN_FLIGHT = 256
+    RECONNECT_DELAY = .5
 
     def __init__(self, nottreal, args):
         """
@@ -58,7 +97,7 @@ class VoiceActiveMQ(NonBlockingThreadedBaseVoice):
         except ModuleNotFoundError:
             Logger.warning(
                 __name__,
-                '"stomp" module not installed - ' +
+                '"stomp" module not installed - '
                 'disabling ActiveMQ voice')
             pass
 
@@ -74,7 +113,11 @@ class VoiceActiveMQ(NonBlockingThreadedBaseVoice):
 
         self._cfg = self.nottreal.config.cfg()
 
-        self._queued_messages = deque()
+        self._in_flight = OrderedDict()
+        self._in_flight_lock = threading.Lock()
+        session = uuid.uuid4().hex[:8]
+        self._correlation_ids = (
+            '%s-%d' % (session, i) for i in itertools.count())
 
         self._host = self._cfg.get('ActiveMQ', 'host')
         self._port = self._cfg.getint('ActiveMQ', 'port')
@@ -88,27 +131,43 @@ class VoiceActiveMQ(NonBlockingThreadedBaseVoice):
             'ActiveMQ',
             'message_interrupt')
 
-        Logger.debug(
-            __name__,
-            'Connecting to ActiveMQ server %s:%d' % (self._host, self._port))
-
-        try:
-            self._conn = self.stomp.Connection([(self._host, self._port)])
-            self._conn.set_listener('', VoiceActiveMQ.Listener(self))
-            self._conn.connect(self._username, self._password, wait=True)
-
-            Logger.debug(__name__, 'Subscribing to %s' % self._receive_queue)
-            self._conn.subscribe(
-                destination=self._receive_queue,
-                id=self.RECEIVE_QUEUE,
-                ack='auto')
-        except self.stomp.exception.ConnectFailedException:
-            self._conn = False
-            Logger.critical(
-                __name__,
-                'Failed to connect to ActiveMQ/STOMP server')
-
-            self._alert_not_connected()
+        heartbeat = self._cfg.getint('ActiveMQ', 'heartbeat', fallback=0)
+        self._reconnect_max_delay = self._cfg.getfloat(
+            'ActiveMQ',
+            'reconnect_max_delay',
+            fallback=30.)
+        self._outbound = deque(maxlen=self._cfg.getint(
+            'ActiveMQ',
+            'buffer_size',
+            fallback=100))
+        self._outbound_lock = threading.Lock()
+        self._unreceipted = OrderedDict()
+
+        self._conn = self.stomp.Connection(
+            [(self._host, self._port)],
+            heartbeats=(heartbeat, heartbeat),
+            reconnect_attempts_max=1)
+        self._conn.set_listener('', VoiceActiveMQ.Listener(self))
+
+        self._connected = threading.Event()
+        self._reconnect = threading.Event()
+        self._stop_connecting = False
+        self._reconnect_delay = self.RECONNECT_DELAY
+
+        self._opt_reconnect = WizardOption(
+                key=__name__ + '.reconnect',
+                label='Reconnect to ActiveMQ/STOMP server',
+                method=self._reconnect_now,
+                category=WizardOption.CAT_OUTPUT,
+                choose=WizardOption.BUTTON)
+        self.router(
+            'wizard',
+            'register_option',
+            option=self._opt_reconnect)
+
+        thread = threading.Thread(target=self._manage_connection)
+        thread.daemon = True
+        thread.start()
 
     def enabled(self):
         return self._enabled
@@ -125,8 +184,10 @@ class VoiceActiveMQ(NonBlockingThreadedBaseVoice):
         alert = WizardAlert(
             'ActiveMQ/STOMP Connection Error',
             ('Could not connect to the ActiveMQ/STOMP server "%s:%s".\n\n'
-                + 'Ensure ActiveMQ/STOMP is running and try again.')
-            % (self._host, self._port),
+                + 'Ensure ActiveMQ/STOMP is running. NottReal will keep '
+                + 'trying to connect, and will send up to %d messages '
+                + 'once it has.')
+            % (self._host, self._port, self._outbound.maxlen),
             WizardAlert.LEVEL_ERROR)
 
         self.router('wizard', 'show_alert', alert=alert)
@@ -141,15 +202,291 @@ class VoiceActiveMQ(NonBlockingThreadedBaseVoice):
         if not self.enabled():
             return
 
-        if self._conn:
-            self._conn.disconnect()
+        self.router(
+            'wizard',
+            'deregister_option',
+            option=self._opt_reconnect)
+
+        self._stop_connecting = True
+        self._reconnect.set()
+
+        if self._connected.is_set():
+            self._connected.clear()
+            try:
+                self._conn.disconnect()
+            except Exception as e:
+                Logger.warning(
+                    __name__,
+                    'Could not disconnect from ActiveMQ/STOMP server: %s',
+                    e)
+
+    def _manage_connection(self):
+        """
+        Connect to the server, and reconnect whenever the connection
+        is lost, waiting longer after each failed attempt. Run this in
+        a separate thread.
+        """
+        alerted = False
+        while not self._stop_connecting:
+            if not self._connected.is_set():
+                Logger.debug(
+                    __name__,
+                    'Connecting to ActiveMQ server %s:%d',
+                    self._host,
+                    self._port)
+                try:
+                    self._conn.connect(
+                        self._username,
+                        self._password,
+                        wait=True)
+
+                    Logger.debug(
+                        __name__,
+                        'Subscribing to %s',
+                        self._receive_queue)
+                    self._conn.subscribe(
+                        destination=self._receive_queue,
+                        id=self.RECEIVE_QUEUE,
+                        ack='auto')
+                except Exception as e:
+                    Logger.warning(
+                        __name__,
+                        'Failed to connect to ActiveMQ/STOMP server (%s), '
+                        'trying again in %.1f s',
+                        e.__class__.__name__,
+                        self._reconnect_delay)
+                    if not alerted:
+                        self._alert_not_connected()
+                        alerted = True
+
+                    self._reconnect.wait(self._reconnect_delay)
+                    self._reconnect.clear()
+                    self._reconnect_delay = min(
+                        self._reconnect_delay * 2,
+                        self._reconnect_max_delay)
+                    continue
+
+                Logger.info(__name__, 'Connected to ActiveMQ/STOMP server')
+                self._reconnect_delay = self.RECONNECT_DELAY
+                self._connected.set()
+                if alerted:
+                    self.router('wizard', 'close_alert')
+                    alerted = False
+
+                self._replay()
+
+            self._reconnect.wait()
+            self._reconnect.clear()
+
+    def _on_disconnected(self):
+        """
+        Reconnect after the connection was lost (e.g. the server
+        stopped, or the heart-beats stopped)
+        """
+        if self._stop_connecting or not self._connected.is_set():
+            return
+
+        self._connected.clear()
+        Logger.warning(
+            __name__,
+            'Lost connection to ActiveMQ/STOMP server, reconnecting')
+        self._reconnect.set()
+
+    def _reconnect_now(self, _):
+        """
+        Try to connect to the server now, instead of waiting
+
+        Return:
+            {bool} -- Always {False} (the button has no value)
+        """
+        Logger.info(__name__, 'Reconnecting to ActiveMQ/STOMP server')
+        self._reconnect_delay = self.RECONNECT_DELAY
+        if self._connected.is_set():
+            self._connected.clear()
+            try:
+                self._conn.disconnect()
+            except Exception:
+                pass
+        self._reconnect.set()
+        return False
+
+    def _send(self, body, headers=None, buffer=True):
+        """
+        Send a message to the server, or buffer it (if it can be) to
+        send once reconnected. Messages are sent in order.
+
+        Arguments:
+            body {str} -- Message to send
+
+        Keyword arguments:
+            headers {dict(str,str)} -- Headers of the message
+            buffer {bool} -- Buffer the message if it can't be sent
+
+        Returns:
+            {bool} -- {True} if the message was sent
+        """
+        with self._outbound_lock:
+            if self._connected.is_set() and not self._outbound:
+                try:
+                    self._transmit(body, headers)
+                    return True
+                except Exception as e:
+                    Logger.warning(
+                        __name__,
+                        'Could not send message (%s)',
+                        e.__class__.__name__)
+                    self._on_disconnected()
+
+            if not buffer:
+                Logger.warning(
+                    __name__,
+                    'Not connected to ActiveMQ/STOMP server, dropped "%s"',
+                    body)
+                return False
+
+            if len(self._outbound) == self._outbound.maxlen:
+                dropped, dropped_headers = self._outbound[0]
+                self._forget(dropped_headers)
+                Logger.warning(
+                    __name__,
+                    'Outbound buffer full, dropped "%s"',
+                    dropped)
+            self._outbound.append((body, headers))
+
+            Logger.debug(
+                __name__,
+                'Buffered "%s" until reconnected (%d buffered)',
+                body,
+                len(self._outbound))
+            return False
+
+    def _transmit(self, body, headers):
+        """
+        Send a message to the server, and remember it until the server
+        sends its receipt (call this with the outbound lock held)
+
+        Arguments:
+            body {str} -- Message to send
+            headers {dict(str,str)} -- Headers of the message
+
+        Raises:
+            Exception -- If the message can't be sent
+        """
+        headers = headers or {}
+        receipt = headers.get(self.HEADER_CORRELATION_ID)
+        if receipt is None:
+            self._conn.send(
+                body=body,
+                destination=self._send_queue,
+                headers=headers)
+            return
+
+        self._conn.send(
+            body=body,
+            destination=self._send_queue,
+            headers=dict(headers, **{self.HEADER_RECEIPT: receipt}))
+
+        # a server that never sends receipts can only lose as many
+        # messages as could be buffered
+        self._unreceipted[receipt] = (body, headers)
+        while len(self._unreceipted) > self._outbound.maxlen:
+            self._unreceipted.popitem(last=False)
+
+    def _on_receipt(self, receipt):
+        """
+        The server has received a message
+
+        Arguments:
+            receipt {str} -- Receipt ID of the message
+        """
+        with self._outbound_lock:
+            self._unreceipted.pop(receipt, None)
+
+    def _replay(self):
+        """
+        Send the messages that the server may not have received before
+        the connection was lost, then the messages buffered while not
+        connected
+        """
+        with self._outbound_lock:
+            if self._unreceipted:
+                Logger.info(
+                    __name__,
+                    'Sending %d messages again, as the server didn\'t '
+                    'confirm it received them',
+                    len(self._unreceipted))
+
+                messages = list(self._unreceipted.values())
+                messages.extend(self._outbound)
+                self._unreceipted.clear()
+                self._outbound.clear()
+
+                dropped = len(messages) - self._outbound.maxlen
+                for _, headers in messages[:max(dropped, 0)]:
+                    self._forget(headers)
+                self._outbound.extend(messages)
+
+            if self._outbound:
+                Logger.info(
+                    __name__,
+                    'Sending %d messages buffered while not connected',
+                    len(self._outbound))
+
+            while self._outbound and self._connected.is_set():
+                body, headers = self._outbound[0]
+                try:
+                    self._transmit(body, headers)
+                except Exception as e:
+                    Logger.warning(
+                        __name__,
+                        'Could not send buffered message (%s)',
+                        e.__class__.__name__)
+                    self._on_disconnected()
+                    return
+                self._outbound.popleft()
+
+    def _discard_buffered(self):
+        """
+        Discard the messages buffered while not connected, and those
+        that would be sent again (e.g. as the Wizard has interrupted
+        the voice)
+        """
+        with self._outbound_lock:
+            if not self._outbound and not self._unreceipted:
+                return
+
+            Logger.info(
+                __name__,
+                'Discarding %d messages buffered while not connected',
+                len(self._outbound) + len(self._unreceipted))
+            for _, headers in itertools.chain(
+                    self._unreceipted.values(),
+                    self._outbound):
+                self._forget(headers)
+            self._unreceipted.clear()
+            self._outbound.clear()
+
+    def _forget(self, headers):
+        """
+        Stop waiting for a message to finish (e.g. if it's never sent)
+
+        Arguments:
+            headers {dict(str,str)} -- Headers of the message
+        """
+        if headers is None:
+            return
 
-    def name(self):
-        return 'ActiveMQ'
+        with self._in_flight_lock:
+            self._in_flight.pop(
+                headers.get(self.HEADER_CORRELATION_ID),
+                None)
 
     class Listener():
         """
-        Listen to messages from the ActiveMQ/STOMP server
+        Listen to messages from the ActiveMQ/STOMP server. Messages,
+        receipts and errors are passed as headers and a body by
+        stomp.py 4, and as a frame by later versions, so both are
+        accepted.
 
         Extends:
             stomp.ConnectionListener
@@ -176,38 +513,65 @@ class VoiceActiveMQ(NonBlockingThreadedBaseVoice):
                 message_state_format \
                 % self._cfg.get('ActiveMQ', 'message_state_computing')
 
-        def on_error(self, headers, message):
+        def on_disconnected(self):
+            self.parent._on_disconnected()
+
+        def on_heartbeat_timeout(self, *args):
+            Logger.warning(__name__, 'ActiveMQ/STOMP heart-beat timed out')
+            self.parent._on_disconnected()
+
+        def on_receipt(self, headers, message=None):
+            if message is None:
+                headers = headers.headers
+
+            self.parent._on_receipt(headers.get('receipt-id'))
+
+        def on_error(self, headers, message=None):
+            if message is None:
+                headers, message = headers.headers, headers.body
+
             Logger.error(
                 __name__,
-                'Error passed via ActiveMQ/STOMP: %s' % message)
+                'Error passed via ActiveMQ/STOMP: %s',
+                message)
+
+        def on_message(self, headers, message=None):
+            if message is None:
+                headers, message = headers.headers, headers.body
 
-        def on_message(self, headers, message):
             if message == self._message_state_nothing:
                 Logger.debug(__name__, 'Apparently nothing is happening....')
-                self.parent._on_stop_speaking(state=VUIState.RESTING)
+                state = VUIState.RESTING
 
             elif message == self._message_state_listening:
                 Logger.debug(__name__, 'Apparently we\'re listening...')
-                self.parent._on_stop_speaking(state=VUIState.LISTENING)
+                state = VUIState.LISTENING
 
             elif message == self._message_state_computing:
                 Logger.debug(
                     __name__,
                     'Apparently computation is happening...')
-                self.parent._on_stop_speaking(state=VUIState.BUSY)
+                state = VUIState.BUSY
 
             elif message == self._message_state_speaking:
-                try:
-                    self.parent._on_start_speaking(
-                        self.parent._queued_messages.pop())
+                text = self.parent._on_remote_speaking(
+                    headers.get(self.parent.HEADER_CORRELATION_ID))
+                if text is not None:
+                    self.parent._on_start_speaking(text)
                     Logger.debug(__name__, 'Apparently we\'re speaking...')
-                except IndexError:
+                else:
                     Logger.error(
                         __name__,
                         'Apparently we\'re speaking, but we don\' know what')
+                return
 
             else:
-                Logger.warning(__name__, 'Unknown message: %s' % message)
+                Logger.warning(__name__, 'Unknown message: %s', message)
+                return
+
+            finished = self.parent._on_remote_finished(
+                headers.get(self.parent.HEADER_CORRELATION_ID))
+            self.parent._on_stop_speaking(state=state, message=finished)
 
     def _prepare_text(self, text):
         """
@@ -224,10 +588,6 @@ class VoiceActiveMQ(NonBlockingThreadedBaseVoice):
         if not self.enabled():
             return
 
-        if not self._conn:
-            Logger.critical(__name__, 'Not connected to ActiveMQ/STOMP server')
-            return ('', '')
-
         return (self._message % text, text)
 
     def _produce_voice(self,
@@ -251,26 +611,98 @@ class VoiceActiveMQ(NonBlockingThreadedBaseVoice):
         if not self.enabled():
             return
 
-        if not self._conn:
-            Logger.critical(__name__, 'Not connected to ActiveMQ/STOMP server')
-            return
+        correlation_id = next(self._correlation_ids)
+        trace = LatencyTrace(self.SENT)
+        message = self._take_trace()
+        with self._in_flight_lock:
+            self._in_flight[correlation_id] = (text, trace, message)
+            if len(self._in_flight) > self.MAX_IN_FLIGHT:
+                forgotten, _ = self._in_flight.popitem(last=False)
+                Logger.warning(
+                    __name__,
+                    'Message %s never finished, forgetting it',
+                    forgotten)
 
-        Logger.debug(__name__, 'Sending message: %s' % prepared_text)
+        Logger.debug(
+            __name__,
+            'Sending message %s: %s',
+            correlation_id,
+            prepared_text)
         self.send_to_recorder(text, cat, id, slots)
-        self._queued_messages.append(text)
-        self._conn.send(body=prepared_text, destination=self._send_queue)
+        self._send(
+            prepared_text,
+            headers={
+                self.HEADER_CORRELATION_ID: correlation_id,
+                self.HEADER_TIMESTAMP: '%d' % (time.time() * 1e3)})
+
+    def _on_remote_speaking(self, correlation_id):
+        """
+        Mark a message as being spoken
+
+        Arguments:
+            correlation_id {str} -- ID of the message, or {None} for
+                                    the oldest message not yet spoken
+
+        Returns:
+            {str} -- Text of the message, or {None} if it's unknown
+        """
+        with self._in_flight_lock:
+            if correlation_id is None:
+                correlation_id = next(
+                    (key for key, (_, trace, _) in self._in_flight.items()
+                     if len(trace.stages) == 1),
+                    None)
+
+            try:
+                text, trace, _ = self._in_flight[correlation_id]
+            except KeyError:
+                return None
+
+            if len(trace.stages) == 1:
+                trace.mark(self.SPEAKING)
+
+        return text
+
+    def _on_remote_finished(self, correlation_id):
+        """
+        Mark a message as finished, and report how long it took to be
+        spoken and then finish
+
+        Arguments:
+            correlation_id {str} -- ID of the message, or {None} for
+                                    the oldest message
+
+        Returns:
+            {Message} -- Message taken off the queue that has finished
+                         (to report its timings), or {None} if it's
+                         unknown
+        """
+        with self._in_flight_lock:
+            if correlation_id is None:
+                correlation_id = next(iter(self._in_flight), None)
+
+            try:
+                text, trace, message = self._in_flight.pop(correlation_id)
+            except KeyError:
+                return None
+
+        trace.mark(self.FINISHED)
+        Logger.debug(
+            __name__,
+            'Message %s round trip: %s',
+            correlation_id,
+            trace)
+        self.router('data', 'latency', text=text, trace=trace)
+        self.router('stats', 'remote_latency', trace=trace)
+        return message
 
     def _interrupt_voice(self):
         """
-        Immediately cancel waiting (if we are waiting)
+        Send the interrupt message (if connected, otherwise discard the
+        messages that haven't been sent yet)
         """
         if not self.enabled():
             return
 
-        if not self._conn:
-            Logger.critical(__name__, 'Not connected to ActiveMQ/STOMP server')
-            return
-
-        self._conn.send(
-            body=self._message_interrupt,
-            destination=self._send_queue)
+        if not self._send(self._message_interrupt, buffer=False):
+            self._discard_buffered()
@@ -1,16 +1,60 @@
 
 from ..utils.log import Logger
+from ..models.m_markup import MarkupRules
 from ..models.m_mvc import WizardOption
 from .c_voice import VoiceShellCmd
 
+from collections import OrderedDict
+
+import os
+import threading
+
 
 class VoiceCerevoice(VoiceShellCmd):
     """
     Use the cerevoice library (not included).
 
+    Spurts (e.g. "hmm" or "yeah!") are replaced with Cerevoice's markup
+    wherever they appear, using the rules in `spurts.tsv` in the
+    configuration directory. The markup of each text is remembered, and
+    forgotten when the rules or options change.
+
     Extends:
         VoiceShellCmd
+
+    Variables:
+        SPURTS_FILE {str} -- File of spurts in the configuration
+                             directory
+        SPURTS {OrderedDict} -- Markup of each spurt if there is no
+                                file of spurts
+        DEFAULT_CALM_MARKUP {str} -- Markup for a calm voice if it
+                                     isn't configured
+        MEMO_SIZE {int} -- Maximum number of texts to remember the
+                           markup of
     """
+    NAME = 'Cerevoice'
+    CONFIG_SECTION = 'VoiceCerevoice'
+    SPURTS_FILE = 'spurts.tsv'
+    SPURTS = OrderedDict([
+        ('oh', "<spurt audio='g0001_006'>oh</spurt>"),
+        ('hm?', "<spurt audio='g0001_012'>hm?</spurt>"),
+        ('mm', "<spurt audio='g0001_015'>mm</spurt>"),
+        ('um', "<spurt audio='g0001_015'>um</spurt>"),
+        ('um?', "<spurt audio='g0001_016'>um?</spurt>"),
+        ('erm', "<spurt audio='g0001_017'>erm</spurt>"),
+        ('er', "<spurt audio='g0001_018'>er</spurt>"),
+        ('hm hm', "<spurt audio='g0001_019'>hm hm</spurt>"),
+        ('haha', "<spurt audio='g0001_020'>haha</spurt>"),
+        ('ah?', "<spurt audio='g0001_025'>ah?</spurt>"),
+        ('ah!', "<spurt audio='g0001_026'>ah!</spurt>"),
+        ('yeah?', "<spurt audio='g0001_027'>yeah?</spurt>"),
+        ('yeah', "<spurt audio='g0001_028'>yeah</spurt>"),
+        ('yeah!', "<spurt audio='g0001_029'>yeah!</spurt>"),
+        ('oh!', "<spurt audio='g0001_038'>oh</spurt>"),
+        ('hmm', "<spurt audio='g0001_039'>hmm</spurt>")])
+    DEFAULT_CALM_MARKUP = "<usel genre='calm'>%s</usel>"
+    MEMO_SIZE = 1024
+
     def __init__(self, nottreal, args):
         """
         Create the thread that sends commands through to Cerevoice
@@ -19,6 +63,11 @@ class VoiceCerevoice(VoiceShellCmd):
             nottreal {App} -- Application instance
             args {[str]} -- Application arguments
         """
+        self._spurts = MarkupRules(None, self.SPURTS)
+        self._calm_markup = self.DEFAULT_CALM_MARKUP
+        self._memo = OrderedDict()
+        self._memo_lock = threading.Lock()
+
         super().__init__(nottreal, args)
 
     def init(self, args):
@@ -28,15 +77,6 @@ class VoiceCerevoice(VoiceShellCmd):
         """
         super().init(args)
 
-        self._cfg = self.nottreal.config.cfg()
-
-        self._command_speak = self._cfg.get(
-            'VoiceCerevoice',
-            'command_speak')
-        self._command_interrupt = self._cfg.get(
-            'VoiceCerevoice',
-            'command_interrupt')
-
         self._opt_calm_voice = WizardOption(
                 key=__name__ + '.calm',
                 label='Use a calm voice',
@@ -78,8 +118,28 @@ class VoiceCerevoice(VoiceShellCmd):
             'deregister_option',
             option=self._opt_spurts)
 
-    def name(self):
-        return 'Cerevoice'
+    def messages_loaded(self, msgs):
+        """
+        Reload the spurts and markup if the configuration has changed,
+        then prepare the audio of the prepared messages
+
+        Arguments:
+            msgs {OrderedDict} -- Prepared messages by their ID
+        """
+        calm_markup = self._cfg.get(
+            self.CONFIG_SECTION,
+            'markup_calm',
+            fallback=self.DEFAULT_CALM_MARKUP)
+        reloaded = self._spurts.load(os.path.join(
+            self.nottreal.config.config_dir,
+            self.SPURTS_FILE))
+
+        if reloaded or calm_markup != self._calm_markup:
+            self._calm_markup = calm_markup
+            with self._memo_lock:
+                self._memo.clear()
+
+        super().messages_loaded(msgs)
 
     def _set_cerevoice_spurts(self, value):
         """
@@ -94,7 +154,8 @@ class VoiceCerevoice(VoiceShellCmd):
         """
         Logger.info(
             __name__,
-            'Set substitution of available Cerevoice spurts to %r' % value)
+            'Set substitution of available Cerevoice spurts to %r',
+            value)
         return True
 
     def _set_calm(self, value):
@@ -107,51 +168,46 @@ class VoiceCerevoice(VoiceShellCmd):
         Return:
             {bool} -- Always {True}
         """
-        Logger.info(__name__, 'Set Cerevoice using a calm voice to %r' % value)
+        Logger.info(__name__, 'Set Cerevoice using a calm voice to %r', value)
         return True
 
-    def _prepare_text(self, text):
+    def _prepare_markup(self, text):
         """
-        Construct the command for the shell execution and prepare the
-        text for display
+        Add Cerevoice's markup to the text and prepare the text for
+        display
 
         Arguments:
             text {str} -- Text from the Wizard manager window
 
         Return:
-            {(str, str)} -- Command and the prepared text ({None} if
-                            should not be written to screen)
+            {(str, str)} -- Text with markup and the prepared text
+                            ({None} if should not be written to screen)
         """
+        options = (text, self._opt_spurts.value, self._opt_calm_voice.value)
+        with self._memo_lock:
+            try:
+                self._memo.move_to_end(options)
+                return self._memo[options]
+            except KeyError:
+                pass
+
         text_for_cmd = text.replace(' and', ', and')
 
         if text[-1] != '.' and text[-1] != '!' and text[-1] != '?':
             text = text + '.'
 
         if self._opt_spurts.value:
-            spurts = {
-                'oh': "<spurt audio='g0001_006'>oh</spurt>",
-                'hm?': "<spurt audio='g0001_012'>hm?</spurt>",
-                'mm': "<spurt audio='g0001_015'>mm</spurt>",
-                'um': "<spurt audio='g0001_015'>um</spurt>",
-                'um?': "<spurt audio='g0001_016'>um?</spurt>",
-                'erm': "<spurt audio='g0001_017'>erm</spurt>",
-                'er': "<spurt audio='g0001_018'>er</spurt>",
-                'hm hm': "<spurt audio='g0001_019'>hm hm</spurt>",
-                'haha': "<spurt audio='g0001_020'>haha</spurt>",
-                'ah?': "<spurt audio='g0001_025'>ah?</spurt>",
-                'ah!': "<spurt audio='g0001_026'>ah!</spurt>",
-                'yeah?': "<spurt audio='g0001_027'>yeah?</spurt>",
-                'yeah': "<spurt audio='g0001_028'>yeah</spurt>",
-                'yeah!': "<spurt audio='g0001_029'>yeah!</spurt>",
-                'oh!': "<spurt audio='g0001_038'>oh</spurt>",
-                'hmm': "<spurt audio='g0001_039'>hmm</spurt>"}
-            try:
-                text_for_cmd = spurts[text_for_cmd]
+            text_for_cmd, whole = self._spurts.rewrite(text_for_cmd)
+            if whole:
                 text = None
-            except KeyError:
-                pass
 
         if self._opt_calm_voice.value:
-            text_for_cmd = "<usel genre='calm'>%s</usel>" % text_for_cmd
+            text_for_cmd = self._calm_markup % text_for_cmd
+
+        prepared = (text_for_cmd, text)
+        with self._memo_lock:
+            self._memo[options] = prepared
+            if len(self._memo) > self.MEMO_SIZE:
+                self._memo.popitem(last=False)
 
-        return (self._command_speak % text_for_cmd, text)
+        return prepared
@@ -13,6 +13,9 @@ class VoiceNative(VoiceShellCmd):
     Extends:
         AbstractVoiceSystem
     """
+    NAME = 'Native TTS'
+    PROBE_PLATFORMS = 'Darwin, ubuntu'
+
     def __init__(self, nottreal, args):
         """
         Create the thread that sends commands to native voice.
@@ -22,12 +25,7 @@ class VoiceNative(VoiceShellCmd):
             args {[str]} -- Application arguments
         """
         super().__init__(nottreal, args)
-        self._enabled = False
-
-        if platform.system() == 'Darwin' \
-                or (platform.system() == 'Linux'
-                    and 'ubuntu' in platform.platform().lower()):
-            self._enabled = True
+        self._enabled = self.probe()
 
     def init(self, args):
         """
@@ -49,9 +47,6 @@ class VoiceNative(VoiceShellCmd):
     def enabled(self):
         return self._enabled
 
-    def name(self):
-        return 'Native TTS'
-
 
 class VoiceMacOS(VoiceNative):
     """
@@ -80,6 +75,10 @@ class VoiceWindows(ThreadedBaseVoice):
     Extends:
         AbstractVoiceSystem
     """
+    NAME = 'Native TTS'
+    PROBE_MODULES = 'win32com'
+    PROBE_PLATFORMS = 'Windows'
+
     def __init__(self, nottreal, args):
         """
         Create the thread that sends commands to SAPI
@@ -101,7 +100,7 @@ class VoiceWindows(ThreadedBaseVoice):
             except ModuleNotFoundError:
                 Logger.warning(
                     __name__,
-                    '"win32com" module not installed - ' +
+                    '"win32com" module not installed - '
                     'disabling Native TTS on Windows')
                 pass
 
@@ -119,9 +118,6 @@ class VoiceWindows(ThreadedBaseVoice):
     def enabled(self):
         return self._enabled
 
-    def name(self):
-        return 'Native TTS'
-
     def _produce_voice(self,
                        text,
                        prepared_cmd,
@@ -145,7 +141,7 @@ class VoiceWindows(ThreadedBaseVoice):
             return
 
         self.send_to_recorder(text, cat, id, slots)
-        Logger.debug(__name__, 'Speaking %s' % prepared_cmd)
+        Logger.debug(__name__, 'Speaking %s', prepared_cmd)
 
         self._speaker.Speak(prepared_cmd)
         self._speaker.SpeakCompleteEvent()
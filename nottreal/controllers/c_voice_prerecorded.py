@@ -0,0 +1,171 @@
+from ..utils.log import Logger
+from .c_voice import VoiceShellCmd
+
+from collections import OrderedDict
+
+import os
+
+
+class VoicePrerecorded(VoiceShellCmd):
+    """
+    Play recordings of the prepared messages, and speak anything else
+    (e.g. free text, or messages with their slots filled) with the
+    shell commands in another section of the settings file.
+
+    Only the commands are borrowed, so the fallback must be a section
+    of commands for the {VoiceShellCmd} voice (or one like it), not
+    the section of a voice subsystem that prepares its text
+    differently (e.g. the markup of {VoiceCerevoice}).
+
+    Recordings are PCM WAV files in the `audio` directory of the
+    configuration directory, named after the ID of their message, in
+    a directory named after the ID of its category (e.g.
+    `audio/intro/h1.wav`). A recording is played whenever the text of
+    its message is spoken unchanged.
+
+    Recordings are memory-mapped and played by the shared audio output
+    straight from the mapped file, so they start playing without being
+    read into memory. This needs PyAudio, which you can install with
+    pip:
+        pip3 install pyaudio
+
+    Extends:
+        VoiceShellCmd
+
+    Variables:
+        RECORDINGS_SECTION {str} -- Section of the settings file with
+                                    the recordings (the commands are
+                                    in the section of the fallback
+                                    voice)
+        FILE_EXT {str} -- Filename suffix of recordings
+    """
+    NAME = 'Pre-recorded audio'
+    PROBE_MODULES = 'pyaudio'
+    RECORDINGS_SECTION = 'VoicePrerecorded'
+    FILE_EXT = '.wav'
+
+    def __init__(self, nottreal, args):
+        """
+        Create the thread that plays the recordings
+
+        Arguments:
+            nottreal {App} -- Application instance
+            args {[str]} -- Application arguments
+        """
+        super().__init__(nottreal, args)
+
+    def init(self, args):
+        """
+        Load the commands of the fallback voice
+        """
+        section = self.nottreal.config.cfg().get(
+            self.RECORDINGS_SECTION,
+            'fallback_voice',
+            fallback=VoiceShellCmd.CONFIG_SECTION)
+
+        if section != VoiceShellCmd.CONFIG_SECTION \
+                and section in self.nottreal.controllers:
+            Logger.error(
+                __name__,
+                'Can\'t fall back to the "%s" voice, as only its commands '
+                'would be used, so using "%s" instead',
+                section,
+                VoiceShellCmd.CONFIG_SECTION)
+            section = VoiceShellCmd.CONFIG_SECTION
+
+        self.CONFIG_SECTION = section
+        super().init(args)
+
+        self._recordings = {}
+
+    def messages_loaded(self, msgs):
+        """
+        Find the recordings of the prepared messages, then prepare the
+        audio of the messages without a recording
+
+        Arguments:
+            msgs {OrderedDict} -- Prepared messages by their ID
+        """
+        directory = os.path.join(
+            self.nottreal.config.config_dir,
+            self._cfg.get(
+                self.RECORDINGS_SECTION,
+                'directory',
+                fallback='audio'))
+
+        recordings = {}
+        unrecorded = OrderedDict()
+        for msg_id, msg in msgs.items():
+            filepath = os.path.join(
+                directory,
+                msg['cat_id'],
+                msg['id'] + self.FILE_EXT)
+            if not self.RE_SLOT.search(msg['text']) \
+                    and os.path.isfile(filepath):
+                recordings[msg['text'].strip()] = filepath
+            else:
+                unrecorded[msg_id] = msg
+
+        self._recordings = recordings
+
+        Logger.info(
+            __name__,
+            'Found recordings of %d prepared messages in "%s"',
+            len(recordings),
+            directory)
+
+        super().messages_loaded(unrecorded)
+
+    def speculate(self, texts):
+        """
+        Render the audio of selected text without a recording, in case
+        it's spoken
+
+        Arguments:
+            texts {[str]} -- Text, most likely to be spoken first
+        """
+        super().speculate(
+            [text for text in texts
+             if text.strip() not in self._recordings])
+
+    def _prepare_text(self, text):
+        """
+        Play the recording of the text if there is one, otherwise
+        construct the command of the fallback voice
+
+        Arguments:
+            text {str} -- Text from the Wizard manager window
+
+        Return:
+            {(WavFile/str/[str], str)} -- Recording (or command) and
+                the prepared text
+        """
+        wav = self._recording(text.strip())
+        if wav is None:
+            return super()._prepare_text(text)
+
+        Logger.debug(__name__, 'Playing the recording of "%s"', text)
+        return (wav, text)
+
+    def _recording(self, text):
+        """
+        Map the recording of some text
+
+        Arguments:
+            text {str} -- Text to speak
+
+        Returns:
+            {WavFile} -- {None} if there's no recording (or it can't
+                         be played)
+        """
+        filepath = self._recordings.get(text)
+        if filepath is None:
+            return None
+
+        if not self.router('audio', 'available'):
+            Logger.warning(
+                __name__,
+                'Can\'t play recordings without an audio output')
+            return None
+
+        return self._map_audio(filepath)
@@ -1,10 +1,13 @@
 
 from ..utils.log import Logger
 from ..utils.dir import DirUtils
-from ..models.m_mvc import VUIState, WizardAlert, WizardOption
+from ..utils.profiler import StartupProfiler
+from ..models.m_mvc import (LatencyTrace, Message, VUIState, WizardAlert,
+                            WizardOption)
 from ..models.m_tsv import TSVModel
 from .c_abstract import AbstractController
 
+from collections import OrderedDict
 from os import path
 from pathlib import Path
 
@@ -206,10 +209,10 @@ class WizardController(AbstractController):
     def _edit_config(self, _):
         if platform.system() == 'Darwin':
             file_path = self._opt_config.value + path.sep + 'settings.cfg'
-            Logger.debug(__name__, 'Open "%s"' % file_path)
+            Logger.debug(__name__, 'Open "%s"', file_path)
             DirUtils.reveal_file_in_os(path)
         else:
-            Logger.debug(__name__, 'Open "%s"' % self._dir.value)
+            Logger.debug(__name__, 'Open "%s"', self._dir.value)
             DirUtils.open_in_os(self._opt_config.value)
 
     def delayed_set_config(self, directory):
@@ -227,7 +230,8 @@ class WizardController(AbstractController):
     def _trigger_delayed_set_config(self):
         Logger.debug(
             __name__,
-            "Delayed set config triggered: %r" % self._delayed_set_dir)
+            "Delayed set config triggered: %r",
+            self._delayed_set_dir)
 
         if self._delayed_set_dir:
             self._dir = self._delayed_set_dir
@@ -248,7 +252,8 @@ class WizardController(AbstractController):
         """
         try:
             self.nottreal.config.update(directory)
-            self.data = TSVModel(directory)
+            with StartupProfiler.phase('Loading the TSV data'):
+                self.data = TSVModel(directory)
         except FileNotFoundError:
             button_cancel = WizardAlert.Button(
                     key='cancel',
@@ -288,6 +293,8 @@ class WizardController(AbstractController):
         except AttributeError:
             pass
 
+        self.router('voice', 'messages_loaded', msgs=self.data.msgs)
+
         try:
             self.router(
                 'appstate',
@@ -299,7 +306,8 @@ class WizardController(AbstractController):
 
         Logger.info(
                 __name__,
-                'Configuration directory set to "%s"' % directory)
+                'Configuration directory set to "%s"',
+                directory)
 
         self._dir = directory
 
@@ -338,7 +346,7 @@ class WizardController(AbstractController):
             {WizardOption}
         """
         self.nottreal.view.wizard_window.menu.add_option(option)
-        Logger.debug(__name__, 'Option "%s" registered' % option.key)
+        Logger.debug(__name__, 'Option "%s" registered', option.key)
         return option
 
     def update_option(self, option):
@@ -351,11 +359,12 @@ class WizardController(AbstractController):
         """
         try:
             option.ui_update(option)
-            Logger.debug(__name__, 'Option "%s" updated' % option.key)
+            Logger.debug(__name__, 'Option "%s" updated', option.key)
         except TypeError:
             Logger.error(
                 __name__,
-                'Option not updatable in UI: "%s"' % option.key)
+                'Option not updatable in UI: "%s"',
+                option.key)
 
     def deregister_option(self, option):
         """
@@ -365,14 +374,16 @@ class WizardController(AbstractController):
             option {str}    -- Option to deregister
         """
         self.nottreal.view.wizard_window.menu.remove_option(option)
-        Logger.debug(__name__, 'Option "%s" deregistered' % option.key)
+        Logger.debug(__name__, 'Option "%s" deregistered', option.key)
 
     def speak_text(self,
                    text,
                    cat=None,
                    id=None,
                    slots={},
-                   loading=False):
+                   loading=False,
+                   trace=None,
+                   priority=None):
         """
         Pass the text onward to the voice controller. This should
         be called from the Wizard window via the router.
@@ -385,7 +396,14 @@ class WizardController(AbstractController):
             id {str} -- Prepared message ID if a prepared message
             slots {dict(str,str)} -- Slots changed by the user
             loading {bool} -- Is a loading message
+            trace {LatencyTrace} -- Timings of the message so far
+            priority {int} -- Priority class ({Message.PRIORITY_*},
+                              default: from {loading})
         """
+        if trace is None:
+            trace = LatencyTrace()
+        trace.mark(LatencyTrace.WIZARD)
+
         for name, value in slots.items():
             self.nottreal.view.wizard_window.slot_history.add(name, value)
 
@@ -396,7 +414,31 @@ class WizardController(AbstractController):
             cat=cat,
             id=id,
             slots=slots,
-            loading=loading)
+            loading=loading,
+            trace=trace,
+            priority=priority)
+
+    def prepared_messages(self):
+        """
+        The prepared messages of the loaded configuration
+
+        Returns:
+            {OrderedDict} -- Messages by their ID (empty if no
+                             configuration is loaded)
+        """
+        try:
+            return self.data.msgs
+        except AttributeError:
+            return OrderedDict()
+
+    def speculate(self, texts):
+        """
+        The Wizard has selected text that may be spoken soon
+
+        Arguments:
+            texts {[str]} -- Text, most likely to be spoken first
+        """
+        self.router('voice', 'speculate', texts=texts)
 
     def tab_changed(self, new_tab):
         """
@@ -456,9 +498,9 @@ class WizardController(AbstractController):
         try:
             self.router('data', 'custom_event', id=id, text=text)
         except Exception as e:
-            Logger.error(__name__, 'Error filing log message: %s' % str(e))
+            Logger.error(__name__, 'Error filing log message: %s', e)
 
-    def now_speaking(self, text):
+    def now_speaking(self, text, parts=None):
         """
         Mark some text as now being spoken (and so should be removed
         from the queue).
@@ -466,9 +508,14 @@ class WizardController(AbstractController):
         Arguments:
             text {str} -- Text that is queued to be spoken and is
                 no longer queued.
+
+        Keyword arguments:
+            parts {[str]} -- Text of each queued message, if several
+                             messages were combined into {text}
         """
-        self.nottreal.view.wizard_window.msg_queue.remove(text)
-        self.nottreal.view.wizard_window.msg_history.add(text)
+        for part in parts or [text]:
+            self.nottreal.view.wizard_window.msg_queue.remove(part)
+            self.nottreal.view.wizard_window.msg_history.add(part)
         self.change_state(VUIState.SPEAKING)
 
     def change_state(self, state):
@@ -478,7 +525,7 @@ class WizardController(AbstractController):
         Arguments:
             state {int} -- New {VUIState}
         """
-        Logger.debug(__name__, 'New VUI state: %s' % VUIState.str(state))
+        Logger.debug(__name__, 'New VUI state: %s', VUIState.str(state))
 
         self.state = state
 
@@ -499,14 +546,27 @@ class WizardController(AbstractController):
         """
         self.router('voice', 'stop_speaking')
 
-    def enqueue_text(self, text):
+    def enqueue_text(self, text, priority=Message.PRIORITY_NORMAL):
         """
         Mark some text as queued to be spoken.
 
         Arguments:
             text {str} -- Text that is queued to be spoken
+
+        Keyword arguments:
+            priority {int} -- Priority class ({Message.PRIORITY_*})
         """
-        self.nottreal.view.wizard_window.msg_queue.add(text)
+        self.nottreal.view.wizard_window.msg_queue.add(text, priority)
+
+    def dequeue_text(self, text):
+        """
+        Mark some text as no longer queued, without being spoken (e.g.
+        it expired)
+
+        Arguments:
+            text {str} -- Text that was queued to be spoken
+        """
+        self.nottreal.view.wizard_window.msg_queue.remove(text)
 
     def clear_queue(self):
         """
@@ -558,5 +618,6 @@ class WizardController(AbstractController):
         """
         Logger.info(
             __name__,
-            'Set resetting of slot tracking on tab change to %r' % value)
+            'Set resetting of slot tracking on tab change to %r',
+            value)
         return True
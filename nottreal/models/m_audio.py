@@ -0,0 +1,402 @@
+from ..utils.log import Logger
+
+from collections import OrderedDict
+
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+
+
+class AudioCache:
+    """
+    Audio that has already been synthesised, stored as WAV files in a
+    directory. Each file is keyed by the voice subsystem, its options,
+    and the text it was given. When the cache is larger than its
+    maximum size, the least recently used files are removed.
+
+    Variables:
+        FILE_EXT {str} -- Filename suffix
+        TMP_EXT {str} -- Filename suffix while a file is rendered
+    """
+    FILE_EXT = '.wav'
+    TMP_EXT = '.tmp.wav'
+
+    def __init__(self, directory, max_size):
+        """
+        Open (or create) a cache
+
+        Arguments:
+            directory {str} -- Directory to store the audio in
+            max_size {int} -- Maximum size of the cache in bytes
+
+        Raises:
+            OSError -- If the directory cannot be created
+        """
+        self.directory = directory
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._files = OrderedDict()
+        self._size = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    @staticmethod
+    def key(*parts):
+        """
+        Create the key for some audio
+
+        Arguments:
+            *parts {str} -- Voice subsystem, options and text
+
+        Returns:
+            {str}
+        """
+        digest = hashlib.sha1()
+        for part in parts:
+            digest.update(str(part).encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Retrieve the file for some audio, marking it as recently used
+
+        Arguments:
+            key {str} -- Key of the audio
+
+        Returns:
+            {str} -- Path to the file, or {None} if not cached
+        """
+        with self._lock:
+            if key not in self._files:
+                return None
+            self._files.move_to_end(key)
+
+        filepath = self._path(key)
+        try:
+            os.utime(filepath)
+        except OSError:
+            self._forget(key)
+            return None
+
+        return filepath
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._files
+
+    def put(self, key, render):
+        """
+        Add audio to the cache. The audio is rendered to a temporary
+        file with a unique name, so the same audio can be rendered by
+        several threads at once (the last to finish is kept).
+
+        Arguments:
+            key {str} -- Key of the audio
+            render {callable} -- Writes the audio to the path it is
+                                 given and returns {True} on success
+
+        Returns:
+            {str} -- Path to the file, or {None} if it wasn't rendered
+        """
+        filepath = self._path(key)
+
+        try:
+            fd, tmp_filepath = tempfile.mkstemp(
+                suffix=self.TMP_EXT,
+                prefix=key + '.',
+                dir=self.directory)
+            os.close(fd)
+        except OSError as e:
+            Logger.warning(__name__, 'Could not cache audio: %s', e)
+            return None
+
+        try:
+            rendered = render(tmp_filepath)
+            if not rendered or os.path.getsize(tmp_filepath) == 0:
+                raise OSError('No audio rendered')
+            os.replace(tmp_filepath, filepath)
+            size = os.path.getsize(filepath)
+        except OSError as e:
+            Logger.warning(__name__, 'Could not cache audio: %s', e)
+            try:
+                os.remove(tmp_filepath)
+            except OSError:
+                pass
+            return None
+
+        with self._lock:
+            self._size -= self._files.pop(key, 0)
+            self._files[key] = size
+            self._size += size
+
+        self._evict()
+        return filepath
+
+    def _path(self, key):
+        """
+        Path of the file for some audio
+
+        Arguments:
+            key {str} -- Key of the audio
+
+        Returns:
+            {str}
+        """
+        return os.path.join(self.directory, key + self.FILE_EXT)
+
+    def _load(self):
+        """
+        Index the files already in the directory, least recently used
+        first
+        """
+        entries = []
+        for filename in os.listdir(self.directory):
+            filepath = os.path.join(self.directory, filename)
+            if filename.endswith(self.TMP_EXT):
+                os.remove(filepath)
+            elif filename.endswith(self.FILE_EXT):
+                stat = os.stat(filepath)
+                entries.append((
+                    stat.st_mtime,
+                    filename[:-len(self.FILE_EXT)],
+                    stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._files[key] = size
+            self._size += size
+
+        Logger.debug(
+            __name__,
+            'Audio cache has %d files (%d bytes)',
+            len(self._files),
+            self._size)
+
+        self._evict()
+
+    def _forget(self, key):
+        """
+        Remove some audio from the index
+
+        Arguments:
+            key {str} -- Key of the audio
+        """
+        with self._lock:
+            self._size -= self._files.pop(key, 0)
+
+    def _evict(self):
+        """
+        Remove the least recently used files until the cache is within
+        its maximum size
+        """
+        while True:
+            with self._lock:
+                if self._size <= self.max_size or not self._files:
+                    return
+                key, size = self._files.popitem(last=False)
+                self._size -= size
+
+            try:
+                os.remove(self._path(key))
+                Logger.debug(__name__, 'Evicted "%s" from the cache', key)
+            except OSError:
+                pass
+
+
+class WavFile:
+    """
+    Uncompressed (PCM) audio in a WAV file. The file is memory-mapped,
+    so its audio can be played without reading it into memory first:
+    {frames} is a view of the audio in the mapped file.
+
+    Variables:
+        FORMAT_PCM {int} -- Format code of uncompressed audio
+    """
+    FORMAT_PCM = 1
+
+    def __init__(self, filepath):
+        """
+        Map a WAV file and read its format
+
+        Arguments:
+            filepath {str} -- Path to the file
+
+        Raises:
+            OSError -- If the file cannot be mapped
+            ValueError -- If the file isn't uncompressed audio
+        """
+        self.filepath = filepath
+
+        with open(filepath, 'rb') as wav_file:
+            self._mmap = mmap.mmap(
+                wav_file.fileno(),
+                0,
+                access=mmap.ACCESS_READ)
+
+        try:
+            self._parse()
+        except (ValueError, struct.error) as e:
+            self._mmap.close()
+            raise ValueError('"%s" is not a PCM WAV file (%s)' % (
+                filepath,
+                e))
+
+    def duration(self):
+        """
+        Length of the audio
+
+        Returns:
+            {float} -- Seconds
+        """
+        return len(self.frames) / (self.rate * self.channels * self.width)
+
+    def close(self):
+        """
+        Unmap the file (if it's not still being played, otherwise it's
+        unmapped once it has been)
+        """
+        self.frames.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    def _parse(self):
+        """
+        Find the format and the audio in the RIFF chunks of the file
+
+        Raises:
+            ValueError -- If the file isn't uncompressed audio
+            struct.error -- If a chunk is truncated
+        """
+        riff, _, wave = struct.unpack_from('<4sI4s', self._mmap, 0)
+        if riff != b'RIFF' or wave != b'WAVE':
+            raise ValueError('no RIFF header')
+
+        fmt = None
+        offset = 12
+        while offset + 8 <= len(self._mmap):
+            chunk, size = struct.unpack_from('<4sI', self._mmap, offset)
+            offset += 8
+
+            if chunk == b'fmt ':
+                fmt = struct.unpack_from('<HHIIHH', self._mmap, offset)
+            elif chunk == b'data':
+                if fmt is None:
+                    raise ValueError('audio before its format')
+                break
+
+            offset += size + (size & 1)
+        else:
+            raise ValueError('no audio')
+
+        audio_format, channels, rate, _, block_align, bits = fmt
+        if audio_format != self.FORMAT_PCM or block_align == 0:
+            raise ValueError('format %d' % audio_format)
+
+        self.channels = channels
+        self.rate = rate
+        self.width = bits // 8
+
+        # a file still being written may claim more audio than it has
+        end = min(offset + size, len(self._mmap))
+        end -= (end - offset) % block_align
+        self.frames = memoryview(self._mmap)[offset:end]
+
+
+class Playback:
+    """
+    Audio queued to be played by the audio output, and when it started
+    and finished playing (as {time.perf_counter()} timestamps, of when
+    the audio was heard rather than written to the device).
+    """
+    def __init__(self,
+                 frames,
+                 width,
+                 channels,
+                 rate,
+                 on_start=None,
+                 on_end=None):
+        """
+        Audio to play
+
+        Arguments:
+            frames {bytes-like} -- Interleaved PCM samples (not copied)
+            width {int} -- Bytes per sample
+            channels {int} -- Number of channels
+            rate {int} -- Samples per second
+
+        Keyword arguments:
+            on_start {callable} -- Called with the timestamp of when
+                                   the audio starts playing
+            on_end {callable} -- Called with the timestamp of when the
+                                 audio finished playing ({None} if it
+                                 never started) and whether it was
+                                 interrupted
+        """
+        self.frames = memoryview(frames).cast('B')
+        self.width = width
+        self.channels = channels
+        self.rate = rate
+        self.on_start = on_start
+        self.on_end = on_end
+
+        self.started_at = None
+        self.ended_at = None
+        self.interrupted = False
+        self._done = threading.Event()
+
+    def audio_format(self):
+        """
+        Format of the audio
+
+        Returns:
+            {(int, int, int)} -- Bytes per sample, channels and rate
+        """
+        return (self.width, self.channels, self.rate)
+
+    def start(self, timestamp):
+        """
+        Record that the audio has started playing
+
+        Arguments:
+            timestamp {float} -- When it started
+        """
+        self.started_at = timestamp
+        if self.on_start is not None:
+            self.on_start(timestamp)
+
+    def finish(self, timestamp, interrupted=False):
+        """
+        Record that the audio has finished playing (or won't be)
+
+        Arguments:
+            timestamp {float} -- When it finished ({None} if it never
+                                 started)
+
+        Keyword arguments:
+            interrupted {bool} -- Was it stopped before the end?
+        """
+        self.ended_at = timestamp
+        self.interrupted = interrupted
+        if self.on_end is not None:
+            self.on_end(timestamp, interrupted)
+        self._done.set()
+
+    def wait(self, timeout=None):
+        """
+        Wait until the audio has finished playing
+
+        Keyword arguments:
+            timeout {float} -- Seconds to wait (default: {None}, until
+                               it has finished)
+
+        Returns:
+            {bool} -- {True} if it has finished
+        """
+        return self._done.wait(timeout)
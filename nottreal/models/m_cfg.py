@@ -25,9 +25,11 @@ class ConfigModel:
         filepath = directory + os.path.sep + 'settings.cfg'
         if os.path.isfile(filepath):
             self.config.read(filepath)
+            self.config_dir = directory
             Logger.info(
                 __name__,
-                'Loaded configuration file from "%s"' % filepath)
+                'Loaded configuration file from "%s"',
+                filepath)
 
             for listener in iter(self._listeners):
                 listener(self)
@@ -0,0 +1,148 @@
+from ..utils.log import Logger
+
+from collections import OrderedDict
+
+import csv
+import os
+import re
+
+
+class MarkupRules:
+    """
+    Phrases to replace with markup for a voice subsystem (e.g.
+    Cerevoice's spurts), loaded from a tab-separated values file in the
+    configuration directory. The first column is the phrase and the
+    second is its markup.
+
+    The phrases are compiled into a single regular expression, so they
+    are replaced wherever they appear as whole words in a single pass
+    over the text. Longer phrases are preferred (e.g. "oh!" over "oh"),
+    and phrases are matched regardless of case.
+    """
+    def __init__(self, filepath, default=None):
+        """
+        Prepare to load the rules from a file (call {load} to load
+        them)
+
+        Arguments:
+            filepath {str} -- Path to the file ({None} to use the
+                              default rules until {load} is given one)
+
+        Keyword arguments:
+            default {OrderedDict} -- Markup by phrase if there is no
+                                     file (default: {None}, no rules)
+        """
+        self.filepath = filepath
+        self.default = default or OrderedDict()
+
+        self._mtime = None
+        self._markup = {}
+        self._regex = None
+
+    def load(self, filepath=None):
+        """
+        Load (and compile) the rules, if the file has changed since
+        they were last loaded
+
+        Keyword arguments:
+            filepath {str} -- New path to the file (default: {None},
+                              the same file)
+
+        Returns:
+            {bool} -- {True} if the rules were (re)loaded
+        """
+        if filepath is not None and filepath != self.filepath:
+            self.filepath = filepath
+            self._mtime = None
+
+        mtime = False
+        if self.filepath is not None:
+            try:
+                mtime = os.stat(self.filepath).st_mtime
+            except OSError:
+                pass
+
+        if self._regex is not None and mtime == self._mtime:
+            return False
+
+        rules = self.default
+        if mtime is not False:
+            try:
+                rules = self._parse()
+            except (OSError, csv.Error) as e:
+                Logger.error(
+                    __name__,
+                    'Could not load markup rules from "%s": %s',
+                    self.filepath,
+                    e)
+
+        self._compile(rules)
+        self._mtime = mtime
+
+        Logger.debug(
+            __name__,
+            'Loaded %d markup rules from "%s"',
+            len(self._markup),
+            self.filepath if mtime is not False else 'defaults')
+        return True
+
+    def rewrite(self, text):
+        """
+        Replace the phrases in some text with their markup
+
+        Arguments:
+            text {str} -- Text to rewrite
+
+        Returns:
+            {(str, bool)} -- Rewritten text, and whether the whole text
+                             was a single phrase
+        """
+        if self._regex is None:
+            self.load()
+
+        if not self._markup:
+            return (text, False)
+
+        whole = self._regex.fullmatch(text.strip()) is not None
+        markup = self._regex.sub(
+            lambda match: self._markup[match.group(0).lower()],
+            text)
+        return (markup, whole)
+
+    def _parse(self):
+        """
+        Parse the file
+
+        Returns:
+            {OrderedDict} -- Markup by phrase
+
+        Raises:
+            OSError -- If the file cannot be read
+            csv.Error -- If the file is not valid
+        """
+        rules = OrderedDict()
+        with open(self.filepath, newline='') as tsv_file:
+            for row in csv.reader(tsv_file, delimiter='\t'):
+                if len(row) < 2 or not row[0].strip() \
+                        or row[0].startswith('#'):
+                    continue
+                rules[row[0].strip()] = row[1].strip()
+        return rules
+
+    def _compile(self, rules):
+        """
+        Compile the rules into a single regular expression
+
+        Arguments:
+            rules {OrderedDict} -- Markup by phrase
+        """
+        self._markup = {phrase.lower(): markup
+                        for phrase, markup in rules.items()}
+        if not self._markup:
+            self._regex = re.compile(r'(?!)')
+            return
+
+        phrases = sorted(self._markup, key=len, reverse=True)
+        self._regex = re.compile(
+            r"(?<![\w'])(?:%s)(?![\w'])" % '|'.join(map(re.escape, phrases)),
+            re.IGNORECASE)
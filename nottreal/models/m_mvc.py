@@ -1,3 +1,10 @@
+from ..utils.clock import Clock
+
+from collections import OrderedDict
+
+import heapq
+import itertools
+import time
 
 
 class Message:
@@ -10,8 +17,14 @@ class Message:
         FORCE_APPEND {int} -- Type to force append a message
         FORCE_DONT_APPEND {int} -- Type to force no appending of
                                    messages
+        PRIORITY_LOADING {int} -- Priority of loading messages, which
+                                  are spoken before anything else
+        PRIORITY_NORMAL {int} -- Priority of other messages
+        PRIORITY_DEFERRED {int} -- Priority of messages that are
+                                   spoken after everything else
     """
     NO_OVERRIDE, FORCE_APPEND, FORCE_DONT_APPEND = range(0, 3)
+    PRIORITY_LOADING, PRIORITY_NORMAL, PRIORITY_DEFERRED = range(0, 3)
 
     def __init__(self,
                  text,
@@ -19,7 +32,10 @@ class Message:
                  cat=None,
                  id=None,
                  slots=None,
-                 loading=False):
+                 loading=False,
+                 trace=None,
+                 priority=None,
+                 expires=None):
         """
         Create a message queue item.
 
@@ -35,6 +51,13 @@ class Message:
                             message (default: {None})
             slots {dict(str,str)} -- Slots changed by the user
             loading {bool} -- Is a Loading message (default: {False})
+            trace {LatencyTrace} -- Timings of the message so far
+                                    (default: new trace)
+            priority {int} -- Priority class (see PRIORITY_*)
+                              (default: from {loading})
+            expires {float} -- {Clock.monotonic()} after which the
+                               message should not be spoken
+                               (default: {None}, never)
         """
         self.text = text
         self.override = override
@@ -42,6 +65,73 @@ class Message:
         self.id = id
         self.slots = slots
         self.loading = loading
+        self.trace = trace if trace is not None else LatencyTrace()
+        self.expires = expires
+        self.parts = [self]
+
+        if priority is None:
+            priority = self.PRIORITY_LOADING if loading \
+                else self.PRIORITY_NORMAL
+        self.priority = priority
+
+    @staticmethod
+    def combine(messages):
+        """
+        Combine messages into one message to speak. Each message is
+        kept in {parts}, but empty messages aren't spoken.
+
+        Arguments:
+            messages {[Message]} -- Messages to combine, in order
+
+        Returns:
+            {Message}
+        """
+        texts = []
+        for message in messages:
+            text = message.text.strip()
+            if not text:
+                continue
+            if texts and not texts[-1].endswith(tuple('.!?,;:')):
+                texts[-1] += '.'
+            texts.append(text)
+
+        first = messages[0]
+        combined = Message(
+            ' '.join(texts),
+            override=first.override,
+            loading=first.loading,
+            trace=first.trace,
+            priority=first.priority,
+            expires=first.expires)
+        combined.parts = list(messages)
+        return combined
+
+    def mark(self, stage, timestamp=None):
+        """
+        Mark a stage in the trace of the message (or the traces of
+        each message it combines)
+
+        Arguments:
+            stage {str} -- Stage that has been reached
+
+        Keyword arguments:
+            timestamp {float} -- When it was reached (default: {None},
+                                 now)
+        """
+        for part in self.parts:
+            part.trace.mark(stage, timestamp)
+
+    def is_expired(self, now):
+        """
+        Has the message passed its expiry deadline?
+
+        Arguments:
+            now {float} -- Current {Clock.monotonic()}
+
+        Returns:
+            {bool}
+        """
+        return self.expires is not None and now >= self.expires
 
     def __str__(self):
         return '<[Message] %s.%s: %s>' % (self.cat, self.id, self.text)
@@ -50,6 +140,185 @@ class Message:
         return '<[Message] %s.%s: %s>' % (self.cat, self.id, self.text)
 
 
+class MessageQueue:
+    """
+    Queue of messages to speak, ordered by their priority class and
+    then the order they were queued in. Expired messages are dropped
+    when they reach the front of the queue.
+
+    Variables:
+        COMBINE_LIMIT {int} -- Maximum number of messages to combine
+    """
+    COMBINE_LIMIT = 8
+
+    def __init__(self):
+        """
+        Create an empty queue
+        """
+        self._heap = []
+        self._order = itertools.count()
+
+    def push(self, message):
+        """
+        Add a message to the queue
+
+        Arguments:
+            message {Message} -- Message to add
+        """
+        heapq.heappush(
+            self._heap,
+            (message.priority, next(self._order), message))
+
+    def pop(self, now=None, can_append=None):
+        """
+        Remove the next message to speak, and any expired messages
+        before it. Following messages that can be appended to it are
+        combined with it.
+
+        Keyword arguments:
+            now {float} -- Current {Clock.monotonic()} (default: now)
+            can_append {callable} -- Called with the previous and next
+                                     message, returns {True} if the
+                                     next message can be appended
+                                     (default: {None}, never append)
+
+        Returns:
+            {(Message, [Message])} -- Next message ({None} if there
+                                      isn't one) and the expired
+                                      messages
+        """
+        if now is None:
+            now = Clock.monotonic()
+
+        expired = []
+        parts = []
+        while self._heap and len(parts) < self.COMBINE_LIMIT:
+            message = self._heap[0][2]
+            if message.is_expired(now):
+                heapq.heappop(self._heap)
+                expired.append(message)
+            elif not parts \
+                    or (can_append is not None
+                        and can_append(parts[-1], message)):
+                heapq.heappop(self._heap)
+                parts.append(message)
+            else:
+                break
+
+        if not parts:
+            return (None, expired)
+        elif len(parts) == 1:
+            return (parts[0], expired)
+        return (Message.combine(parts), expired)
+
+    def messages(self):
+        """
+        The queued messages in the order they will be spoken
+
+        Returns:
+            {[Message]}
+        """
+        return [entry[2] for entry in sorted(self._heap)]
+
+    def clear(self):
+        """
+        Remove all the messages
+        """
+        self._heap = []
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class LatencyTrace:
+    """
+    Monotonic timestamps of each stage of an utterance, from the
+    Wizard clicking speak to the voice subsystem finishing.
+
+    Variables:
+        CLICKED {str} -- Wizard clicked speak
+        WIZARD {str} -- Wizard controller received the text
+        QUEUED {str} -- Voice subsystem queued the message
+        DEQUEUED {str} -- Voice thread took the message from the queue
+        PREPARED {str} -- Text prepared for the voice subsystem
+        PRODUCING {str} -- Voice subsystem called
+        PLAYING {str} -- Audio output started playing the voice (if
+                         the voice subsystem plays its audio through
+                         the {AudioOutputController})
+        PRODUCED {str} -- Voice subsystem returned
+        STOPPED {str} -- Voice subsystem finished speaking
+    """
+    CLICKED = 'clicked'
+    WIZARD = 'wizard'
+    QUEUED = 'queued'
+    DEQUEUED = 'dequeued'
+    PREPARED = 'prepared'
+    PRODUCING = 'producing'
+    PLAYING = 'playing'
+    PRODUCED = 'produced'
+    STOPPED = 'stopped'
+
+    def __init__(self, stage=None):
+        """
+        Start a trace
+
+        Keyword arguments:
+            stage {str} -- Stage to mark now (default: {None})
+        """
+        self.stages = []
+
+        if stage is not None:
+            self.mark(stage)
+
+    def mark(self, stage, timestamp=None):
+        """
+        Record that a stage has been reached
+
+        Arguments:
+            stage {str} -- Stage reached
+
+        Keyword arguments:
+            timestamp {float} -- When it was reached, from
+                                 {time.perf_counter()} (default:
+                                 {None}, now)
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        self.stages.append((stage, timestamp))
+
+    def durations(self):
+        """
+        Time taken to reach each stage from the previous stage
+
+        Returns:
+            {OrderedDict(str,float)} -- Seconds by stage
+        """
+        durations = OrderedDict()
+        for (_, previous), (stage, timestamp) in zip(self.stages,
+                                                     self.stages[1:]):
+            durations[stage] = timestamp - previous
+        return durations
+
+    def total(self):
+        """
+        Time from the first stage to the last
+
+        Returns:
+            {float} -- Seconds
+        """
+        if not self.stages:
+            return 0.
+        return self.stages[-1][1] - self.stages[0][1]
+
+    def __str__(self):
+        return '<[LatencyTrace] %s>' % ', '.join(
+            '%s: %.1f ms' % (stage, duration * 1e3)
+            for stage, duration in self.durations().items())
+
+    def __repr__(self):
+        return self.__str__()
+
+
 class VUIState:
     """
     State of the Wizarded VUI.
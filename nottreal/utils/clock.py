@@ -0,0 +1,164 @@
+from datetime import datetime, timedelta
+
+import threading
+import time
+
+
+class Clock:
+    """
+    The time in NottReal, which can run faster than real time. When
+    time is warped, the clock runs the warp factor times faster than
+    real time (from when the warp factor was set), so waiting for a
+    duration only waits for the duration divided by the warp factor,
+    however many threads are waiting. A warp factor of 0 doesn't wait
+    at all: the clock runs at real time, and jumps forward to the end
+    of each wait instead.
+
+    The voice subsystems wait using this clock, and the data recorder
+    uses it for timestamps, so a scripted session can run in a fraction
+    of the time and still have realistic timestamps.
+
+    Variables:
+        REAL_TIME {float} -- Warp factor of real time
+        INSTANT {float} -- Warp factor that doesn't wait at all
+    """
+    REAL_TIME = 1.
+    INSTANT = 0.
+
+    _warp = REAL_TIME
+    _anchor = time.monotonic()
+    _offset = 0.
+    _lock = threading.Lock()
+
+    @staticmethod
+    def init(warp=REAL_TIME):
+        """
+        Set how fast time passes
+
+        Keyword arguments:
+            warp {float} -- Warp factor (default: {REAL_TIME})
+
+        Raises:
+            ValueError -- If the warp factor is negative
+        """
+        if warp < 0:
+            raise ValueError('Time cannot be warped backwards')
+
+        with Clock._lock:
+            Clock._warp = warp
+            Clock._anchor = time.monotonic()
+            Clock._offset = 0.
+
+    @staticmethod
+    def warped():
+        """
+        Does time pass faster than real time?
+
+        Returns:
+            {bool}
+        """
+        return Clock._warp != Clock.REAL_TIME
+
+    @staticmethod
+    def monotonic():
+        """
+        A clock that never goes backwards, in seconds (the equivalent
+        of {time.monotonic()})
+
+        Returns:
+            {float}
+        """
+        return time.monotonic() + Clock._ahead()
+
+    @staticmethod
+    def time():
+        """
+        Seconds since the epoch (the equivalent of {time.time()})
+
+        Returns:
+            {float}
+        """
+        return time.time() + Clock._ahead()
+
+    @staticmethod
+    def now():
+        """
+        The current local date and time (the equivalent of
+        {datetime.now()})
+
+        Returns:
+            {datetime}
+        """
+        return datetime.now() + timedelta(seconds=Clock._ahead())
+
+    @staticmethod
+    def sleep(duration):
+        """
+        Wait for a duration
+
+        Arguments:
+            duration {float} -- Seconds to wait
+        """
+        Clock.wait(None, duration)
+
+    @staticmethod
+    def wait(event, timeout):
+        """
+        Wait until an event is set or a timeout passes (the equivalent
+        of {threading.Event.wait()}). If time doesn't wait at all, the
+        clock jumps forward to the end of the timeout (unless the event
+        is already set, or another wait has moved it further).
+
+        Arguments:
+            event {threading.Event} -- Event to wait for (or {None})
+            timeout {float} -- Seconds to wait
+
+        Returns:
+            {bool} -- {True} if the event was set
+        """
+        warp = Clock._warp
+        if warp == Clock.REAL_TIME:
+            if event is None:
+                time.sleep(timeout)
+                return False
+            return event.wait(timeout)
+
+        if warp == Clock.INSTANT:
+            is_set = event is not None and event.is_set()
+            if not is_set:
+                Clock._advance_to(Clock.monotonic() + timeout)
+            return is_set
+
+        if event is None:
+            time.sleep(timeout / warp)
+            return False
+        return event.wait(timeout / warp)
+
+    @staticmethod
+    def _ahead():
+        """
+        How far the clock is ahead of real time: the time since the
+        warp factor was set, sped up by the warp factor, or the time
+        skipped by waits that didn't wait
+
+        Returns:
+            {float} -- Seconds
+        """
+        warp = Clock._warp
+        if warp == Clock.REAL_TIME or warp == Clock.INSTANT:
+            return Clock._offset
+
+        return (time.monotonic() - Clock._anchor) * (warp - 1)
+
+    @staticmethod
+    def _advance_to(monotonic):
+        """
+        Move the clock forward to a time (if it's not already past it)
+
+        Arguments:
+            monotonic {float} -- {monotonic()} to move forward to
+        """
+        with Clock._lock:
+            Clock._offset = max(
+                Clock._offset,
+                monotonic - time.monotonic())
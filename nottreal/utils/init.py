@@ -1,12 +1,20 @@
 
 from .log import Logger
 from .dir import DirUtils
+from .profiler import StartupProfiler
 
 from argparse import ArgumentTypeError
+from collections import OrderedDict
 
+import ast
 import importlib
+import importlib.util
+import inspect
+import json
 import os
 import pkgutil
+import platform
+import sys
 
 
 class ArgparseUtils:
@@ -103,8 +111,191 @@ class ArgparseUtils:
 
         return pwd + dir
 
+    @staticmethod
+    def time_warp(factor):
+        """
+        Is a factor a valid speed for the clock to run at?
+
+        Arguments:
+            factor {str} -- Number of times faster than real time, or
+                            0 to not wait at all
+
+        Raises:
+            ArgumentTypeError -- if the factor is not a number or is
+                negative
+
+        Returns:
+            {float}
+        """
+        try:
+            factor = float(factor)
+        except ValueError:
+            raise ArgumentTypeError('%s is not a number' % factor)
+
+        if factor < 0:
+            raise ArgumentTypeError('Time cannot be warped backwards')
+
+        return factor
+
+
+class ClassRegistry:
+    """
+    The inheritance of discovered classes, by class name. The
+    ancestors and descendants of each class are kept up to date as
+    classes are registered (in any order), so queries don't need to
+    walk the class hierarchy.
+    """
+    def __init__(self):
+        """
+        Create an empty registry
+        """
+        self._bases = {}
+        self._children = {}
+        self._ancestors = {}
+        self._descendants = {}
+
+    def register(self, name, bases):
+        """
+        Register a class
+
+        Arguments:
+            name {str} -- Name of the class
+            bases {[str]} -- Names of its base classes
+        """
+        bases = tuple(base for base in bases if base != name)
+        if self._bases.get(name) == bases:
+            return
+
+        self._bases[name] = bases
+        self._ancestors.setdefault(name, set())
+
+        ancestors = set()
+        for base in bases:
+            self._children.setdefault(base, set()).add(name)
+            ancestors.add(base)
+            ancestors |= self._ancestors.get(base, set())
+
+        self._propagate(name, ancestors)
+
+    def register_all(self, classes):
+        """
+        Register the classes in a manifest
+
+        Arguments:
+            classes {dict(str,dict)} -- Manifest entries by class name
+        """
+        for name, entry in classes.items():
+            self.register(name, entry['bases'])
+
+    def register_class(self, cls):
+        """
+        Register a class (and its ancestors) that has been imported
+
+        Arguments:
+            cls {class} -- Class to register
+        """
+        for klass in cls.__mro__:
+            if klass.__name__ not in self._bases:
+                self.register(
+                    klass.__name__,
+                    [base.__name__ for base in klass.__bases__])
+
+    def __contains__(self, name):
+        return name in self._bases
+
+    def is_subclass(self, name, rootclass):
+        """
+        Does a class inherit (at any depth) from a class?
+
+        Arguments:
+            name {str} -- Name of the class
+            rootclass {str/class/tuple} -- Name of the possible
+                ancestor, or a tuple of names (any one matches)
+
+        Returns:
+            {bool}
+        """
+        ancestors = self._ancestors.get(name)
+        if not ancestors:
+            return False
+
+        if isinstance(rootclass, tuple):
+            return any(self._name(root) in ancestors for root in rootclass)
+
+        return self._name(rootclass) in ancestors
+
+    def subclasses_of(self, rootclass):
+        """
+        All classes that inherit (at any depth) from a class
+
+        Arguments:
+            rootclass {str/class/tuple} -- Name of the ancestor, or a
+                tuple of names (classes that inherit from any)
+
+        Returns:
+            {frozenset(str)}
+        """
+        if isinstance(rootclass, tuple):
+            subclasses = set()
+            for root in rootclass:
+                subclasses |= self._descendants.get(self._name(root), set())
+            return frozenset(subclasses)
+
+        return frozenset(self._descendants.get(self._name(rootclass), ()))
+
+    def _propagate(self, name, ancestors):
+        """
+        Add ancestors to a class and everything that inherits from it
+
+        Arguments:
+            name {str} -- Name of the class
+            ancestors {set(str)} -- Names of the new ancestors
+        """
+        new_ancestors = ancestors - self._ancestors[name] - {name}
+        if not new_ancestors:
+            return
+
+        self._ancestors[name] |= new_ancestors
+        for ancestor in new_ancestors:
+            self._descendants.setdefault(ancestor, set()).add(name)
+
+        for child in self._children.get(name, ()):
+            self._ancestors.setdefault(child, set())
+            self._propagate(child, new_ancestors)
+
+    @staticmethod
+    def _name(cls):
+        """
+        Name of a class
+
+        Arguments:
+            cls {str/class} -- Class or its name
+
+        Returns:
+            {str}
+        """
+        return cls.__name__ if isinstance(cls, type) else cls
+
 
 class ClassUtils:
+    """
+    Discover and load classes from packages
+
+    Variables:
+        registry {ClassRegistry} -- Inheritance of discovered classes
+        MANIFEST_FILENAME {str} -- Manifest generated at build time
+        MANIFEST_CACHE {str} -- Manifest cached next to the bytecode
+        MANIFEST_VERSION {int} -- Version of the manifest format
+    """
+    MANIFEST_FILENAME = 'manifest.json'
+    MANIFEST_CACHE = os.path.join('__pycache__', 'nottreal-manifest.json')
+    MANIFEST_VERSION = 1
+
+    registry = ClassRegistry()
+
+    _LITERALS = (bool, int, float, str)
+    _manifest = {}
+
     @staticmethod
     def list_all_modules(package):
         """
@@ -122,15 +313,442 @@ class ClassUtils:
     def load_all_subclasses(package, subclass):
         """
         Search a directory/package for files and import classes
-        that subclass (can be multi-layer) a class.
+        that subclass (can be multi-layer) a class. Only the modules
+        that contain such classes are imported.
 
         Arguments:
             package {str or module} -- Package to search
             subclass {class} -- Class everthing must inherit from
+
+        Returns:
+            {OrderedDict(str,class)}
+        """
+        classes = OrderedDict()
+        for name in ClassUtils.find_all_subclasses(package, subclass):
+            try:
+                classes[name] = ClassUtils.load_class(name)
+            except ImportError as e:
+                Logger.critical(
+                    __name__,
+                    'Could not import "%s": %s',
+                    name,
+                    e)
+
+        return classes
+
+    @staticmethod
+    def find_all_subclasses(package, subclass):
+        """
+        Search a directory/package for classes that subclass (can be
+        multi-layer) a class, using the package's manifest rather
+        than importing its modules.
+
+        Arguments:
+            package {str or module} -- Package to search
+            subclass {class/str} -- Class everthing must inherit from
+
+        Returns:
+            {OrderedDict(str,str)} -- Module names by class name
+        """
+        if type(package) == str:
+            package = importlib.import_module(package)
+
+        with StartupProfiler.phase('Discovering "%s"' % package.__name__):
+            classes = ClassUtils.manifest(package)
+
+        return OrderedDict(
+            (name, entry['module'])
+            for name, entry in classes.items()
+            if ClassUtils.registry.is_subclass(name, subclass))
+
+    @staticmethod
+    def load_class(name):
+        """
+        Import a class listed in a manifest
+
+        Arguments:
+            name {str} -- Name of the class
+
+        Raises:
+            KeyError -- If the class is not in a loaded manifest
+            ImportError -- If the class's module cannot be imported
+
+        Returns:
+            {class}
+        """
+        module_name = ClassUtils._manifest[name]['module']
+        module = importlib.import_module(module_name)
+        try:
+            return getattr(module, name)
+        except AttributeError:
+            raise ImportError(
+                'No class "%s" in "%s"' % (name, module_name))
+
+    @staticmethod
+    def class_attribute(name, attribute, default=None):
+        """
+        Retrieve the value of a (literal) class attribute from the
+        manifest, following inheritance, without importing the class
+
+        Arguments:
+            name {str} -- Name of the class
+            attribute {str} -- Name of the attribute
+
+        Keyword arguments:
+            default {mixed} -- Value if the attribute isn't set
+
+        Returns:
+            {mixed}
+        """
+        try:
+            entry = ClassUtils._manifest[name]
+        except KeyError:
+            return default
+
+        if attribute in entry['attrs']:
+            return entry['attrs'][attribute]
+
+        for base in entry['bases']:
+            if base == name:
+                continue
+            value = ClassUtils.class_attribute(base, attribute, ClassUtils)
+            if value is not ClassUtils:
+                return value
+
+        return default
+
+    @staticmethod
+    def requirements_met(modules='', platforms=''):
+        """
+        Are the modules a class needs installed (without importing
+        them), and is this one of the platforms it can run on?
+
+        Keyword arguments:
+            modules {str} -- Comma-separated names of the modules
+            platforms {str} -- Comma-separated platforms, matched to
+                               the name of the operating system (e.g.
+                               "Darwin") or within the description of
+                               the platform (e.g. "ubuntu"), or empty
+                               for any
+
+        Returns:
+            {bool}
+        """
+        for module in modules.split(','):
+            module = module.strip()
+            if module and importlib.util.find_spec(module) is None:
+                return False
+
+        platforms = [p.strip().lower() for p in platforms.split(',')
+                     if p.strip()]
+        if not platforms:
+            return True
+
+        system = platform.system().lower()
+        description = platform.platform().lower()
+        return any(p == system or p in description for p in platforms)
+
+    @staticmethod
+    def manifest(package):
+        """
+        Retrieve the manifest of the classes in a package: the module
+        each class is defined in, its base classes and its literal
+        class attributes.
+
+        Frozen apps use the manifest generated at build time. Otherwise
+        the manifest is cached next to the package's bytecode and
+        rebuilt (by parsing, not importing, the modules) when any
+        module changes. If neither is possible, every module is
+        imported and inspected.
+
+        Arguments:
+            package {module} -- Package to describe
+
+        Returns:
+            {OrderedDict(str,dict)} -- Manifest entries by class name
+        """
+        directory = package.__path__[0]
+        classes = None
+
+        if getattr(sys, 'frozen', False):
+            relative_dir = package.__name__.replace('.', os.path.sep)
+            for manifest_dir in (directory,
+                                 os.path.join(DirUtils.pwd(), relative_dir)):
+                classes = ClassUtils._read_manifest(
+                    os.path.join(manifest_dir, ClassUtils.MANIFEST_FILENAME))
+                if classes is not None:
+                    break
+        else:
+            modules = ClassUtils._module_files(package)
+            mtimes = {module: os.path.getmtime(filepath)
+                      for module, filepath in modules.items()}
+            cache_path = os.path.join(directory, ClassUtils.MANIFEST_CACHE)
+
+            classes = ClassUtils._read_manifest(cache_path, mtimes)
+            if classes is None:
+                Logger.debug(
+                    __name__,
+                    'Building the manifest for "%s"',
+                    package.__name__)
+                try:
+                    classes = ClassUtils._parse_modules(modules)
+                    ClassUtils._write_manifest(cache_path, mtimes, classes)
+                except ValueError as e:
+                    Logger.warning(__name__, '%s', e)
+
+        if classes is None:
+            Logger.warning(
+                __name__,
+                'No manifest for "%s", importing all modules',
+                package.__name__)
+            classes = ClassUtils._inspect_modules(package)
+
+        ClassUtils._manifest.update(classes)
+        ClassUtils.registry.register_all(classes)
+        return classes
+
+    @staticmethod
+    def write_manifest(package):
+        """
+        Write the manifest for a package into the package directory
+        (for bundling with frozen apps)
+
+        Arguments:
+            package {str or module} -- Package to describe
+
+        Returns:
+            {str} -- Path of the manifest
+
+        Raises:
+            ValueError -- If a module cannot be parsed
         """
         if type(package) == str:
             package = importlib.import_module(package)
 
+        modules = ClassUtils._module_files(package)
+        mtimes = {module: os.path.getmtime(filepath)
+                  for module, filepath in modules.items()}
+        path = os.path.join(
+            package.__path__[0],
+            ClassUtils.MANIFEST_FILENAME)
+
+        ClassUtils._write_manifest(
+            path,
+            mtimes,
+            ClassUtils._parse_modules(modules))
+        return path
+
+    @staticmethod
+    def _module_files(package):
+        """
+        Source files of the modules in a package
+
+        Arguments:
+            package {module} -- Package to search
+
+        Returns:
+            {OrderedDict(str,str)} -- File paths by module name
+        """
+        directory = package.__path__[0]
+        modules = OrderedDict()
+        for _, name, is_pkg in pkgutil.iter_modules([directory]):
+            filepath = os.path.join(directory, name + '.py')
+            if not is_pkg and os.path.isfile(filepath):
+                modules[package.__name__ + '.' + name] = filepath
+        return modules
+
+    @staticmethod
+    def _parse_modules(modules):
+        """
+        Describe the top-level classes in some modules by parsing
+        their source
+
+        Arguments:
+            modules {dict(str,str)} -- File paths by module name
+
+        Returns:
+            {OrderedDict(str,dict)} -- Manifest entries by class name
+
+        Raises:
+            ValueError -- If a module cannot be parsed
+        """
+        classes = OrderedDict()
+        for module, filepath in modules.items():
+            try:
+                with open(filepath, encoding='utf-8') as source_file:
+                    tree = ast.parse(source_file.read(), filepath)
+            except (IOError,
+                    SyntaxError,
+                    ValueError,
+                    MemoryError,
+                    RecursionError) as e:
+                raise ValueError('Could not parse "%s": %s' % (module, e))
+
+            for node in tree.body:
+                if not isinstance(node, ast.ClassDef):
+                    continue
+
+                bases = []
+                for base in node.bases:
+                    if isinstance(base, ast.Name):
+                        bases.append(base.id)
+                    elif isinstance(base, ast.Attribute):
+                        bases.append(base.attr)
+
+                attrs = {}
+                for statement in node.body:
+                    if isinstance(statement, ast.Assign) \
+                            and len(statement.targets) == 1 \
+                            and isinstance(statement.targets[0], ast.Name):
+                        try:
+                            value = ast.literal_eval(statement.value)
+                        except (ValueError,
+                                TypeError,
+                                SyntaxError,
+                                MemoryError,
+                                RecursionError):
+                            continue
+                        if isinstance(value, ClassUtils._LITERALS):
+                            attrs[statement.targets[0].id] = value
+
+                classes[node.name] = {
+                    'module': module,
+                    'bases': bases,
+                    'attrs': attrs}
+
+        return classes
+
+    @staticmethod
+    def _inspect_modules(package):
+        """
+        Describe the classes in a package by importing all of its
+        modules
+
+        Arguments:
+            package {module} -- Package to describe
+
+        Returns:
+            {OrderedDict(str,dict)} -- Manifest entries by class name
+        """
+        ClassUtils._import_all_modules(package)
+
+        prefix = package.__name__ + '.'
+        classes = OrderedDict()
+        for module_name, module in list(sys.modules.items()):
+            if not module_name.startswith(prefix):
+                continue
+
+            for name, cls in inspect.getmembers(module, inspect.isclass):
+                if cls.__module__ != module_name:
+                    continue
+
+                classes[name] = {
+                    'module': module_name,
+                    'bases': [base.__name__ for base in cls.__bases__],
+                    'attrs': {
+                        key: value
+                        for key, value in vars(cls).items()
+                        if not key.startswith('_')
+                        and isinstance(value, ClassUtils._LITERALS)}}
+
+        return classes
+
+    @staticmethod
+    def _read_manifest(path, mtimes=None):
+        """
+        Read a manifest file
+
+        Arguments:
+            path {str} -- Path of the manifest
+
+        Keyword arguments:
+            mtimes {dict(str,float)} -- Modification times of the
+                modules, if the manifest must match them
+
+        Returns:
+            {OrderedDict(str,dict)} -- {None} if the manifest doesn't
+                                       exist or is out of date
+        """
+        try:
+            with open(path, encoding='utf-8') as manifest_file:
+                manifest = json.load(
+                    manifest_file,
+                    object_pairs_hook=OrderedDict)
+        except (IOError, ValueError, MemoryError, RecursionError):
+            return None
+
+        if not isinstance(manifest, dict) \
+                or manifest.get('version') != ClassUtils.MANIFEST_VERSION:
+            return None
+        if mtimes is not None and manifest.get('mtimes') != mtimes:
+            return None
+
+        classes = manifest.get('classes')
+        if not ClassUtils._valid_manifest(classes):
+            Logger.warning(__name__, 'Ignoring corrupt manifest "%s"', path)
+            return None
+
+        return classes
+
+    @staticmethod
+    def _valid_manifest(classes):
+        """
+        Are the entries of a manifest well-formed?
+
+        Arguments:
+            classes {mixed} -- Manifest entries by class name
+
+        Returns:
+            {bool}
+        """
+        if not isinstance(classes, dict):
+            return False
+
+        for entry in classes.values():
+            if not isinstance(entry, dict) \
+                    or not isinstance(entry.get('module'), str) \
+                    or not isinstance(entry.get('bases'), list) \
+                    or not isinstance(entry.get('attrs'), dict) \
+                    or not all(isinstance(base, str)
+                               for base in entry['bases']):
+                return False
+
+        return True
+
+    @staticmethod
+    def _write_manifest(path, mtimes, classes):
+        """
+        Write a manifest file (failure is not fatal)
+
+        Arguments:
+            path {str} -- Path of the manifest
+            mtimes {dict(str,float)} -- Modification times of the
+                modules described by the manifest
+            classes {dict(str,dict)} -- Manifest entries by class name
+        """
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, mode='w', encoding='utf-8') as manifest_file:
+                json.dump({
+                    'version': ClassUtils.MANIFEST_VERSION,
+                    'mtimes': mtimes,
+                    'classes': classes}, manifest_file, indent=1)
+        except (IOError, OSError) as e:
+            Logger.debug(
+                __name__,
+                'Could not save the manifest "%s": %s',
+                path,
+                e)
+
+    @staticmethod
+    def _import_all_modules(package):
+        """
+        Import every module in a package (including those frozen
+        by PyInstaller)
+
+        Arguments:
+            package {module} -- Package to search
+        """
         path = package.__path__
         prefix = package.__name__ + '.'
         modules = [m[1] for m in pkgutil.iter_modules(path, prefix)]
@@ -148,15 +766,15 @@ class ClassUtils:
                 modules.append(name)
 
         for name in modules:
-            Logger.debug(__name__, 'Loading "%s.py"' % name)
+            Logger.debug(__name__, 'Loading "%s.py"', name)
             try:
                 importlib.import_module(name)
             except ImportError as e:
                 Logger.critical(
                     __name__,
-                    'Could not import "%s": %s' % (name, e))
-
-        return ClassUtils.get_all_subclasses(subclass)
+                    'Could not import "%s": %s',
+                    name,
+                    e)
 
     @staticmethod
     def _load_all_subclasses_pyinstaller():
@@ -189,7 +807,7 @@ class ClassUtils:
     @staticmethod
     def is_subclass(test, rootclass):
         """
-        Recursively get all subclasses
+        Is a class a subclass (at any depth) of another class?
 
         Arguments:
             test {class/str}  -- Class to test
@@ -199,20 +817,13 @@ class ClassUtils:
         Returns:
             {bool}
         """
-        try:
-            ClassUtils._cached_subclasses[rootclass.__name__]
-        except Exception:
-            ClassUtils._cached_subclasses = {}
-            ClassUtils._cached_subclasses[rootclass.__name__] = \
-                ClassUtils.get_all_subclasses(rootclass)
-        finally:
-            subclasses = ClassUtils._cached_subclasses[rootclass.__name__]
+        registry = ClassUtils.registry
 
         if isinstance(test, type):
+            registry.register_class(test)
             test = test.__name__
+        elif test not in registry:
+            for subclass in ClassUtils.get_all_subclasses(rootclass).values():
+                registry.register_class(subclass)
 
-        for subclass in iter(subclasses):
-            if subclass == test:
-                return True
-
-        return False
+        return registry.is_subclass(test, rootclass)
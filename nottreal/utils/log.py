@@ -1,20 +1,68 @@
 
 from pathlib import Path
 
+import atexit
 import logging
 import logging.handlers
 import platform
+import queue
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that never blocks the thread that is logging: if
+    the queue is full, the record is dropped (and counted)
+
+    Extends:
+        logging.handlers.QueueHandler
+    """
+    def __init__(self, log_queue):
+        """
+        Create the handler
+
+        Arguments:
+            log_queue {queue.Queue} -- Bounded queue to add records to
+        """
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        """
+        Add a record to the queue, or drop it if the queue is full
+
+        Arguments:
+            record {logging.LogRecord} -- Record to add
+        """
+        try:
+            if self.dropped:
+                self.queue.put_nowait(logging.makeLogRecord({
+                    'name': record.name,
+                    'levelno': logging.WARNING,
+                    'levelname': 'WARNING',
+                    'msg': 'Dropped %d log messages' % self.dropped}))
+                self.dropped = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
 
 
 class Logger:
     """
     Python logging wrapper
     from https://github.com/MixedRealityLab/conditional-voice-recorder/
+
+    Messages for the system log (or log file on macOS) are written by
+    a background thread, so slow writes don't hold up the thread that
+    is logging. If more than {QUEUE_SIZE} messages are waiting, new
+    messages are dropped.
     """
     TIMESTAMP_FORMAT = '%Y-%m-%d %H.%M.%S'
     FILE_PREFIX = 'log-'
+    QUEUE_SIZE = 10000
 
     _loggers = {}
+    _handler = None
+    _listener = None
 
     CRITICAL = logging.CRITICAL
     ERROR = logging.ERROR
@@ -27,89 +75,118 @@ class Logger:
 
     chosen_level = logging.INFO
 
+    LEVELS = {
+        'critical': logging.CRITICAL,
+        'error': logging.ERROR,
+        'exception': logging.ERROR,
+        'warning': logging.WARNING,
+        'info': logging.INFO,
+        'log': logging.INFO,
+        'debug': logging.DEBUG
+    }
+
+    _system = platform.system()
+    _colour = _system != 'Windows'
+
     COLOURS = {
         'critical': '\033[1;41m',  # red bg bold fg
         'error': '\033[1;31m',     # red bold fg
         'warning': '\033[0;43m',   # yellow bg
         'info': '\033[0m',         # no colour
+        'log': '\033[0m',          # no colour
+        'exception': '\033[1;31m',  # red bold fg
         'debug': '\033[0;2m'       # grey fg
     }
 
     @staticmethod
-    def debug(tag, message=None):
+    def debug(tag, message=None, *args):
         """
         Post a debug-level message
 
         Arguments:
             tag {str} -- tag for the log message
             message {str} -- log message to post
+            *args {mixed} -- arguments for the message, formatted
+                             only if the level is enabled
         """
-        Logger._post('debug', tag, message)
+        Logger._post('debug', tag, message, args)
 
     @staticmethod
-    def info(tag, message=None):
+    def info(tag, message=None, *args):
         """Post an info-level message
 
         Arguments:
             tag {str} -- tag for the log message
             message {str} -- log message to post
+            *args {mixed} -- arguments for the message, formatted
+                             only if the level is enabled
         """
-        Logger._post('info', tag, message)
+        Logger._post('info', tag, message, args)
 
     @staticmethod
-    def warning(tag, message=None):
+    def warning(tag, message=None, *args):
         """
         Post a warning-level message
 
         Arguments:
             tag {str} -- tag for the log message
             message {str} -- log message to post
+            *args {mixed} -- arguments for the message, formatted
+                             only if the level is enabled
         """
-        Logger._post('warning', tag, message)
+        Logger._post('warning', tag, message, args)
 
     @staticmethod
-    def error(tag, message=None):
+    def error(tag, message=None, *args):
         """
         Post an error-level message
 
         Arguments:
             tag {str} -- tag for the log message
             message {str} -- log message to post
+            *args {mixed} -- arguments for the message, formatted
+                             only if the level is enabled
         """
-        Logger._post('error', tag, message)
+        Logger._post('error', tag, message, args)
 
     @staticmethod
-    def critical(tag, message=None):
+    def critical(tag, message=None, *args):
         """
         Post a critical-level message
 
         Arguments:
             tag {str} -- tag for the log message
             message {str} -- log message to post
+            *args {mixed} -- arguments for the message, formatted
+                             only if the level is enabled
         """
-        Logger._post('critical', tag, message)
+        Logger._post('critical', tag, message, args)
 
     @staticmethod
-    def log(tag, message=None):
+    def log(tag, message=None, *args):
         """
         Post a log-level message
 
         Arguments:
             tag {str} -- tag for the log message
             message {str} -- log message to post
+            *args {mixed} -- arguments for the message, formatted
+                             only if the level is enabled
         """
-        Logger._post('log', tag, message)
+        Logger._post('log', tag, message, args)
 
     @staticmethod
-    def exception(tag, message=None):
+    def exception(tag, message=None, *args):
         """
         Post an exception-level message
 
         Arguments:
             tag {str} -- tag for the log message
             message {str} -- log message to post
+            *args {mixed} -- arguments for the message, formatted
+                             only if the level is enabled
         """
-        Logger._post('exception', tag, message)
+        Logger._post('exception', tag, message, args)
 
     @staticmethod
     def init(level):
@@ -125,30 +202,48 @@ class Logger:
             {Logger}
         """
         Logger.chosen_level = level
+        Logger._system = platform.system()
+        Logger._colour = Logger._system != 'Windows'
+
         logging.basicConfig(
             format=Logger.FORMAT,
             level=level)
 
     @staticmethod
-    def _post(level, tag, message=None):
+    def _post(level, tag, message=None, args=()):
         """
-        Post a message to a logger of a given tag at the given level
+        Post a message to a logger of a given tag at the given level.
+        Nothing is formatted unless the level is enabled.
 
         Arguments:
             tag {str} -- tag for the log message
             level {str} -- level of the log message
             message {str} -- log message to post
+            args {tuple} -- arguments for the log message
         """
+        levelno = Logger.LEVELS[level]
+        if levelno < Logger.chosen_level:
+            return
+
         if message is None:
             message = tag
             tag = ''
 
-        if platform.system() != 'Windows':
+        try:
+            logger = Logger._loggers[tag]
+        except KeyError:
+            logger = Logger._get_logger(level, tag)
+
+        if not logger.isEnabledFor(levelno):
+            return
+
+        if args:
+            message = message % args
+
+        if Logger._colour:
             message = "%s%s\033[0m" % (Logger.COLOURS[level], message)
 
-        logger = Logger._get_logger(level, tag)
-        method = getattr(logger, level)
-        method(message)
+        logger.log(levelno, message, exc_info=level == 'exception')
 
     @staticmethod
     def _get_logger(level, tag):
@@ -163,10 +258,6 @@ class Logger:
         Returns:
             {Logger}
         """
-        log_format = logging.Formatter(
-            '%(asctime)s [%(threadName)-9s] '
-            '[%(levelname)-5.5s]  %(message)s')
-
         try:
             return Logger._loggers[tag]
         except KeyError:
@@ -174,19 +265,58 @@ class Logger:
             Logger._loggers[tag] = logging.getLogger(trimmed_tag)
             Logger._loggers[tag].setLevel(Logger.chosen_level)
 
-            if platform.system() == 'Darwin':
-                # addr = '/var/run/syslog'
-                # handler = logging.handlers.SysLogHandler(address=addr)
-                # Logger._loggers[tag].addHandler(handler)
-
-                path = str(Path.home()) + '/Library/Logs/NottReal.log'
-
-                file_h = logging.FileHandler(path)
-                file_h.setFormatter(log_format)
-                Logger._loggers[tag].addHandler(file_h)
-            elif platform.system() == 'Linux':
-                addr = '/dev/log'
-                handler = logging.handlers.SysLogHandler(address=addr)
+            handler = Logger._get_handler()
+            if handler is not None \
+                    and handler not in Logger._loggers[tag].handlers:
                 Logger._loggers[tag].addHandler(handler)
 
             return Logger._loggers[tag]
+
+    @staticmethod
+    def _get_handler():
+        """
+        Retrieve the handler shared by all tags, which queues records
+        for the system log (or log file on macOS) and starts the
+        thread that writes them
+
+        Returns:
+            {logging.Handler} -- {None} if there is no system log
+        """
+        if Logger._handler is not None:
+            return Logger._handler
+
+        if Logger._system == 'Darwin':
+            # addr = '/var/run/syslog'
+            # handler = logging.handlers.SysLogHandler(address=addr)
+
+            path = str(Path.home()) + '/Library/Logs/NottReal.log'
+
+            target = logging.FileHandler(path)
+            target.setFormatter(logging.Formatter(
+                '%(asctime)s [%(threadName)-9s] '
+                '[%(levelname)-5.5s]  %(message)s'))
+        elif Logger._system == 'Linux':
+            addr = '/dev/log'
+            target = logging.handlers.SysLogHandler(address=addr)
+        else:
+            return None
+
+        log_queue = queue.Queue(Logger.QUEUE_SIZE)
+        Logger._handler = DroppingQueueHandler(log_queue)
+        Logger._listener = logging.handlers.QueueListener(log_queue, target)
+        Logger._listener.start()
+        atexit.register(Logger.shutdown)
+
+        return Logger._handler
+
+    @staticmethod
+    def shutdown():
+        """
+        Write any queued messages and stop the background thread
+        """
+        listener = Logger._listener
+        if listener is not None:
+            Logger._listener = None
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
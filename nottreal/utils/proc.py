@@ -0,0 +1,421 @@
+from .log import Logger
+
+from subprocess import PIPE, Popen
+
+import subprocess
+
+import os
+import queue
+import signal
+import threading
+
+
+class ProcessGroup:
+    """
+    Start commands in their own process group, so that the command and
+    any processes it starts (e.g. a script that plays audio) can be
+    stopped with a single signal, without starting another process
+    """
+    @staticmethod
+    def popen(args, **kwargs):
+        """
+        Start a command in a new process group
+
+        Arguments:
+            args {[str]} -- Command and its arguments
+            **kwargs {mixed} -- Passed to {Popen}
+
+        Returns:
+            {Popen}
+
+        Raises:
+            OSError -- If the command cannot be started
+        """
+        if os.name == 'nt':
+            kwargs['creationflags'] = kwargs.get('creationflags', 0) \
+                | subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            kwargs['start_new_session'] = True
+
+        return Popen(args, **kwargs)
+
+    @staticmethod
+    def signal(proc, sig=signal.SIGTERM):
+        """
+        Signal every process in the group of a command started with
+        {popen} (on Windows, the group is sent CTRL_BREAK_EVENT)
+
+        Arguments:
+            proc {Popen} -- Command (or {None})
+
+        Keyword arguments:
+            sig {int} -- Signal to send (default: {signal.SIGTERM})
+
+        Returns:
+            {bool} -- {True} if the command was running and signalled
+        """
+        if proc is None or proc.poll() is not None:
+            return False
+
+        try:
+            if os.name == 'nt':
+                proc.send_signal(signal.CTRL_BREAK_EVENT)
+            else:
+                os.killpg(proc.pid, sig)
+        except OSError as e:
+            Logger.warning(
+                __name__,
+                'Could not signal "%s" (pid %d): %s',
+                proc.args[0],
+                proc.pid,
+                e)
+            return False
+
+        return True
+
+
+class CoProcess:
+    """
+    A command that is started once and kept running, which is sent
+    text over its standard input. After each text, the command must
+    write a line to its standard output once it has finished with it,
+    and it must finish early (writing its line) when it's sent the
+    interrupt message. The interrupt message is only sent while the
+    command has a text, and any lines left over (e.g. from an
+    interrupt as the command finished) are discarded before the next
+    text is sent. If the command exits (or is stopped because it
+    didn't finish in time), it is restarted straight away in the
+    background. Once stopped, it can't be started again.
+
+    Variables:
+        PROTOCOL_LINE {str} -- Send each text as a line (newlines in
+                               the text are replaced with spaces)
+        PROTOCOL_LENGTH {str} -- Send each text as a line with its
+                                 length in bytes, followed by the text
+        ENCODING {str} -- Encoding of the text
+        TIMEOUT {float} -- Default seconds to wait for the command to
+                           finish with a text
+    """
+    PROTOCOL_LINE = 'line'
+    PROTOCOL_LENGTH = 'length'
+    ENCODING = 'utf-8'
+    TIMEOUT = 60.
+
+    def __init__(self,
+                 args,
+                 protocol=PROTOCOL_LINE,
+                 interrupt=None,
+                 timeout=TIMEOUT):
+        """
+        Prepare to run a command (call {start} to start it)
+
+        Arguments:
+            args {[str]} -- Command and its arguments
+
+        Keyword arguments:
+            protocol {str} -- How text is sent (see PROTOCOL_*)
+            interrupt {str} -- Message to send to interrupt the command
+                               (required, as signals would stop it)
+            timeout {float} -- Seconds to wait for the command to
+                               finish with a text before it's stopped
+
+        Raises:
+            ValueError -- If the protocol is unknown, or there is no
+                          interrupt message
+        """
+        if protocol not in (self.PROTOCOL_LINE, self.PROTOCOL_LENGTH):
+            raise ValueError('Unknown co-process protocol "%s"' % protocol)
+
+        if not interrupt:
+            raise ValueError(
+                'Co-process "%s" has no interrupt message' % args[0])
+
+        self.args = args
+        self.protocol = protocol
+        self.interrupt_msg = interrupt
+        self.timeout = timeout
+
+        self._proc = None
+        self._lines = None
+        self._stopped = False
+        self._sending = False
+        self._start_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def start(self):
+        """
+        Start the command if it isn't running (and hasn't been
+        stopped)
+
+        Raises:
+            OSError -- If the command cannot be started
+        """
+        with self._start_lock:
+            if not self._stopped:
+                self._start()
+
+    def is_running(self):
+        """
+        Is the command running?
+
+        Returns:
+            {bool}
+        """
+        proc = self._proc
+        return proc is not None and proc.poll() is None
+
+    def send(self, text):
+        """
+        Send text to the command and wait until it has finished with it.
+        If the command isn't running, it is (re)started first.
+
+        Arguments:
+            text {str} -- Text to send
+
+        Returns:
+            {bool} -- {False} if the command exited (or was stopped)
+                      before finishing, or has been stopped
+        """
+        for attempt in range(2):
+            try:
+                with self._start_lock:
+                    if self._stopped:
+                        Logger.warning(
+                            __name__,
+                            'Not sending text to "%s", as it has been '
+                            'stopped',
+                            self.args[0])
+                        return False
+                    self._start()
+                    proc, lines = self._proc, self._lines
+
+                with self._write_lock:
+                    self._discard_lines(lines)
+                    self._write(proc, self._encode(text))
+                    self._sending = True
+                break
+            except OSError as e:
+                if attempt > 0:
+                    Logger.error(
+                        __name__,
+                        'Could not send text to "%s": %s',
+                        self.args[0],
+                        e)
+                    return False
+
+        try:
+            line = lines.get(timeout=self.timeout)
+            timed_out = False
+        except queue.Empty:
+            line, timed_out = None, True
+
+        with self._write_lock:
+            self._sending = False
+
+        if timed_out:
+            Logger.error(
+                __name__,
+                '"%s" did not finish within %.1f s, restarting it',
+                self.args[0],
+                self.timeout)
+            ProcessGroup.signal(
+                proc,
+                getattr(signal, 'SIGKILL', signal.SIGTERM))
+            self._restart(proc)
+            return False
+
+        if line is None:
+            Logger.warning(
+                __name__,
+                '"%s" exited before it finished, restarting it',
+                self.args[0])
+            self._restart(proc)
+            return False
+
+        return True
+
+    def interrupt(self):
+        """
+        Interrupt the command with the interrupt message, if it has a
+        text (otherwise its reply would be mistaken for the next
+        text's)
+
+        Returns:
+            {bool} -- {True} if the command was interrupted
+        """
+        proc = self._proc
+        if proc is None or proc.poll() is not None:
+            return False
+
+        try:
+            with self._write_lock:
+                if not self._sending:
+                    return False
+                self._write(proc, self._encode(self.interrupt_msg))
+            return True
+        except OSError as e:
+            Logger.warning(
+                __name__,
+                'Could not interrupt "%s": %s',
+                self.args[0],
+                e)
+            self._restart(proc)
+            return False
+
+    def stop(self):
+        """
+        Stop the command
+        """
+        with self._start_lock:
+            self._stopped = True
+            proc, self._proc = self._proc, None
+
+        if proc is None or proc.poll() is not None:
+            return
+
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        proc.terminate()
+
+        Logger.debug(__name__, 'Stopped "%s"', self.args[0])
+
+    def _start(self):
+        """
+        Start the command if it isn't running (call with the start
+        lock held)
+
+        Raises:
+            OSError -- If the command cannot be started
+        """
+        if self.is_running():
+            return
+
+        if self._proc is not None:
+            Logger.warning(
+                __name__,
+                'Restarting "%s" (exited with %s)',
+                self.args[0],
+                self._proc.returncode)
+
+        proc = ProcessGroup.popen(self.args, stdin=PIPE, stdout=PIPE)
+        lines = queue.Queue()
+
+        reader = threading.Thread(target=self._read, args=(proc, lines))
+        reader.daemon = True
+        reader.start()
+
+        self._proc, self._lines = proc, lines
+        Logger.debug(
+            __name__,
+            'Started "%s" (pid %d)',
+            ' '.join(self.args),
+            proc.pid)
+
+    def _restart(self, proc):
+        """
+        Restart the command in a separate thread once it has exited,
+        unless it has been stopped
+
+        Arguments:
+            proc {Popen} -- Command that has exited (or been signalled)
+        """
+        thread = threading.Thread(target=self._restart_now, args=(proc,))
+        thread.daemon = True
+        thread.start()
+
+    def _restart_now(self, proc):
+        """
+        Restart the command once it has exited, unless it has been
+        stopped
+
+        Arguments:
+            proc {Popen} -- Command that has exited (or been signalled)
+        """
+        try:
+            proc.wait(self.timeout)
+        except subprocess.TimeoutExpired:
+            pass
+
+        with self._start_lock:
+            if self._stopped:
+                return
+
+            try:
+                self._start()
+            except OSError as e:
+                Logger.error(
+                    __name__,
+                    'Could not restart "%s": %s',
+                    self.args[0],
+                    e)
+
+    @staticmethod
+    def _read(proc, lines):
+        """
+        Queue each line the command writes to its standard output, and
+        then {None} when it's closed. Run this in a separate thread.
+
+        Arguments:
+            proc {Popen} -- Running command
+            lines {queue.Queue} -- Queue of the lines
+        """
+        try:
+            for line in iter(proc.stdout.readline, b''):
+                lines.put(line)
+        except (OSError, ValueError):
+            pass
+        lines.put(None)
+
+    def _encode(self, text):
+        """
+        Encode text using the protocol
+
+        Arguments:
+            text {str} -- Text to send
+
+        Returns:
+            {bytes}
+        """
+        if self.protocol == self.PROTOCOL_LENGTH:
+            data = text.encode(self.ENCODING)
+            return b'%d\n%s' % (len(data), data)
+
+        text = text.replace('\r', ' ').replace('\n', ' ')
+        return (text + '\n').encode(self.ENCODING)
+
+    @staticmethod
+    def _discard_lines(lines):
+        """
+        Discard the lines the command has written that weren't waited
+        for (but not the end of its output)
+
+        Arguments:
+            lines {queue.Queue} -- Queue of the lines
+        """
+        while True:
+            try:
+                line = lines.get_nowait()
+            except queue.Empty:
+                return
+
+            if line is None:
+                lines.put(None)
+                return
+
+    @staticmethod
+    def _write(proc, data):
+        """
+        Write to the command's standard input (call with the write lock
+        held)
+
+        Arguments:
+            proc {Popen} -- Running command
+            data {bytes} -- Data to write
+
+        Raises:
+            OSError -- If the command has exited
+        """
+        proc.stdin.write(data)
+        proc.stdin.flush()
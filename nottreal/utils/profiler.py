@@ -0,0 +1,171 @@
+from .log import Logger
+
+from contextlib import contextmanager
+from datetime import datetime
+
+import cProfile
+import os
+import time
+
+
+class StartupProfiler:
+    """
+    Time each phase of NottReal's start-up, up to the first iteration
+    of the UI event loop, and optionally profile the whole start-up
+    with cProfile.
+
+    Variables:
+        TIMESTAMP_FORMAT {str} -- Timestamp for the report filename
+        FILE_PREFIX {str} -- Report filename prefix
+        FILE_EXT {str} -- Report filename suffix
+    """
+    TIMESTAMP_FORMAT = '%Y-%m-%d %H.%M.%S'
+    FILE_PREFIX = 'startup-'
+    FILE_EXT = '.txt'
+
+    _enabled = False
+    _start = None
+    _depth = 0
+    _phases = []
+    _profile = None
+    _pstats_path = None
+    _directory = None
+
+    @staticmethod
+    def init(enabled, start, directory=None, pstats_path=None):
+        """
+        Start profiling (if enabled)
+
+        Arguments:
+            enabled {bool} -- Profile the start-up
+            start {float} -- {time.perf_counter()} when NottReal
+                             started
+
+        Keyword arguments:
+            directory {str} -- Directory to write the report to
+            pstats_path {str} -- File to dump cProfile statistics to
+        """
+        StartupProfiler._enabled = enabled or pstats_path is not None
+        StartupProfiler._start = start
+        StartupProfiler._directory = directory
+        StartupProfiler._pstats_path = pstats_path
+
+        if StartupProfiler._enabled and pstats_path is not None:
+            StartupProfiler._profile = cProfile.Profile()
+            StartupProfiler._profile.enable()
+
+    @staticmethod
+    def enabled():
+        """
+        Is the start-up being profiled?
+
+        Returns:
+            {bool}
+        """
+        return StartupProfiler._enabled
+
+    @staticmethod
+    def record(label, duration):
+        """
+        Record the duration of a phase that has been timed elsewhere
+
+        Arguments:
+            label {str} -- Description of the phase
+            duration {float} -- Duration in seconds
+        """
+        if StartupProfiler._enabled:
+            StartupProfiler._phases.append(
+                (StartupProfiler._depth, label, duration))
+
+    @staticmethod
+    @contextmanager
+    def phase(label):
+        """
+        Time a phase of the start-up (phases can be nested)
+
+        Arguments:
+            label {str} -- Description of the phase
+        """
+        if not StartupProfiler._enabled:
+            yield
+            return
+
+        entry = [StartupProfiler._depth, label, None]
+        StartupProfiler._phases.append(entry)
+        StartupProfiler._depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry[2] = time.perf_counter() - start
+            StartupProfiler._depth -= 1
+
+    @staticmethod
+    def finish():
+        """
+        Called on the first iteration of the event loop. Stops
+        profiling and writes the report.
+        """
+        if not StartupProfiler._enabled:
+            return
+
+        StartupProfiler.record(
+            'Time to first event loop iteration',
+            time.perf_counter() - StartupProfiler._start)
+        StartupProfiler._enabled = False
+
+        if StartupProfiler._profile is not None:
+            StartupProfiler._profile.disable()
+            try:
+                StartupProfiler._profile.dump_stats(
+                    StartupProfiler._pstats_path)
+                Logger.info(
+                    __name__,
+                    'Saved start-up profile to "%s"',
+                    StartupProfiler._pstats_path)
+            except IOError:
+                Logger.error(
+                    __name__,
+                    'Failed to save start-up profile to "%s"',
+                    StartupProfiler._pstats_path)
+            StartupProfiler._profile = None
+
+        report = StartupProfiler.report()
+        for line in report.splitlines():
+            Logger.info(__name__, '%s', line)
+
+        if StartupProfiler._directory is not None:
+            timestamp = datetime.now().strftime(
+                StartupProfiler.TIMESTAMP_FORMAT)
+            filepath = os.path.join(
+                StartupProfiler._directory,
+                '%s%s%s' % (StartupProfiler.FILE_PREFIX,
+                            timestamp,
+                            StartupProfiler.FILE_EXT))
+            try:
+                with open(filepath, mode='w') as report_file:
+                    print(report, file=report_file)
+                Logger.info(
+                    __name__,
+                    'Saved start-up report to "%s"',
+                    filepath)
+            except IOError:
+                Logger.error(
+                    __name__,
+                    'Failed to save start-up report to "%s"',
+                    filepath)
+
+    @staticmethod
+    def report():
+        """
+        The duration of each phase, in the order they started
+
+        Returns:
+            {str}
+        """
+        lines = ['%-60s %10s' % ('Start-up phase', 'ms')]
+        for depth, label, duration in StartupProfiler._phases:
+            lines.append('%-60s %10.1f' % (
+                ('  ' * depth + label)[:60],
+                (duration or 0) * 1e3))
+        return '\n'.join(lines)
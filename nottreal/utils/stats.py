@@ -0,0 +1,192 @@
+from bisect import bisect_right
+
+import math
+import threading
+
+
+class LatencyStats:
+    """
+    Call count, cumulative time and a latency histogram for one
+    measured thing. The histogram uses logarithmic buckets so memory
+    is bounded regardless of how many samples are recorded.
+
+    Variables:
+        MIN_LATENCY {float} -- Upper edge of the first bucket (seconds)
+        MAX_LATENCY {float} -- Lower edge of the overflow bucket
+                               (seconds)
+        BUCKETS_PER_DECADE {int} -- Histogram resolution
+    """
+    MIN_LATENCY = 1e-6
+    MAX_LATENCY = 1e3
+    BUCKETS_PER_DECADE = 20
+
+    _edges = None
+
+    def __init__(self):
+        """
+        Create an empty set of statistics
+        """
+        if LatencyStats._edges is None:
+            LatencyStats._edges = LatencyStats._bucket_edges()
+
+        self.count = 0
+        self.total = 0.
+        self.min = None
+        self.max = None
+        self._buckets = [0] * (len(self._edges) + 1)
+
+    @staticmethod
+    def _bucket_edges():
+        """
+        Calculate the upper edges of the histogram buckets
+
+        Returns:
+            {[float]}
+        """
+        decades = math.log10(LatencyStats.MAX_LATENCY
+                             / LatencyStats.MIN_LATENCY)
+        num_edges = int(decades * LatencyStats.BUCKETS_PER_DECADE) + 1
+        return [LatencyStats.MIN_LATENCY
+                * 10 ** (i / LatencyStats.BUCKETS_PER_DECADE)
+                for i in range(num_edges)]
+
+    def record(self, duration):
+        """
+        Record a sample
+
+        Arguments:
+            duration {float} -- Duration of the sample in seconds
+        """
+        self.count += 1
+        self.total += duration
+        if self.min is None or duration < self.min:
+            self.min = duration
+        if self.max is None or duration > self.max:
+            self.max = duration
+        self._buckets[bisect_right(self._edges, duration)] += 1
+
+    def mean(self):
+        """
+        Mean duration of the samples
+
+        Returns:
+            {float} -- {None} if there are no samples
+        """
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percentile):
+        """
+        Estimate a percentile from the histogram (the upper edge of
+        the bucket that contains the percentile, capped at the
+        largest sample)
+
+        Arguments:
+            percentile {float} -- Percentile between 0 and 100
+
+        Returns:
+            {float} -- {None} if there are no samples
+        """
+        if not self.count:
+            return None
+
+        target = math.ceil(self.count * percentile / 100.)
+        seen = 0
+        for idx, bucket in enumerate(self._buckets):
+            seen += bucket
+            if seen >= target:
+                if idx < len(self._edges):
+                    return min(self._edges[idx], self.max)
+                return self.max
+
+        return self.max
+
+    def to_dict(self):
+        """
+        Summary of the statistics
+
+        Returns:
+            {dict}
+        """
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.mean(),
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99)}
+
+
+class StatsCollection:
+    """
+    A thread-safe collection of {LatencyStats} by key
+    """
+    def __init__(self):
+        """
+        Create an empty collection
+        """
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, key, duration):
+        """
+        Record a sample
+
+        Arguments:
+            key {str} -- What was measured
+            duration {float} -- Duration of the sample in seconds
+        """
+        with self._lock:
+            try:
+                stats = self._stats[key]
+            except KeyError:
+                stats = self._stats[key] = LatencyStats()
+            stats.record(duration)
+
+    def clear(self):
+        """
+        Forget all recorded samples
+        """
+        with self._lock:
+            self._stats = {}
+
+    def to_dict(self):
+        """
+        Summary of all statistics, ordered by cumulative time
+
+        Returns:
+            {dict(str,dict)}
+        """
+        with self._lock:
+            items = sorted(
+                self._stats.items(),
+                key=lambda item: item[1].total,
+                reverse=True)
+            return {key: stats.to_dict() for key, stats in items}
+
+    def summary(self, limit=None):
+        """
+        Human-readable summary, ordered by cumulative time
+
+        Keyword arguments:
+            limit {int} -- Maximum number of rows (default: all)
+
+        Returns:
+            {str}
+        """
+        rows = list(self.to_dict().items())
+        if limit is not None:
+            rows = rows[:limit]
+
+        lines = ['%-40s %7s %9s %8s %8s %8s' % (
+            '', 'calls', 'total ms', 'p50 ms', 'p95 ms', 'p99 ms')]
+        for key, stats in rows:
+            lines.append('%-40s %7d %9.1f %8.2f %8.2f %8.2f' % (
+                key[:40],
+                stats['count'],
+                stats['total'] * 1e3,
+                stats['p50'] * 1e3,
+                stats['p95'] * 1e3,
+                stats['p99'] * 1e3))
+        return '\n'.join(lines)
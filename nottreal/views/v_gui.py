@@ -1,10 +1,11 @@
 
 from ..utils.init import ClassUtils
 from ..utils.log import Logger
+from ..utils.profiler import StartupProfiler
 from .v_wizard import WizardWindow
 from .v_output_abstract import AbstractOutputView
 
-from PySide2.QtCore import (QEvent)
+from PySide2.QtCore import (QEvent, QTimer)
 from PySide2.QtGui import (QIcon, QPixmap)
 from PySide2.QtWidgets import (QApplication, QStyleFactory)
 
@@ -60,7 +61,8 @@ class Gui(QApplication):
                 else:
                     Logger.info(
                         __name__,
-                        'Output view "%s" is disabled' % name)
+                        'Output view "%s" is disabled',
+                        name)
             else:
                 try:
                     instance = cls(
@@ -70,26 +72,31 @@ class Gui(QApplication):
                     if instance.activated():
                         self.output[name.lower()] = instance
                         instance.init_ui()
-                        Logger.info(__name__, 'Loaded output view "%s"' % name)
+                        Logger.info(__name__, 'Loaded output view "%s"', name)
                     else:
                         Logger.info(
                             __name__,
-                            'Output view "%s" is disabled' % name)
+                            'Output view "%s" is disabled',
+                            name)
                 except TypeError:
                     Logger.error(
                         __name__,
-                        '"%s" has invalid constructor arguments' % name)
+                        '"%s" has invalid constructor arguments',
+                        name)
 
     def run_loop(self):
         """Show the GUI application by starting the UI loop"""
+        if StartupProfiler.enabled():
+            QTimer.singleShot(0, StartupProfiler.finish)
+
         self.exec_()
 
     def event(self, e):
         if e.type() == QEvent.FileOpen:
             Logger.debug(
                 __name__,
-                "Received open file event: "
-                + e.file())
+                'Received open file event: %s',
+                e.file())
             self.nottreal.router(
                 'wizard',
                 'delayed_set_config',
@@ -0,0 +1,356 @@
+
+from ..utils.log import Logger
+from ..utils.profiler import StartupProfiler
+from ..models.m_mvc import LatencyTrace, Message, WizardAlert
+
+from bisect import bisect_right
+
+import threading
+
+
+class Headless:
+    """
+    A view without any windows, so NottReal can be run (e.g. from
+    a script or test) without a window server. The Wizard window is
+    replaced with {HeadlessWizardWindow}, which records what would
+    have been shown, and there are no output views.
+    """
+    def __init__(self, nottreal, args):
+        """
+        Create the headless view
+
+        Arguments:
+            nottreal {App} -- Main NottReal class
+            args {[str]} -- CLI arguments
+        """
+        self.nottreal = nottreal
+        self.args = args
+
+        self._quit = threading.Event()
+
+    def init_ui(self):
+        """
+        Create the (windowless) Wizard window
+        """
+        self.wizard_window = HeadlessWizardWindow(
+            self.nottreal,
+            self.args)
+
+        self.output = {}
+
+    def run_loop(self):
+        """Block until the application quits"""
+        if StartupProfiler.enabled():
+            StartupProfiler.finish()
+
+        self._quit.wait()
+
+    def quit(self):
+        """Stop the loop"""
+        self._quit.set()
+
+
+class HeadlessWizardWindow:
+    """
+    Stands in for the Wizard window when there is no UI. Options,
+    messages and alerts are kept so they can be inspected.
+    """
+    def __init__(self, nottreal, args):
+        """
+        The stand-in for the Wizard's window
+
+        Arguments:
+            nottreal {App} -- Main NottReal class
+            args {[str]} -- CLI arguments
+        """
+        self.nottreal = nottreal
+        self.args = args
+        self.router = nottreal.router
+
+        self.title = nottreal.config.config_dir
+        self.data = None
+        self.alerts = []
+
+        self._visible = False
+        self._recogniser_visible = False
+
+        self.menu = HeadlessMenu()
+        self.recognised_words = HeadlessList()
+        self.slot_history = HeadlessSlotHistory()
+        self.msg_queue = HeadlessList()
+        self.command = HeadlessCommand(self)
+        self.msg_history = HeadlessList()
+
+    def init_ui(self):
+        """Nothing to prepare"""
+        Logger.info(__name__, 'Loaded headless Wizard window')
+
+    def set_title(self, new_dir):
+        """
+        Remember the configuration directory
+
+        Arguments:
+            new_dir {str} -- New configuration directory
+        """
+        self.title = new_dir
+
+    def set_data(self, data):
+        """
+        Remember the data
+
+        Arguments:
+            data {TSVModel} -- New model
+        """
+        self.data = data
+
+    def close_alert(self):
+        """Nothing to close"""
+        pass
+
+    def show_alert(self, alert):
+        """
+        Log an alert, as there is no Wizard to show it to
+
+        Arguments:
+            alert {WizardAlert} -- Alert to show
+        """
+        self.alerts.append(alert)
+
+        if alert.level == WizardAlert.LEVEL_ERROR:
+            log = Logger.error
+        elif alert.level == WizardAlert.LEVEL_WARN:
+            log = Logger.warning
+        else:
+            log = Logger.info
+        log(__name__, '%s: %s', alert.title, alert.text)
+
+    def show(self):
+        """Mark the window as visible"""
+        self._visible = True
+
+    def is_visible(self):
+        """
+        Has the window been shown?
+
+        Returns:
+            {bool}
+        """
+        return self._visible
+
+    def toggle_recogniser(self):
+        """
+        Toggle the (notional) visibility of the recogniser
+        """
+        self._recogniser_visible = not self._recogniser_visible
+
+
+class HeadlessMenu:
+    """
+    Keeps the options registered by the controllers
+    """
+    def __init__(self):
+        """
+        Create an empty menu
+        """
+        self._options = {}
+
+    def add_option(self, option):
+        """
+        Add an option
+
+        Arguments:
+            option {WizardOption} -- Constructed option object
+        """
+        option.ui_update = self._update_option
+        self._options[option.key] = option
+
+    def remove_option(self, option):
+        """
+        Remove an option
+
+        Arguments:
+            option {WizardOption} -- Option to remove
+        """
+        self._options.pop(option.key, None)
+
+    def option(self, key):
+        """
+        Retrieve an option, e.g. to change it as if the Wizard did
+
+        Arguments:
+            key {str} -- Key of the option
+
+        Returns:
+            {WizardOption} -- {None} if there is no such option
+        """
+        return self._options.get(key)
+
+    def options(self):
+        """
+        All registered options
+
+        Returns:
+            {[WizardOption]}
+        """
+        return list(self._options.values())
+
+    def _update_option(self, option):
+        """
+        Nothing to update
+
+        Arguments:
+            option {WizardOption} -- Option that was updated
+        """
+        pass
+
+
+class HeadlessList:
+    """
+    Stands in for a list of messages in the Wizard window
+    """
+    def __init__(self):
+        """
+        Create an empty list
+        """
+        self.items = []
+        self._priorities = []
+
+    def add(self, text, priority=None):
+        """
+        Add some text, after any text with the same or a higher
+        priority
+
+        Arguments:
+            text {str} -- Text to add
+
+        Keyword arguments:
+            priority {int} -- Priority class ({Message.PRIORITY_*}),
+                              or {None} to add it at the end
+        """
+        if priority is None:
+            idx = len(self.items)
+        else:
+            idx = bisect_right(self._priorities, priority)
+        self.items.insert(idx, text)
+        self._priorities.insert(
+            idx,
+            priority if priority is not None else Message.PRIORITY_DEFERRED)
+
+    def remove(self, text):
+        """
+        Remove the first occurrence of some text
+
+        Arguments:
+            text {str} -- Text to remove
+        """
+        try:
+            idx = self.items.index(text)
+            del self.items[idx]
+            del self._priorities[idx]
+        except ValueError:
+            pass
+
+    def clear(self):
+        """
+        Remove everything
+        """
+        self.items = []
+        self._priorities = []
+
+
+class HeadlessSlotHistory:
+    """
+    Stands in for the slot history in the Wizard window
+    """
+    def __init__(self):
+        """
+        Create an empty history
+        """
+        self.slots = {}
+
+    def add(self, name, value):
+        """
+        Record the latest value of a slot
+
+        Arguments:
+            name {str} -- Name of the slot
+            value {str} -- Value of the slot
+        """
+        self.slots[name] = value
+
+
+class HeadlessCommand:
+    """
+    Stands in for the Wizard's command box
+    """
+    def __init__(self, parent):
+        """
+        Create the command box
+
+        Arguments:
+            parent {HeadlessWizardWindow} -- Wizard window
+        """
+        self.parent = parent
+        self.log_msgs = HeadlessWidget()
+
+    def speak_text(self, text, loading=False, priority=None):
+        """
+        Send text to the voice subsystem, as if the Wizard had typed
+        it and pressed speak (slots aren't filled in)
+
+        Arguments:
+            text {str} -- Text to speak
+            loading {bool} -- Is a loading message (default: False)
+            priority {int} -- Priority class ({Message.PRIORITY_*},
+                              default: from {loading})
+        """
+        trace = LatencyTrace(LatencyTrace.CLICKED)
+
+        text = text.strip()
+        if len(text) > 0:
+            self.parent.router(
+                'wizard',
+                'speak_text',
+                text=text,
+                loading=loading,
+                trace=trace,
+                priority=priority)
+
+    def set_text(self, text, upcoming=None):
+        """
+        Let the voice subsystem prepare the audio of some text, as if
+        the Wizard had selected a prepared message
+
+        Arguments:
+            text {str} -- Text to set
+
+        Keyword arguments:
+            upcoming {[str]} -- Text that may be spoken afterwards
+        """
+        self.parent.router(
+            'wizard',
+            'speculate',
+            texts=[text] + (upcoming or []))
+
+    def clear_saved_slots(self):
+        """Nothing to clear"""
+        pass
+
+
+class HeadlessWidget:
+    """
+    Stands in for a widget that is shown or hidden
+    """
+    def __init__(self):
+        """
+        Create a hidden widget
+        """
+        self.visible = False
+
+    def show(self):
+        """Show the widget"""
+        self.visible = True
+
+    def hide(self):
+        """Hide the widget"""
+        self.visible = False
@@ -84,10 +84,10 @@ class AbstractOutputView(QWidget):
         if self.isVisible():
             self.hide()
             self.close()
-            Logger.info(__name__, '%s is closed' % self.get_label())
+            Logger.info(__name__, '%s is closed', self.get_label())
         else:
             self.show()
-            Logger.info(__name__, '%s is visible' % self.get_label())
+            Logger.info(__name__, '%s is visible', self.get_label())
 
     def toggle_fullscreen(self):
         """
@@ -95,10 +95,10 @@ class AbstractOutputView(QWidget):
         """
         if self.isFullScreen():
             self.showNormal()
-            Logger.info(__name__, '%s is windows' % self.get_label())
+            Logger.info(__name__, '%s is windows', self.get_label())
         else:
             self.showFullScreen()
-            Logger.info(__name__, '%s is fullscreen' % self.get_label())
+            Logger.info(__name__, '%s is fullscreen', self.get_label())
 
     @abc.abstractmethod
     def set_message(self, text):
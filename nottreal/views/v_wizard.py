@@ -1,8 +1,10 @@
 
 from ..utils.log import Logger
-from ..models.m_mvc import VUIState, WizardAlert, WizardOption
+from ..models.m_mvc import (LatencyTrace, Message, VUIState, WizardAlert,
+                            WizardOption)
 
-from collections import OrderedDict, deque
+from bisect import bisect_right
+from collections import OrderedDict
 from PySide2.QtWidgets import (QAbstractItemView, QAction, QComboBox,
                                QDialogButtonBox, QFileDialog,
                                QGridLayout, QGroupBox, QHBoxLayout,
@@ -1113,10 +1115,13 @@ class PreparedMessagesWidget(QTabWidget):
     Variables:
         DOUBLE_CLICK_TIMER {int} -- Two clicks in this many ms is
             a double click
+        SPECULATE_AHEAD {int} -- Number of messages after the
+            selected message to prepare the audio of
         ID, LABEL, TEXT {int} -- Column IDs for the prepared messages
             list
     """
     DOUBLE_CLICK_TIMER = 450
+    SPECULATE_AHEAD = 2
     ID, LABEL, TEXT = range(3)
 
     def __init__(self, parent):
@@ -1230,9 +1235,12 @@ class PreparedMessagesWidget(QTabWidget):
         """
         self.selected_msg = msg_id
         msgs = list(self._cats.values())[self.currentIndex()]['msgs']
-        msg = next(msg for msg in msgs if msg['id'] == msg_id)
+        idx = next(idx for idx, msg in enumerate(msgs) if msg['id'] == msg_id)
 
-        self.parent.command.set_text(msg['text'])
+        upcoming = msgs[idx + 1:idx + 1 + self.SPECULATE_AHEAD]
+        self.parent.command.set_text(
+            msgs[idx]['text'],
+            upcoming=[msg['text'] for msg in upcoming])
 
     def _set_msgs(self, model, msgs):
         """Set the messages for a particular model
@@ -1448,7 +1456,8 @@ class MessageQueueWidget(QTreeView):
 
         self.parent = parent
 
-        self._queued_messages = deque()
+        self._queued_messages = []
+        self._priorities = []
 
         self.setRootIsDecorated(False)
         self.setAlternatingRowColors(True)
@@ -1463,15 +1472,21 @@ class MessageQueueWidget(QTreeView):
         self.setSelectionMode(QAbstractItemView.NoSelection)
         self.setEditTriggers(QAbstractItemView.NoEditTriggers)
 
-    def add(self, text):
+    def add(self, text, priority=Message.PRIORITY_NORMAL):
         """
-        Add an item to the top of the model of the message queue
+        Add an item to the model of the message queue, in the order it
+        will be spoken (i.e. after messages with the same or a higher
+        priority)
 
         Arguments:
             text {str} -- Text to add to the queue
+
+        Keyword arguments:
+            priority {int} -- Priority class ({Message.PRIORITY_*})
         """
-        self._queued_messages.append(text)
-        idx = len(self._queued_messages) - 1
+        idx = bisect_right(self._priorities, priority)
+        self._queued_messages.insert(idx, text)
+        self._priorities.insert(idx, priority)
         self.model.insertRow(idx)
         self.model.setData(self.model.index(idx, self.QUEUED_MESSAGE), text)
 
@@ -1481,6 +1496,7 @@ class MessageQueueWidget(QTreeView):
         """
         self.model.removeRows(0, len(self._queued_messages))
         self._queued_messages.clear()
+        self._priorities.clear()
 
     def remove(self, text):
         """
@@ -1493,6 +1509,7 @@ class MessageQueueWidget(QTreeView):
             idx = self._queued_messages.index(text)
             self.model.removeRow(idx)
             del self._queued_messages[idx]
+            del self._priorities[idx]
         except ValueError:
             pass
 
@@ -1602,18 +1619,27 @@ class CommandWidget(QGroupBox):
         for key, value in new_loading_msgs.items():
             self.loading_msgs.addItem(value['message'])
 
-    def set_text(self, text):
+    def set_text(self, text, upcoming=None):
         """
-        Set the message text
+        Set the message text, and let the voice subsystem prepare
+        its audio in case it's spoken
 
         Arguments:
             text {str} -- Text to set
+
+        Keyword arguments:
+            upcoming {[str]} -- Text that may be spoken afterwards
         """
         self._text_speak.setPlainText(text)
         self._text_speak.setFocus()
         self._select_msg_slot(from_start=True)
 
-    def speak_text(self, text, loading=False):
+        self.parent.router(
+            'wizard',
+            'speculate',
+            texts=[text] + (upcoming or []))
+
+    def speak_text(self, text, loading=False, priority=None):
         """
         Send text to the voice subsystem. if it contains slots, then
         the first slot is selected and the text will not be sent. When
@@ -1622,7 +1648,11 @@ class CommandWidget(QGroupBox):
         Arguments:
             text {str} -- Text to speak
             loading {bool} -- Is a loading message (default: False)
+            priority {int} -- Priority class ({Message.PRIORITY_*},
+                              default: from {loading})
         """
+        trace = LatencyTrace(LatencyTrace.CLICKED)
+
         text = text.strip()
         if len(text) > 0:
             requires_editing = False
@@ -1641,7 +1671,7 @@ class CommandWidget(QGroupBox):
                     value = self._saved_slots[name]
                     Logger.debug(
                         __name__,
-                        'Replacing slot "%s" with value "%s"' % (name, value))
+                        'Replacing slot "%s" with value "%s"', name, value)
                     text = text.replace(match.group(0), value)
 
                     if autoreplace_end:
@@ -1652,7 +1682,8 @@ class CommandWidget(QGroupBox):
             if requires_editing:
                 Logger.debug(
                     __name__,
-                    'Message has slots that aren\'t filled ("%s")' % name)
+                    'Message has slots that aren\'t filled ("%s")',
+                    name)
                 self.set_text(text)
             else:
                 self._record_last_msg_slot()
@@ -1663,7 +1694,9 @@ class CommandWidget(QGroupBox):
                     cat=self.parent.prepared_msgs.selected_tab_label(),
                     id=self.parent.prepared_msgs.selected_msg,
                     slots=self._current_slots,
-                    loading=loading)
+                    loading=loading,
+                    trace=trace,
+                    priority=priority)
                 self._reset_slot_tracking()
                 self._text_speak.setPlainText('')
 
@@ -1747,8 +1780,8 @@ class CommandWidget(QGroupBox):
                 current_pos -= 1
                 Logger.debug(
                     __name__,
-                    'Seek to previous sloteter in the message from pos %d'
-                    % current_pos)
+                    'Seek to previous sloteter in the message from pos %d',
+                    current_pos)
 
             for match in re.finditer(self.RE_TEXT_SLOT, text[:current_pos]):
                 pass
@@ -1833,7 +1866,8 @@ class CommandWidget(QGroupBox):
         in the prepared message), with the shift modifier returning
         the direction of travel.
 
-        Ctrl+enter (cmd on a Mac) presses the 'Speak' button.
+        Ctrl+enter (cmd on a Mac) presses the 'Speak' button, and
+        Ctrl+shift+enter queues the message after everything else.
 
         Decorators:
             Slot
@@ -1848,6 +1882,8 @@ class CommandWidget(QGroupBox):
         if event.key() == Qt.Key_Return or event.key() == Qt.Key_Enter:
             if (event.modifiers() == Qt.ControlModifier):
                 self._on_speak()
+            elif (event.modifiers() == Qt.ControlModifier | Qt.ShiftModifier):
+                self._on_speak(priority=Message.PRIORITY_DEFERRED)
             elif (event.modifiers() == Qt.ShiftModifier):
                 self._select_msg_slot(reverse=True)
             elif self._select_msg_slot():
@@ -1912,16 +1948,19 @@ class CommandWidget(QGroupBox):
         self._text_speak.setPlainText('')
 
     @Slot()
-    def _on_speak(self):
+    def _on_speak(self, priority=None):
         """
         Speak button pressed, so speak the text if there are no
         slots in it
 
+        Keyword arguments:
+            priority {int} -- Priority class ({Message.PRIORITY_*})
+
         Decorators:
             Slot
         """
         text = self._text_speak.toPlainText()
-        self.speak_text(text)
+        self.speak_text(text, priority=priority)
 
 
 class MessageHistoryWidget(QGroupBox):
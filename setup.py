@@ -37,7 +37,8 @@ setup(
             'dist.nrc/log.tsv',
             'dist.nrc/loading.tsv',
             'dist.nrc/messages.tsv',
-            'dist.nrc/settings.cfg']
+            'dist.nrc/settings.cfg',
+            'dist.nrc/spurts.tsv']
     },
     entry_points={
         'console_scripts': [
@@ -1,12 +1,23 @@
 # -*- mode: python -*-
 
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath('..'))
+from nottreal.utils.init import ClassUtils
+
+# manifests of the plugin classes, so the frozen app doesn't need to
+# import every module to discover them
+for package in ['nottreal.controllers', 'nottreal.views']:
+    ClassUtils.write_manifest(package)
+
 block_cipher = None
 
 
 a = Analysis(['../nottreal.py'],
              pathex=[''],
              binaries=[],
-             datas=[('../dist.nrc', 'dist.nrc'), ('../nottreal/controllers/', 'controllers/'), ('../nottreal/views/', 'views/'), ('../nottreal/resources/file.icns', '.'),],
+             datas=[('../dist.nrc', 'dist.nrc'), ('../nottreal/controllers/', 'controllers/'), ('../nottreal/views/', 'views/'), ('../nottreal/controllers/manifest.json', 'nottreal/controllers'), ('../nottreal/views/manifest.json', 'nottreal/views'), ('../nottreal/resources/file.icns', '.'),],
              hiddenimports=['nottreal.controllers','nottreal.views','pkg_resources.py2_warn'],
              hookspath=['hooks/'],
              runtime_hooks=[],
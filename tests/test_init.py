@@ -0,0 +1,202 @@
+from nottreal.utils.init import ClassRegistry, ClassUtils
+
+from unittest import mock
+
+import os
+import tempfile
+import textwrap
+import unittest
+
+
+class TestClassRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = ClassRegistry()
+
+    def test_subclasses_at_any_depth(self):
+        self.registry.register('Root', [])
+        self.registry.register('Child', ['Root'])
+        self.registry.register('Grandchild', ['Child'])
+
+        self.assertTrue(self.registry.is_subclass('Grandchild', 'Root'))
+        self.assertTrue(self.registry.is_subclass('Child', 'Root'))
+        self.assertFalse(self.registry.is_subclass('Root', 'Child'))
+        self.assertFalse(self.registry.is_subclass('Root', 'Root'))
+        self.assertEqual(
+            self.registry.subclasses_of('Root'),
+            {'Child', 'Grandchild'})
+
+    def test_registered_in_any_order(self):
+        self.registry.register('Grandchild', ['Child'])
+        self.registry.register('Child', ['Root'])
+        self.registry.register('Root', ['object'])
+
+        self.assertTrue(self.registry.is_subclass('Grandchild', 'Root'))
+        self.assertTrue(self.registry.is_subclass('Grandchild', 'object'))
+        self.assertEqual(
+            self.registry.subclasses_of('object'),
+            {'Root', 'Child', 'Grandchild'})
+
+    def test_multiple_inheritance_and_tuples(self):
+        self.registry.register('Mixed', ['Left', 'Right'])
+        self.registry.register('Other', ['Third'])
+
+        self.assertTrue(self.registry.is_subclass('Mixed', 'Right'))
+        self.assertTrue(
+            self.registry.is_subclass('Other', ('Left', 'Third')))
+        self.assertEqual(
+            self.registry.subclasses_of(('Left', 'Third')),
+            {'Mixed', 'Other'})
+
+    def test_unknown_classes(self):
+        self.assertNotIn('Unknown', self.registry)
+        self.assertFalse(self.registry.is_subclass('Unknown', 'Root'))
+        self.assertEqual(self.registry.subclasses_of('Unknown'), set())
+
+    def test_ignores_itself_as_a_base(self):
+        self.registry.register('Loop', ['Loop'])
+
+        self.assertIn('Loop', self.registry)
+        self.assertFalse(self.registry.is_subclass('Loop', 'Loop'))
+
+    def test_register_class(self):
+        class Base:
+            pass
+
+        class Derived(Base):
+            pass
+
+        self.registry.register_class(Derived)
+
+        self.assertTrue(self.registry.is_subclass('Derived', Base))
+        self.assertTrue(self.registry.is_subclass('Derived', object))
+        self.assertIn('Base', self.registry)
+
+
+class TestManifest(unittest.TestCase):
+
+    SOURCE = textwrap.dedent('''
+        import base
+
+
+        class First(base.Root):
+            NAME = 'First'
+            ON_DEMAND = True
+            COUNT = 2
+            RATE = 1.5
+            LIST = [1, 2]
+            COMPUTED = len('abc')
+            UNHASHABLE = {[1]: 2}
+
+            def method(self):
+                INSIDE = 1
+
+
+        class Second(First, Mixin):
+            NAME = 'Second'
+
+
+        def function():
+            pass
+        ''')
+
+    def parse(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'module.py')
+            with open(filepath, mode='w', encoding='utf-8') as source_file:
+                source_file.write(self.SOURCE)
+
+            return ClassUtils._parse_modules({'pkg.module': filepath})
+
+    def test_parses_classes(self):
+        classes = self.parse()
+
+        self.assertEqual(list(classes), ['First', 'Second'])
+        self.assertEqual(classes['First']['module'], 'pkg.module')
+        self.assertEqual(classes['First']['bases'], ['Root'])
+        self.assertEqual(classes['Second']['bases'], ['First', 'Mixin'])
+
+    def test_parses_literal_attributes(self):
+        classes = self.parse()
+
+        self.assertEqual(
+            classes['First']['attrs'],
+            {'NAME': 'First', 'ON_DEMAND': True, 'COUNT': 2, 'RATE': 1.5})
+
+    def test_rejects_unparseable_modules(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'broken.py')
+            with open(filepath, mode='w', encoding='utf-8') as source_file:
+                source_file.write('class Broken(:\n')
+
+            with self.assertRaises(ValueError):
+                ClassUtils._parse_modules({'pkg.broken': filepath})
+
+    def test_class_attribute_follows_inheritance(self):
+        with mock.patch.dict(ClassUtils._manifest, self.parse()):
+            self.assertEqual(
+                ClassUtils.class_attribute('Second', 'NAME'),
+                'Second')
+            self.assertIs(
+                ClassUtils.class_attribute('Second', 'ON_DEMAND'),
+                True)
+            self.assertIsNone(ClassUtils.class_attribute('Second', 'NONE'))
+            self.assertEqual(
+                ClassUtils.class_attribute('Unknown', 'NAME', 'default'),
+                'default')
+
+    def test_round_trip(self):
+        classes = self.parse()
+        mtimes = {'pkg.module': 1.}
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cache', 'manifest.json')
+            ClassUtils._write_manifest(path, mtimes, classes)
+
+            self.assertEqual(
+                ClassUtils._read_manifest(path, mtimes),
+                classes)
+            self.assertIsNone(
+                ClassUtils._read_manifest(path, {'pkg.module': 2.}))
+            self.assertEqual(ClassUtils._read_manifest(path), classes)
+
+    def test_corrupt_manifest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'manifest.json')
+            for classes in ([], {'First': []}, {'First': {'module': 1}}):
+                ClassUtils._write_manifest(path, {}, classes)
+                with mock.patch('nottreal.utils.init.Logger'):
+                    self.assertIsNone(ClassUtils._read_manifest(path))
+
+            for content in ('[]', '{"version": 1', '[' * 100000):
+                with open(path, mode='w', encoding='utf-8') as file:
+                    file.write(content)
+                self.assertIsNone(ClassUtils._read_manifest(path))
+
+    def test_missing_manifest(self):
+        self.assertIsNone(
+            ClassUtils._read_manifest(os.path.join('no', 'such', 'file')))
+
+
+class TestRequirementsMet(unittest.TestCase):
+
+    def test_no_requirements(self):
+        self.assertTrue(ClassUtils.requirements_met())
+
+    def test_modules(self):
+        self.assertTrue(ClassUtils.requirements_met('json, os'))
+        self.assertFalse(
+            ClassUtils.requirements_met('json, no_such_module_nottreal'))
+
+    @mock.patch('platform.platform', return_value='Linux-6.0-ubuntu-22.04')
+    @mock.patch('platform.system', return_value='Linux')
+    def test_platforms(self, system, description):
+        self.assertTrue(ClassUtils.requirements_met(platforms='linux'))
+        self.assertTrue(
+            ClassUtils.requirements_met(platforms='Darwin, ubuntu'))
+        self.assertFalse(
+            ClassUtils.requirements_met(platforms='Darwin, Windows'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,224 @@
+from nottreal.models.m_audio import AudioCache, WavFile
+
+from unittest import mock
+
+import os
+import struct
+import tempfile
+import threading
+import unittest
+import wave
+
+
+class TestAudioCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'cache')
+
+        patcher = mock.patch('nottreal.models.m_audio.Logger')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @staticmethod
+    def render(data):
+        def write(filepath):
+            with open(filepath, 'wb') as audio_file:
+                audio_file.write(data)
+            return True
+        return write
+
+    def files(self):
+        return sorted(os.listdir(self.path))
+
+    def test_key(self):
+        self.assertEqual(
+            AudioCache.key('voice', 'text'),
+            AudioCache.key('voice', 'text'))
+        self.assertNotEqual(
+            AudioCache.key('voice', 'text'),
+            AudioCache.key('voicetext'))
+
+    def test_put_and_get(self):
+        cache = AudioCache(self.path, 1000)
+
+        filepath = cache.put('key', self.render(b'audio'))
+
+        self.assertIn('key', cache)
+        self.assertEqual(cache.get('key'), filepath)
+        with open(filepath, 'rb') as audio_file:
+            self.assertEqual(audio_file.read(), b'audio')
+        self.assertEqual(self.files(), ['key' + AudioCache.FILE_EXT])
+
+    def test_get_missing(self):
+        cache = AudioCache(self.path, 1000)
+
+        self.assertIsNone(cache.get('key'))
+
+    def test_get_deleted_file(self):
+        cache = AudioCache(self.path, 1000)
+        os.remove(cache.put('key', self.render(b'audio')))
+
+        self.assertIsNone(cache.get('key'))
+        self.assertNotIn('key', cache)
+
+    def test_failed_render_leaves_nothing(self):
+        cache = AudioCache(self.path, 1000)
+
+        self.assertIsNone(cache.put('failed', lambda filepath: False))
+        self.assertIsNone(cache.put('empty', self.render(b'')))
+        self.assertEqual(self.files(), [])
+
+    def test_evicts_least_recently_used(self):
+        cache = AudioCache(self.path, 10)
+        cache.put('first', self.render(b'1234'))
+        cache.put('second', self.render(b'1234'))
+        cache.get('first')
+        cache.put('third', self.render(b'1234'))
+
+        self.assertIn('first', cache)
+        self.assertNotIn('second', cache)
+        self.assertIn('third', cache)
+        self.assertEqual(
+            self.files(),
+            ['first' + AudioCache.FILE_EXT, 'third' + AudioCache.FILE_EXT])
+
+    def test_replacing_audio_keeps_the_size(self):
+        cache = AudioCache(self.path, 10)
+        cache.put('key', self.render(b'12345678'))
+        cache.put('key', self.render(b'12345678'))
+
+        self.assertIn('key', cache)
+
+    def test_reopens_existing_files(self):
+        cache = AudioCache(self.path, 1000)
+        cache.put('key', self.render(b'audio'))
+        stale = os.path.join(self.path, 'stale' + AudioCache.TMP_EXT)
+        open(stale, 'wb').close()
+
+        reopened = AudioCache(self.path, 1000)
+
+        self.assertIn('key', reopened)
+        self.assertFalse(os.path.exists(stale))
+
+    def test_concurrent_renders_of_the_same_audio(self):
+        cache = AudioCache(self.path, 1000)
+        started = threading.Barrier(2)
+        results = []
+
+        def render(data):
+            def write(filepath):
+                started.wait(timeout=5)
+                with open(filepath, 'wb') as audio_file:
+                    audio_file.write(data)
+                return True
+            return write
+
+        threads = [
+            threading.Thread(
+                target=lambda data: results.append(
+                    cache.put('key', render(data))),
+                args=(data,))
+            for data in (b'first', b'second')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(results))
+        with open(cache.get('key'), 'rb') as audio_file:
+            self.assertIn(audio_file.read(), (b'first', b'second'))
+        self.assertEqual(self.files(), ['key' + AudioCache.FILE_EXT])
+
+
+class TestWavFile(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self.directory.name, 'audio.wav')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_wav(self, frames, channels=1, width=2, rate=8000):
+        with wave.open(self.filepath, 'wb') as wav_file:
+            wav_file.setnchannels(channels)
+            wav_file.setsampwidth(width)
+            wav_file.setframerate(rate)
+            wav_file.writeframes(frames)
+
+    def write(self, data):
+        with open(self.filepath, 'wb') as wav_file:
+            wav_file.write(data)
+
+    def test_reads_the_format_and_audio(self):
+        frames = bytes(range(200)) * 40
+        self.write_wav(frames, channels=2, width=2, rate=1000)
+
+        wav = WavFile(self.filepath)
+        try:
+            self.assertEqual(
+                (wav.channels, wav.width, wav.rate),
+                (2, 2, 1000))
+            self.assertEqual(bytes(wav.frames), frames)
+            self.assertEqual(wav.duration(), 2.)
+        finally:
+            wav.close()
+
+    def test_skips_other_chunks(self):
+        fmt = struct.pack('<HHIIHH', WavFile.FORMAT_PCM, 1, 8000, 8000, 1, 8)
+        chunks = b'LIST' + struct.pack('<I', 3) + b'abc\0' \
+            + b'fmt ' + struct.pack('<I', len(fmt)) + fmt \
+            + b'data' + struct.pack('<I', 4) + b'\x01\x02\x03\x04'
+        self.write(b'RIFF' + struct.pack('<I', len(chunks) + 4) + b'WAVE'
+                   + chunks)
+
+        wav = WavFile(self.filepath)
+        try:
+            self.assertEqual(bytes(wav.frames), b'\x01\x02\x03\x04')
+        finally:
+            wav.close()
+
+    def test_truncated_audio(self):
+        self.write_wav(b'\0' * 100, channels=1, width=2)
+        with open(self.filepath, 'r+b') as wav_file:
+            wav_file.truncate(os.path.getsize(self.filepath) - 51)
+
+        wav = WavFile(self.filepath)
+        try:
+            self.assertEqual(len(wav.frames), 48)
+        finally:
+            wav.close()
+
+    def test_rejects_other_files(self):
+        self.write(b'RIFF\0\0\0\0AVI LIST')
+        with self.assertRaises(ValueError):
+            WavFile(self.filepath)
+
+        fmt = struct.pack('<HHIIHH', 3, 1, 8000, 32000, 4, 32)
+        self.write(b'RIFF\0\0\0\0WAVE' + b'fmt '
+                   + struct.pack('<I', len(fmt)) + fmt
+                   + b'data\0\0\0\0')
+        with self.assertRaises(ValueError):
+            WavFile(self.filepath)
+
+        self.write(b'RIFF\0\0\0\0WAVEdata\0\0\0\0')
+        with self.assertRaises(ValueError):
+            WavFile(self.filepath)
+
+    def test_close_while_playing(self):
+        self.write_wav(b'\0' * 100)
+        wav = WavFile(self.filepath)
+        playing = memoryview(wav.frames)
+
+        wav.close()
+        self.assertEqual(len(playing), 100)
+        playing.release()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+from nottreal.models.m_markup import MarkupRules
+
+from collections import OrderedDict
+from unittest import mock
+
+import os
+import tempfile
+import unittest
+
+
+class TestMarkupRules(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self.directory.name, 'spurts.tsv')
+
+        patcher = mock.patch('nottreal.models.m_markup.Logger')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, rows, mtime=None):
+        with open(self.filepath, mode='w', newline='') as tsv_file:
+            tsv_file.write(''.join('%s\n' % row for row in rows))
+        if mtime is not None:
+            os.utime(self.filepath, (mtime, mtime))
+
+    def test_replaces_whole_words_regardless_of_case(self):
+        self.write(['hmm\t<spurt id="1"/>'])
+        rules = MarkupRules(self.filepath)
+
+        self.assertEqual(
+            rules.rewrite('Hmm, hmmm and HMM'),
+            ('<spurt id="1"/>, hmmm and <spurt id="1"/>', False))
+
+    def test_prefers_longer_phrases(self):
+        self.write(['oh\t<oh/>', 'oh!\t<oh!/>', 'oh dear\t<oh dear/>'])
+        rules = MarkupRules(self.filepath)
+
+        self.assertEqual(rules.rewrite('oh dear')[0], '<oh dear/>')
+        self.assertEqual(rules.rewrite('oh! no')[0], '<oh!/> no')
+        self.assertEqual(rules.rewrite('oh no')[0], '<oh/> no')
+
+    def test_single_pass(self):
+        self.write(['yes\tno', 'no\tyes'])
+        rules = MarkupRules(self.filepath)
+
+        self.assertEqual(rules.rewrite('yes or no')[0], 'no or yes')
+
+    def test_whole_text_is_a_phrase(self):
+        self.write(['uh-huh\t<uh-huh/>'])
+        rules = MarkupRules(self.filepath)
+
+        self.assertEqual(rules.rewrite(' Uh-huh '), (' <uh-huh/> ', True))
+        self.assertFalse(rules.rewrite('uh-huh, yes')[1])
+
+    def test_skips_comments_and_incomplete_rows(self):
+        self.write(['# comment\t<no/>', 'alone', '\t<empty/>', 'ok\t<ok/>'])
+        rules = MarkupRules(self.filepath)
+
+        self.assertEqual(rules.rewrite('comment alone ok')[0],
+                         'comment alone <ok/>')
+
+    def test_defaults_without_a_file(self):
+        rules = MarkupRules(
+            os.path.join(self.directory.name, 'missing.tsv'),
+            default=OrderedDict([('er', '<er/>')]))
+
+        self.assertEqual(rules.rewrite('er, well')[0], '<er/>, well')
+
+    def test_no_rules(self):
+        rules = MarkupRules(None)
+
+        self.assertEqual(rules.rewrite('hmm'), ('hmm', False))
+
+    def test_reloads_when_the_file_changes(self):
+        self.write(['hmm\t<a/>'], mtime=1000)
+        rules = MarkupRules(self.filepath)
+
+        self.assertTrue(rules.load())
+        self.assertFalse(rules.load())
+
+        self.write(['hmm\t<b/>'], mtime=2000)
+        self.assertTrue(rules.load())
+        self.assertEqual(rules.rewrite('hmm')[0], '<b/>')
+
+
+if __name__ == '__main__':
+    unittest.main()
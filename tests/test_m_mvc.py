@@ -0,0 +1,175 @@
+from nottreal.models.m_mvc import LatencyTrace, Message, MessageQueue
+
+import unittest
+
+
+class TestMessageCombine(unittest.TestCase):
+
+    def test_joins_texts_as_sentences(self):
+        combined = Message.combine([
+            Message('Hello'),
+            Message('How are you?'),
+            Message('Fine, thanks')])
+
+        self.assertEqual(combined.text, 'Hello. How are you? Fine, thanks')
+
+    def test_keeps_existing_punctuation(self):
+        combined = Message.combine([Message('Well,'), Message('maybe')])
+
+        self.assertEqual(combined.text, 'Well, maybe')
+
+    def test_skips_empty_texts(self):
+        parts = [Message(''), Message('Hello'), Message('  '), Message('Bye')]
+        combined = Message.combine(parts)
+
+        self.assertEqual(combined.text, 'Hello. Bye')
+        self.assertEqual(combined.parts, parts)
+
+    def test_only_empty_texts(self):
+        combined = Message.combine([Message(''), Message('')])
+
+        self.assertEqual(combined.text, '')
+
+    def test_uses_first_message_options(self):
+        first = Message(
+            'One',
+            loading=True,
+            priority=Message.PRIORITY_DEFERRED,
+            expires=10.)
+        combined = Message.combine([first, Message('Two')])
+
+        self.assertTrue(combined.loading)
+        self.assertEqual(combined.priority, Message.PRIORITY_DEFERRED)
+        self.assertEqual(combined.expires, 10.)
+        self.assertIs(combined.trace, first.trace)
+
+    def test_marks_every_part(self):
+        parts = [Message('One'), Message('Two')]
+        Message.combine(parts).mark(LatencyTrace.DEQUEUED, timestamp=1.)
+
+        for part in parts:
+            self.assertEqual(
+                part.trace.stages,
+                [(LatencyTrace.DEQUEUED, 1.)])
+
+
+class TestMessageQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = MessageQueue()
+
+    def texts(self):
+        return [message.text for message in self.queue.messages()]
+
+    def test_orders_by_priority_then_queued(self):
+        self.queue.push(Message('normal 1'))
+        self.queue.push(
+            Message('deferred', priority=Message.PRIORITY_DEFERRED))
+        self.queue.push(Message('loading', loading=True))
+        self.queue.push(Message('normal 2'))
+
+        self.assertEqual(
+            self.texts(),
+            ['loading', 'normal 1', 'normal 2', 'deferred'])
+
+        popped = []
+        while len(self.queue):
+            message, _ = self.queue.pop(now=0.)
+            popped.append(message.text)
+        self.assertEqual(
+            popped,
+            ['loading', 'normal 1', 'normal 2', 'deferred'])
+
+    def test_pop_empty(self):
+        self.assertEqual(self.queue.pop(now=0.), (None, []))
+
+    def test_drops_expired_messages(self):
+        expired = Message('expired', expires=5.)
+        self.queue.push(expired)
+        self.queue.push(Message('kept', expires=20.))
+        self.queue.push(Message('never expires'))
+
+        message, dropped = self.queue.pop(now=10.)
+
+        self.assertEqual(message.text, 'kept')
+        self.assertEqual(dropped, [expired])
+        self.assertEqual(self.texts(), ['never expires'])
+
+    def test_expires_at_deadline(self):
+        self.queue.push(Message('expired', expires=10.))
+
+        message, dropped = self.queue.pop(now=10.)
+
+        self.assertIsNone(message)
+        self.assertEqual(len(dropped), 1)
+
+    def test_drops_expired_messages_between_combined(self):
+        self.queue.push(Message('One'))
+        self.queue.push(Message('expired', expires=1.))
+        self.queue.push(Message('Two'))
+
+        message, dropped = self.queue.pop(
+            now=2.,
+            can_append=lambda previous, next: True)
+
+        self.assertEqual(message.text, 'One. Two')
+        self.assertEqual([m.text for m in dropped], ['expired'])
+
+    def test_never_combines_without_can_append(self):
+        self.queue.push(Message('One'))
+        self.queue.push(Message('Two'))
+
+        message, _ = self.queue.pop(now=0.)
+
+        self.assertEqual(message.text, 'One')
+        self.assertEqual(len(self.queue), 1)
+
+    def test_combines_while_can_append(self):
+        for text in ('One', 'Two', 'Three'):
+            self.queue.push(Message(text))
+
+        message, _ = self.queue.pop(
+            now=0.,
+            can_append=lambda previous, next: next.text != 'Three')
+
+        self.assertEqual(message.text, 'One. Two')
+        self.assertEqual(self.texts(), ['Three'])
+
+    def test_combines_at_most_limit(self):
+        for i in range(MessageQueue.COMBINE_LIMIT + 2):
+            self.queue.push(Message('Message %d' % i))
+
+        message, _ = self.queue.pop(
+            now=0.,
+            can_append=lambda previous, next: True)
+
+        self.assertEqual(len(message.parts), MessageQueue.COMBINE_LIMIT)
+        self.assertEqual(len(self.queue), 2)
+
+    def test_clear(self):
+        self.queue.push(Message('One'))
+        self.queue.clear()
+
+        self.assertEqual(len(self.queue), 0)
+        self.assertEqual(self.queue.messages(), [])
+
+
+class TestLatencyTrace(unittest.TestCase):
+
+    def test_durations_and_total(self):
+        trace = LatencyTrace()
+        trace.mark(LatencyTrace.CLICKED, timestamp=1.)
+        trace.mark(LatencyTrace.QUEUED, timestamp=1.5)
+        trace.mark(LatencyTrace.STOPPED, timestamp=3.)
+
+        self.assertEqual(
+            list(trace.durations().items()),
+            [(LatencyTrace.QUEUED, .5), (LatencyTrace.STOPPED, 1.5)])
+        self.assertEqual(trace.total(), 2.)
+
+    def test_empty_total(self):
+        self.assertEqual(LatencyTrace().total(), 0.)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+from nottreal.utils.proc import CoProcess
+
+from unittest import mock
+
+import os
+import sys
+import textwrap
+import threading
+import time
+import unittest
+
+
+ENGINE = textwrap.dedent('''
+    import sys
+    import time
+
+    for line in iter(sys.stdin.readline, ''):
+        line = line.strip()
+        if line == 'hang':
+            continue
+        elif line == 'exit':
+            sys.exit(0)
+        elif line == 'wait':
+            sys.stdin.readline()
+        elif line == 'slow':
+            time.sleep(.3)
+        elif line == 'twice':
+            print('done', flush=True)
+        print('done', flush=True)
+    ''')
+
+
+@unittest.skipIf(os.name == 'nt', 'Co-processes are signalled as groups')
+class TestCoProcess(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch('nottreal.utils.proc.Logger')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.coprocess = CoProcess(
+            [sys.executable, '-c', ENGINE],
+            interrupt='STOP',
+            timeout=2.)
+        self.addCleanup(self.coprocess.stop)
+
+    def wait_for_restart(self, pid):
+        deadline = time.monotonic() + 5.
+        while time.monotonic() < deadline:
+            proc = self.coprocess._proc
+            if proc is not None and proc.pid != pid \
+                    and self.coprocess.is_running():
+                return True
+            time.sleep(.01)
+        return False
+
+    def test_requires_an_interrupt_message(self):
+        with self.assertRaises(ValueError):
+            CoProcess(['engine'])
+
+    def test_rejects_unknown_protocols(self):
+        with self.assertRaises(ValueError):
+            CoProcess(['engine'], protocol='xml', interrupt='STOP')
+
+    def test_encodes_lines(self):
+        self.assertEqual(
+            self.coprocess._encode('one\ntwo\r\nthree'),
+            b'one two  three\n')
+
+    def test_encodes_lengths(self):
+        coprocess = CoProcess(
+            ['engine'],
+            protocol=CoProcess.PROTOCOL_LENGTH,
+            interrupt='STOP')
+
+        self.assertEqual(coprocess._encode('café\n'), b'6\ncaf\xc3\xa9\n')
+
+    def test_keeps_running_between_texts(self):
+        self.assertTrue(self.coprocess.send('hello'))
+        pid = self.coprocess._proc.pid
+
+        self.assertTrue(self.coprocess.send('again'))
+        self.assertEqual(self.coprocess._proc.pid, pid)
+
+    def test_interrupt(self):
+        self.coprocess.start()
+        results = []
+        sender = threading.Thread(
+            target=lambda: results.append(self.coprocess.send('wait')))
+        sender.start()
+
+        time.sleep(.2)
+        self.assertTrue(self.coprocess.interrupt())
+        sender.join(timeout=5.)
+
+        self.assertEqual(results, [True])
+        self.assertTrue(self.coprocess.is_running())
+
+    def test_interrupt_when_idle(self):
+        self.coprocess.start()
+
+        self.assertFalse(self.coprocess.interrupt())
+
+        start = time.monotonic()
+        self.assertTrue(self.coprocess.send('slow'))
+        self.assertGreaterEqual(time.monotonic() - start, .3)
+
+    def test_discards_lines_not_waited_for(self):
+        self.assertTrue(self.coprocess.send('twice'))
+        time.sleep(.1)
+
+        start = time.monotonic()
+        self.assertTrue(self.coprocess.send('slow'))
+        self.assertGreaterEqual(time.monotonic() - start, .3)
+
+    def test_not_sent_once_stopped(self):
+        self.coprocess.start()
+        self.coprocess.stop()
+
+        self.assertFalse(self.coprocess.send('hello'))
+        self.coprocess.start()
+        self.assertFalse(self.coprocess.is_running())
+        self.assertIsNone(self.coprocess._proc)
+
+    def test_restarts_after_exiting(self):
+        self.coprocess.start()
+        pid = self.coprocess._proc.pid
+
+        self.assertFalse(self.coprocess.send('exit'))
+        self.assertTrue(self.wait_for_restart(pid))
+        self.assertTrue(self.coprocess.send('hello'))
+
+    def test_restarts_after_timing_out(self):
+        self.coprocess.timeout = .5
+        self.coprocess.start()
+        pid = self.coprocess._proc.pid
+
+        self.assertFalse(self.coprocess.send('hang'))
+        self.assertTrue(self.wait_for_restart(pid))
+        self.assertTrue(self.coprocess.send('hello'))
+
+    def test_not_restarted_once_stopped(self):
+        self.coprocess.start()
+        proc = self.coprocess._proc
+
+        self.coprocess.stop()
+        self.coprocess._restart(proc)
+        proc.wait(5.)
+        time.sleep(.2)
+
+        self.assertFalse(self.coprocess.is_running())
+        self.assertIsNone(self.coprocess._proc)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+from nottreal.utils.stats import LatencyStats, StatsCollection
+
+import unittest
+
+
+class TestLatencyStats(unittest.TestCase):
+
+    def test_empty(self):
+        stats = LatencyStats()
+
+        self.assertEqual(stats.count, 0)
+        self.assertIsNone(stats.mean())
+        self.assertIsNone(stats.percentile(50))
+        self.assertIsNone(stats.min)
+        self.assertIsNone(stats.max)
+
+    def test_count_total_min_max_mean(self):
+        stats = LatencyStats()
+        for duration in (.002, .001, .003):
+            stats.record(duration)
+
+        self.assertEqual(stats.count, 3)
+        self.assertAlmostEqual(stats.total, .006)
+        self.assertAlmostEqual(stats.mean(), .002)
+        self.assertEqual(stats.min, .001)
+        self.assertEqual(stats.max, .003)
+
+    def test_percentile_within_bucket_resolution(self):
+        stats = LatencyStats()
+        for i in range(1, 101):
+            stats.record(i / 1000.)
+
+        resolution = 10 ** (1. / LatencyStats.BUCKETS_PER_DECADE)
+        for percentile, expected in ((50, .05), (95, .095), (99, .099)):
+            estimate = stats.percentile(percentile)
+            self.assertGreaterEqual(estimate, expected)
+            self.assertLessEqual(estimate, expected * resolution)
+
+    def test_percentile_capped_at_max(self):
+        stats = LatencyStats()
+        stats.record(.0123)
+
+        self.assertEqual(stats.percentile(50), .0123)
+        self.assertEqual(stats.percentile(100), .0123)
+
+    def test_out_of_range_samples(self):
+        stats = LatencyStats()
+        stats.record(0.)
+        stats.record(LatencyStats.MAX_LATENCY * 10)
+
+        self.assertEqual(stats.percentile(50), LatencyStats.MIN_LATENCY)
+        self.assertEqual(stats.percentile(100), LatencyStats.MAX_LATENCY * 10)
+
+    def test_to_dict(self):
+        stats = LatencyStats()
+        stats.record(.5)
+
+        self.assertEqual(
+            stats.to_dict(),
+            {'count': 1, 'total': .5, 'mean': .5, 'min': .5, 'max': .5,
+             'p50': .5, 'p95': .5, 'p99': .5})
+
+
+class TestStatsCollection(unittest.TestCase):
+
+    def test_orders_by_total(self):
+        stats = StatsCollection()
+        stats.record('fast', .001)
+        stats.record('slow', .1)
+        stats.record('fast', .001)
+
+        summary = stats.to_dict()
+
+        self.assertEqual(list(summary), ['slow', 'fast'])
+        self.assertEqual(summary['fast']['count'], 2)
+
+    def test_clear(self):
+        stats = StatsCollection()
+        stats.record('key', .1)
+        stats.clear()
+
+        self.assertEqual(stats.to_dict(), {})
+
+    def test_summary_limit(self):
+        stats = StatsCollection()
+        for i in range(5):
+            stats.record('key %d' % i, i / 1000.)
+
+        lines = stats.summary(limit=2).split('\n')
+
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].startswith('key 4'))
+
+
+if __name__ == '__main__':
+    unittest.main()